@@ -1,14 +1,28 @@
 from __future__ import annotations
 
-from fastapi import Depends, FastAPI
+import base64
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends, FastAPI, HTTPException, Query, status
 from fluxmind.conversation import ConversationService
-from fluxmind.domain_core import MessageReceivedEvent, MessageRole
+from fluxmind.database import get_pool_metrics
+from fluxmind.domain_core import (
+    ConversationId,
+    Message,
+    MessageCursor,
+    MessageId,
+    MessageRole,
+    message_received_event,
+)
 from fluxmind.jwt import get_current_user
 from fluxmind.mq import EventPublisher
 from fluxmind.platform import get_settings
 from pydantic import BaseModel
 
-from .deps import get_conversation_service, get_event_publisher
+from .deps import get_conversation_service, get_event_publisher, get_publisher_metrics
 
 
 class CreateConversationRequest(BaseModel):
@@ -19,6 +33,46 @@ class CreateConversationResponse(BaseModel):
     conversation_id: str
 
 
+class PostMessageRequest(BaseModel):
+    content: str
+
+
+class PostMessageResponse(BaseModel):
+    message_id: str
+
+
+class MessageResponse(BaseModel):
+    id: str
+    role: MessageRole
+    content: str
+    created_at: datetime
+    token_count: int | None = None
+
+
+class ListMessagesResponse(BaseModel):
+    messages: list[MessageResponse]
+    next_cursor: str | None = None
+
+
+def _encode_cursor(message: Message) -> str:
+    raw = f"{message.created_at.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> MessageCursor:
+    try:
+        created_at, message_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return MessageCursor(
+            created_at=datetime.fromisoformat(created_at),
+            id=MessageId(UUID(message_id)),
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
 app = FastAPI(title="FluxMind API")
 
 
@@ -27,6 +81,17 @@ async def health_check() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics/db-pool")
+async def db_pool_metrics() -> dict[str, Any]:
+    metrics = get_pool_metrics()
+    return asdict(metrics) if metrics is not None else {}
+
+
+@app.get("/metrics/kafka-producer")
+async def kafka_producer_metrics() -> dict[str, Any]:
+    return asdict(get_publisher_metrics())
+
+
 @app.post("/conversations", status_code=201, response_model=CreateConversationResponse)
 async def create_conversation(
     payload: CreateConversationRequest,
@@ -34,23 +99,99 @@ async def create_conversation(
     conversation_service: ConversationService = Depends(get_conversation_service),
     event_publisher: EventPublisher = Depends(get_event_publisher),
 ) -> CreateConversationResponse:
+    settings = get_settings()
+    # outbox 모드에서는 이벤트가 대화와 같은 트랜잭션으로 기록되고 relay가 발행하므로 요청이 broker를 기다리지 않는다.
+    use_outbox = settings.api_event_delivery == "outbox"
     conv = await conversation_service.create_conversation(
         initial_user_message=payload.initial_message,
+        emit_events=use_outbox,
     )
 
-    if payload.initial_message:
+    if payload.initial_message and not use_outbox:
         user_msg = conv.messages[-1]
-        event = MessageReceivedEvent(
-            conversation_id=user_msg.conversation_id,
-            message_id=user_msg.id,
-            role=MessageRole.USER,
-            content=user_msg.content,
-        )
-        settings = get_settings()
         await event_publisher.publish(
             topic=settings.mq_topic_conversation_events,
-            event=event,
+            event=message_received_event(user_msg),
             partition_key=str(user_msg.conversation_id),
         )
 
     return CreateConversationResponse(conversation_id=str(conv.id))
+
+
+@app.post(
+    "/conversations/{conversation_id}/messages",
+    status_code=201,
+    response_model=PostMessageResponse,
+)
+async def post_message(
+    conversation_id: UUID,
+    payload: PostMessageRequest,
+    current_user: dict = Depends(get_current_user),
+    conversation_service: ConversationService = Depends(get_conversation_service),
+    event_publisher: EventPublisher = Depends(get_event_publisher),
+) -> PostMessageResponse:
+    settings = get_settings()
+    use_outbox = settings.api_event_delivery == "outbox"
+    try:
+        user_msg = await conversation_service.add_user_message(
+            conversation_id=ConversationId(conversation_id),
+            content=payload.content,
+            emit_events=use_outbox,
+        )
+    except LookupError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Conversation not found",
+        )
+
+    if not use_outbox:
+        await event_publisher.publish(
+            topic=settings.mq_topic_conversation_events,
+            event=message_received_event(user_msg),
+            partition_key=str(user_msg.conversation_id),
+        )
+
+    return PostMessageResponse(message_id=str(user_msg.id))
+
+
+@app.get(
+    "/conversations/{conversation_id}/messages",
+    response_model=ListMessagesResponse,
+)
+async def list_messages(
+    conversation_id: UUID,
+    limit: int = Query(default=50, ge=1, le=200),
+    before: str | None = None,
+    current_user: dict = Depends(get_current_user),
+    conversation_service: ConversationService = Depends(get_conversation_service),
+) -> ListMessagesResponse:
+    messages = await conversation_service.list_messages(
+        conversation_id=ConversationId(conversation_id),
+        limit=limit,
+        before=_decode_cursor(before) if before else None,
+    )
+    if not messages:
+        # 빈 페이지는 메시지가 없는 대화일 수도, 없는 대화일 수도 있다. POST와 같이 없는 대화는 404로 답한다.
+        try:
+            await conversation_service.get_conversation_header(ConversationId(conversation_id))
+        except LookupError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found",
+            )
+
+    # 가장 오래된 메시지가 다음(과거) 페이지의 기준점이 된다.
+    next_cursor = _encode_cursor(messages[0]) if len(messages) == limit else None
+    return ListMessagesResponse(
+        messages=[
+            MessageResponse(
+                id=str(msg.id),
+                role=msg.role,
+                content=msg.content,
+                created_at=msg.created_at,
+                token_count=msg.token_count,
+            )
+            for msg in messages
+        ],
+        next_cursor=next_cursor,
+    )
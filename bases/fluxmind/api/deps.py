@@ -1,20 +1,46 @@
 from __future__ import annotations
 
-from fluxmind.conversation import ConversationService
+from fluxmind.conversation import CachingConversationRepository, ConversationRepository, ConversationService
 from fluxmind.database import get_session_maker
+from fluxmind.database.content_store import build_claim_check
 from fluxmind.database.conversation_repository import SqlAlchemyConversationRepository
+from fluxmind.database.outbox_store import SqlAlchemyOutboxStore
+from fluxmind.history_cache import TailCachedConversationRepository
+from fluxmind.history_cache.redis import RedisMessageTailCache
 from fluxmind.mq import EventPublisher
-from fluxmind.mq.kafka import KafkaEventPublisher
+from fluxmind.mq.kafka import KafkaEventPublisher, PublisherMetrics
 from fluxmind.platform import get_settings
 
+_settings = get_settings()
+
 _session_maker = get_session_maker()
-_conversation_repo = SqlAlchemyConversationRepository(_session_maker)
+_claim_check = build_claim_check(_settings, _session_maker)
+_conversation_repo: ConversationRepository = SqlAlchemyConversationRepository(
+    _session_maker,
+    outbox=SqlAlchemyOutboxStore(
+        _session_maker,
+        topic=_settings.mq_topic_conversation_events,
+        claim_check=_claim_check,
+    ),
+)
+if _settings.conversation_cache_max_bytes > 0:
+    _conversation_repo = CachingConversationRepository(
+        _conversation_repo,
+        max_bytes=_settings.conversation_cache_max_bytes,
+        ttl_seconds=_settings.conversation_cache_ttl_seconds,
+    )
+if _settings.redis_url:
+    _conversation_repo = TailCachedConversationRepository(
+        _conversation_repo,
+        RedisMessageTailCache.from_url(
+            _settings.redis_url,
+            window=_settings.conversation_history_window,
+            ttl_seconds=_settings.history_cache_ttl_seconds,
+        ),
+    )
 _conversation_service = ConversationService(_conversation_repo)
 
-_settings = get_settings()
-_event_publisher: EventPublisher = KafkaEventPublisher(
-    bootstrap_servers=_settings.mq_bootstrap_servers,
-)
+_event_publisher = KafkaEventPublisher.from_settings(_settings, claim_check=_claim_check)
 
 
 def get_conversation_service() -> ConversationService:
@@ -23,3 +49,7 @@ def get_conversation_service() -> ConversationService:
 
 def get_event_publisher() -> EventPublisher:
     return _event_publisher
+
+
+def get_publisher_metrics() -> PublisherMetrics:
+    return _event_publisher.metrics()
@@ -0,0 +1,277 @@
+"""
+이벤트 로그(Kafka topic)를 다시 읽어 conversation_analytics를 재계산하는 CLI.
+
+    python -m fluxmind.events_consumer.analytics_replay run --replay-id ID
+        [--from-timestamp ISO | --from-offset N] [--batch-size N] [--checkpoint-events N] [--dedupe-window N]
+    python -m fluxmind.events_consumer.analytics_replay status --replay-id ID
+    python -m fluxmind.events_consumer.analytics_replay apply --replay-id ID
+    python -m fluxmind.events_consumer.analytics_replay discard --replay-id ID
+
+run은 시작할 때의 끝 offset까지 읽으며 대화별 합계를 analytics_replay_totals에 모은다. 합계와 읽은 위치는
+같은 트랜잭션으로 기록하므로 중단된 replay는 같은 --replay-id로 다시 run 하면 이어서 읽는다.
+실시간 analytics consumer는 그동안 계속 돌아도 된다.
+
+apply는 analytics consumer를 멈춘 뒤 실행한다. 그 group이 commit 한 offset까지 replay를 따라 읽고,
+그 위치를 group에 commit 한 다음 conversation_analytics를 replay 결과로 바꾼다. consumer가 살아 있으면
+commit이 거절되어 아무것도 바꾸지 않는다. 테이블을 통째로 바꾸므로 --from-timestamp/--from-offset으로
+중간부터 읽은 replay는 apply 할 수 없다 (status로 결과를 보는 데만 쓴다).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from datetime import datetime, timezone
+from typing import Protocol
+
+from fluxmind.analytics import AnalyticsReplayStore, MessageCountAggregator, ReplayCheckpoint
+from fluxmind.database import get_session_maker
+from fluxmind.database.analytics_replay_store import SqlAlchemyAnalyticsReplayStore
+from fluxmind.domain_core import AssistantRespondedEvent, MessageReceivedEvent
+from fluxmind.mq import EventCodecRegistry
+from fluxmind.mq.kafka import KafkaTopicReader
+from fluxmind.platform import AppSettings, get_settings
+
+
+class TopicReader(Protocol):
+    @property
+    def topic(self) -> str: ...
+
+    async def start_offsets(
+        self,
+        *,
+        from_timestamp_ms: int | None = None,
+        from_offset: int | None = None,
+    ) -> dict[int, int]: ...
+
+    async def end_offsets(self) -> dict[int, int]: ...
+
+    def read(
+        self,
+        positions: dict[int, int],
+        end_offsets: dict[int, int],
+    ) -> AsyncIterator[tuple[int, list[bytes], int]]: ...
+
+    async def committed(self, group_id: str) -> dict[int, int]: ...
+
+    async def commit(self, group_id: str, offsets: dict[int, int]) -> None: ...
+
+
+class AnalyticsReplay:
+    def __init__(
+        self,
+        reader: TopicReader,
+        store: AnalyticsReplayStore,
+        *,
+        codec: EventCodecRegistry | None = None,
+        checkpoint_events: int = 200_000,
+        dedupe_window: int = 200_000,
+    ) -> None:
+        self._reader = reader
+        self._store = store
+        self._codec = codec or EventCodecRegistry([AssistantRespondedEvent, MessageReceivedEvent])
+        self._checkpoint_events = checkpoint_events
+        self._dedupe_window = dedupe_window
+
+    async def run(
+        self,
+        replay_id: str,
+        *,
+        from_timestamp: datetime | None = None,
+        from_offset: int | None = None,
+    ) -> ReplayCheckpoint:
+        checkpoint = await self._store.load_checkpoint(replay_id)
+        if checkpoint is None:
+            from_timestamp_ms = int(from_timestamp.timestamp() * 1000) if from_timestamp is not None else None
+            checkpoint = ReplayCheckpoint(
+                topic=self._reader.topic,
+                positions=await self._reader.start_offsets(
+                    from_timestamp_ms=from_timestamp_ms,
+                    from_offset=from_offset,
+                ),
+                end_offsets=await self._reader.end_offsets(),
+                from_beginning=from_timestamp is None and from_offset is None,
+            )
+            await self._store.save_progress(replay_id, [], checkpoint)
+        elif checkpoint.topic != self._reader.topic:
+            raise ValueError(f"Replay {replay_id} reads {checkpoint.topic}, not {self._reader.topic}")
+        elif from_timestamp is not None or from_offset is not None:
+            print(f"Resuming replay {replay_id} from its checkpoint; start options are ignored")
+
+        await self._fold(replay_id, checkpoint)
+        return checkpoint
+
+    async def apply(self, replay_id: str, analytics_group: str) -> int:
+        checkpoint = await self._store.load_checkpoint(replay_id)
+        if checkpoint is None:
+            raise LookupError(f"Unknown replay: {replay_id}")
+        if not checkpoint.from_beginning:
+            # 테이블을 통째로 바꾸므로 시작 위치 이전의 기록이 모두 사라진다.
+            raise ValueError(
+                f"Replay {replay_id} did not start at the beginning of the log; "
+                "discard it and run a --from-beginning replay to apply",
+            )
+
+        # 멈춘 consumer가 replay보다 앞서 있으면 그만큼 더 읽고, 뒤처져 있으면 replay 위치로 당겨 준다.
+        committed = await self._reader.committed(analytics_group)
+        target = {
+            partition: max(committed.get(partition, 0), checkpoint.positions.get(partition, 0))
+            for partition in checkpoint.end_offsets.keys() | committed.keys()
+        }
+        checkpoint.end_offsets = {
+            partition: max(checkpoint.end_offsets.get(partition, 0), offset) for partition, offset in target.items()
+        }
+        await self._fold(replay_id, checkpoint)
+
+        # commit이 먼저다: consumer가 살아 있으면 여기서 실패하고 analytics는 그대로 남는다.
+        # replace가 실패하면 replay 기록이 남아 있으므로 apply를 다시 실행하면 된다.
+        await self._reader.commit(analytics_group, checkpoint.positions)
+        return await self._store.replace_analytics(replay_id)
+
+    async def _fold(self, replay_id: str, checkpoint: ReplayCheckpoint) -> None:
+        aggregator = MessageCountAggregator()
+        add, decode_raw = aggregator.add, self._codec.decode_raw
+        pending = total = skipped = duplicates = 0
+        started = time.perf_counter()
+        # outbox relay는 적어도 한 번 발행하므로 같은 이벤트가 로그에 두 번 있을 수 있다. 재발행은 원본 바로 뒤
+        # (같은 파티션의 다음 relay 배치)에 오므로 최근 dedupe_window 개의 event_id만 기억해 거른다.
+        # 그보다 멀리 떨어진 중복이나 replay를 이어서 읽는 지점에 걸친 중복은 두 번 센다.
+        recent: set[str] = set()
+        order: deque[str] = deque()
+
+        batches = self._reader.read(dict(checkpoint.positions), checkpoint.end_offsets)
+        async for partition, values, next_offset in batches:
+            for raw in values:
+                try:
+                    event_type, data = decode_raw(raw)
+                    event_id = data.get("event_id")
+                    if event_id is not None:
+                        if event_id in recent:
+                            duplicates += 1
+                            continue
+                        recent.add(event_id)
+                        order.append(event_id)
+                        if len(order) > self._dedupe_window:
+                            recent.discard(order.popleft())
+                    add(event_type, data)
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    skipped += 1
+            checkpoint.positions[partition] = next_offset
+            pending += len(values)
+            if pending >= self._checkpoint_events:
+                await self._store.save_progress(replay_id, aggregator.drain(), checkpoint)
+                total += pending
+                pending = 0
+                elapsed = time.perf_counter() - started
+                print(f"Replay {replay_id}: {total} events ({total / elapsed:.0f}/s)")
+
+        await self._store.save_progress(replay_id, aggregator.drain(), checkpoint)
+        total += pending
+        elapsed = time.perf_counter() - started
+        print(
+            f"Replay {replay_id}: {total} events in {elapsed:.1f}s"
+            + (f", {duplicates} duplicates skipped" if duplicates else "")
+            + (f", {skipped} undecodable skipped" if skipped else ""),
+        )
+
+
+async def _with_replay(settings: AppSettings, batch_size: int, checkpoint_events: int, dedupe_window: int, action):
+    reader = KafkaTopicReader(
+        settings.mq_bootstrap_servers,
+        settings.mq_topic_conversation_events,
+        max_records=batch_size,
+    )
+    store = SqlAlchemyAnalyticsReplayStore(get_session_maker())
+    await reader.start()
+    try:
+        replay = AnalyticsReplay(reader, store, checkpoint_events=checkpoint_events, dedupe_window=dedupe_window)
+        return await action(replay, store)
+    finally:
+        await reader.stop()
+
+
+async def status(store: AnalyticsReplayStore, replay_id: str) -> ReplayCheckpoint | None:
+    checkpoint = await store.load_checkpoint(replay_id)
+    if checkpoint is None:
+        print(f"Unknown replay: {replay_id}", file=sys.stderr)
+        return None
+    print(
+        json.dumps(
+            {
+                "replay_id": replay_id,
+                "topic": checkpoint.topic,
+                "finished": checkpoint.finished,
+                "from_beginning": checkpoint.from_beginning,
+                "conversations": await store.count_totals(replay_id),
+                "partitions": {
+                    str(partition): {"next_offset": checkpoint.positions.get(partition, 0), "end_offset": end}
+                    for partition, end in sorted(checkpoint.end_offsets.items())
+                },
+                "updated_at": checkpoint.updated_at.isoformat(),
+            },
+        ),
+    )
+    return checkpoint
+
+
+def _timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        prog="fluxmind-analytics-replay",
+        description="Rebuild conversation analytics from the event log",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_cmd = commands.add_parser("run", help="read the event log into replay totals (resumes from the checkpoint)")
+    start = run_cmd.add_mutually_exclusive_group()
+    start.add_argument("--from-beginning", action="store_true", help="default")
+    start.add_argument("--from-timestamp", type=_timestamp, default=None, help="ISO 8601, UTC if no offset")
+    start.add_argument("--from-offset", type=int, default=None, help="same offset on every partition")
+    status_cmd = commands.add_parser("status", help="print replay progress as JSON")
+    apply_cmd = commands.add_parser("apply", help="replace conversation_analytics (stop analytics consumers first)")
+    apply_cmd.add_argument("--group", default=settings.mq_group_id_analytics, help="analytics consumer group id")
+    discard_cmd = commands.add_parser("discard", help="delete replay totals and checkpoint")
+    for cmd in (run_cmd, status_cmd, apply_cmd, discard_cmd):
+        cmd.add_argument("--replay-id", required=True)
+    for cmd in (run_cmd, apply_cmd):
+        cmd.add_argument("--batch-size", type=int, default=5000, help="max records per fetch")
+        cmd.add_argument("--checkpoint-events", type=int, default=200_000, help="events between checkpoints")
+        cmd.add_argument("--dedupe-window", type=int, default=200_000, help="recent event ids checked for duplicates")
+
+    args = parser.parse_args(argv)
+    if args.command == "status":
+        store = SqlAlchemyAnalyticsReplayStore(get_session_maker())
+        return 0 if asyncio.run(status(store, args.replay_id)) is not None else 1
+    if args.command == "discard":
+        asyncio.run(SqlAlchemyAnalyticsReplayStore(get_session_maker()).discard(args.replay_id))
+        print(f"Discarded replay {args.replay_id}")
+        return 0
+
+    if args.command == "run":
+
+        async def action(replay: AnalyticsReplay, store: AnalyticsReplayStore) -> None:
+            await replay.run(args.replay_id, from_timestamp=args.from_timestamp, from_offset=args.from_offset)
+            await status(store, args.replay_id)
+
+    else:
+
+        async def action(replay: AnalyticsReplay, store: AnalyticsReplayStore) -> None:
+            count = await replay.apply(args.replay_id, args.group)
+            print(f"conversation_analytics replaced with {count} conversations from replay {args.replay_id}")
+
+    asyncio.run(_with_replay(settings, args.batch_size, args.checkpoint_events, args.dedupe_window, action))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,116 @@
+"""
+dead-letter topic 점검/재처리 CLI.
+
+    python -m fluxmind.events_consumer.dead_letters inspect [--group GROUP] [--limit N]
+    python -m fluxmind.events_consumer.dead_letters replay [--group GROUP] (--event-id ID ... | --all) [--dry-run]
+
+inspect는 dead-letter 이벤트를 한 줄에 하나씩 JSON으로 출력한다 (consumer group 없이 읽으므로 offset은 그대로다).
+replay는 고른 이벤트를 그 group의 첫 retry topic으로 다시 보낸다. 이미 처리된 이벤트는 processed event
+기록으로 건너뛰므로 같은 이벤트를 여러 번 replay 해도 handler는 한 번만 성공한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from uuid import UUID
+
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationArchivedEvent,
+    MessageFlaggedEvent,
+    MessageReceivedEvent,
+)
+from fluxmind.mq import RetryPolicy, RetryRouter, dead_letter_topic
+from fluxmind.mq.kafka import KafkaEventPublisher, TopicRecord, read_topic
+from fluxmind.platform import AppSettings, get_settings
+
+from .main import build_retry_policy
+
+EVENT_TYPES = {
+    event_cls.__name__: event_cls
+    for event_cls in (AssistantRespondedEvent, ConversationArchivedEvent, MessageFlaggedEvent, MessageReceivedEvent)
+}
+
+
+def _describe(record: TopicRecord) -> dict:
+    event = record.event
+    conversation_id = getattr(event, "conversation_id", None)
+    return {
+        "partition": record.partition,
+        "offset": record.offset,
+        "event_type": event.event_type,
+        "event_id": str(event.event_id),
+        "conversation_id": str(conversation_id) if conversation_id is not None else None,
+        "occurred_at": event.occurred_at.isoformat(),
+        "metadata": dict(event.metadata),
+    }
+
+
+async def inspect(settings: AppSettings, group_id: str, *, limit: int | None = None) -> int:
+    count = 0
+    async for record in read_topic(settings.mq_bootstrap_servers, dead_letter_topic(group_id), EVENT_TYPES):
+        print(json.dumps(_describe(record), ensure_ascii=False, default=str))
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    print(f"{count} dead-lettered events in {dead_letter_topic(group_id)}", file=sys.stderr)
+    return count
+
+
+async def replay(
+    settings: AppSettings,
+    group_id: str,
+    *,
+    event_ids: set[UUID] | None = None,
+    dry_run: bool = False,
+) -> int:
+    """event_ids가 None이면 dead-letter topic의 모든 이벤트를 replay 한다."""
+    policy = build_retry_policy(settings) or RetryPolicy(delays_seconds=())
+    publisher = KafkaEventPublisher.from_settings(settings)
+    retries = RetryRouter(publisher, group_id, policy)
+    count = 0
+    try:
+        async for record in read_topic(settings.mq_bootstrap_servers, dead_letter_topic(group_id), EVENT_TYPES):
+            if event_ids is not None and record.event.event_id not in event_ids:
+                continue
+            if dry_run:
+                print(f"would replay {record.event.event_type} {record.event.event_id}")
+            else:
+                topic = await retries.replay(record.event)
+                print(f"replayed {record.event.event_type} {record.event.event_id} to {topic}")
+            count += 1
+    finally:
+        await publisher.stop()
+    print(f"{count} events {'selected' if dry_run else 'replayed'}", file=sys.stderr)
+    return count
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(prog="fluxmind-dead-letters", description="Inspect and replay dead-lettered events")
+    parser.add_argument("--group", default=settings.mq_group_id_events_consumer, help="consumer group id")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    inspect_cmd = commands.add_parser("inspect", help="print dead-lettered events as JSON lines")
+    inspect_cmd.add_argument("--limit", type=int, default=None)
+
+    replay_cmd = commands.add_parser("replay", help="send dead-lettered events back through the retry topics")
+    selection = replay_cmd.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--event-id", type=UUID, action="append", dest="event_ids")
+    selection.add_argument("--all", action="store_true")
+    replay_cmd.add_argument("--dry-run", action="store_true")
+
+    args = parser.parse_args(argv)
+    if args.command == "inspect":
+        asyncio.run(inspect(settings, args.group, limit=args.limit))
+    else:
+        event_ids = None if args.all else set(args.event_ids)
+        asyncio.run(replay(settings, args.group, event_ids=event_ids, dry_run=args.dry_run))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
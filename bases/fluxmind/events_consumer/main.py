@@ -1,21 +1,91 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import functools
+import json
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Type
+from uuid import UUID
 
 from fluxmind.analytics import AnalyticsService
-from fluxmind.conversation import ConversationService
+from fluxmind.context_builder import ContextBuilder, HeuristicTokenCounter
+from fluxmind.conversation import CachingConversationRepository, ConversationRepository, ConversationService
 from fluxmind.database import get_session_maker
 from fluxmind.database.analytics_repository import SqlAlchemyAnalyticsRepository
+from fluxmind.database.content_store import build_claim_check
 from fluxmind.database.conversation_repository import SqlAlchemyConversationRepository
+from fluxmind.database.outbox_store import SqlAlchemyOutboxStore
+from fluxmind.database.processed_event_store import build_processed_event_store
+from fluxmind.database.summary_repository import SqlAlchemySummaryRepository
 from fluxmind.domain_core import (
     AssistantRespondedEvent,
+    BaseEvent,
     MessageReceivedEvent,
+    assistant_responded_event,
 )
-from fluxmind.llm import LLMClient, LLMMessage, LLMRole
+from fluxmind.history_cache import TailCachedConversationRepository
+from fluxmind.history_cache.redis import RedisMessageTailCache
+from fluxmind.llm import LLMClient
 from fluxmind.llm.ollama_client import OllamaClient
-from fluxmind.mq import EventPublisher, EventSubscriber
+from fluxmind.mq import (
+    ConsumerGroup,
+    EventPublisher,
+    EventRouter,
+    EventSubscriber,
+    KeyedEventDispatcher,
+    ProcessedEventStore,
+    RetryPolicy,
+    RetryRouter,
+    retry_topic,
+)
 from fluxmind.mq.kafka import KafkaEventPublisher, KafkaEventSubscriber
-from fluxmind.platform import get_settings
+from fluxmind.mq.retry import retry_due_at
+from fluxmind.platform import AppSettings, get_settings
+from fluxmind.summarization import ConversationSummarizer, SummaryRepository
+
+SubscriberFactory = Callable[[ConsumerGroup, dict[str, Type[BaseEvent]]], EventSubscriber]
+
+# retry topic이 없을 때 실패한 배치를 다시 처리하기 전에 기다리는 시간 (마지막 값을 계속 쓴다).
+_BATCH_RETRY_BACKOFF_SECONDS = (1.0, 5.0, 30.0)
+
+
+def build_context_builder(
+    conversation_service: ConversationService,
+    settings: AppSettings,
+    summary_repository: SummaryRepository | None = None,
+) -> ContextBuilder:
+    return ContextBuilder(
+        conversation_service,
+        HeuristicTokenCounter(),
+        default_budget=settings.llm_context_token_budget,
+        model_budgets=settings.llm_context_model_budgets,
+        response_reserve=settings.llm_context_response_reserve_tokens,
+        system_prompt=settings.llm_system_prompt,
+        page_size=settings.conversation_history_window,
+        summary_repository=summary_repository,
+    )
+
+
+def build_summarizer(
+    conversation_service: ConversationService,
+    summary_repository: SummaryRepository,
+    llm_client: LLMClient,
+    settings: AppSettings,
+) -> ConversationSummarizer:
+    return ConversationSummarizer(
+        conversation_service,
+        summary_repository,
+        llm_client,
+        model=settings.ollama_model,
+        trigger_messages=settings.llm_summary_trigger_messages,
+        keep_recent=settings.llm_summary_keep_recent_messages,
+        max_messages_per_pass=settings.llm_summary_max_messages_per_pass,
+        max_tokens=settings.llm_summary_max_tokens,
+        max_concurrency=settings.llm_summary_max_concurrency,
+    )
 
 
 async def handle_message_received(
@@ -23,67 +93,346 @@ async def handle_message_received(
     conversation_service: ConversationService,
     llm_client: LLMClient,
     event_publisher: EventPublisher,
+    context_builder: ContextBuilder | None = None,
 ) -> None:
-    conv = await conversation_service.get_conversation(event.conversation_id)
-    history = [
-        LLMMessage(
-            role=LLMRole(msg.role.value),
-            content=msg.content,
-        )
-        for msg in conv.latest_messages()
-    ]
+    settings = get_settings()
+    if context_builder is None:
+        context_builder = build_context_builder(conversation_service, settings)
 
-    reply = await llm_client.generate(
+    history = await context_builder.build(
+        event.conversation_id,
+        model=settings.ollama_model,
+    )
+
+    completion = await llm_client.complete(
         history,
-        model=get_settings().ollama_model,
+        model=settings.ollama_model,
     )
 
+    # outbox 모드에서는 응답 이벤트를 응답 메시지와 같은 트랜잭션으로 기록하고 relay가 발행한다.
+    # 이벤트가 ack 되기 전에 커밋되므로 ack 후에 죽어도 응답 이벤트를 잃지 않는다.
+    use_outbox = settings.events_consumer_event_delivery == "outbox"
+    responded = functools.partial(
+        assistant_responded_event,
+        user_message_id=event.message_id,
+        prompt_token_count=completion.prompt_tokens,
+    )
     assistant_msg = await conversation_service.add_assistant_message(
         conversation_id=event.conversation_id,
-        content=reply,
+        content=completion.content,
+        token_count=completion.completion_tokens,
+        outbox=(lambda message: [responded(message)]) if use_outbox else None,
     )
 
-    responded = AssistantRespondedEvent(
-        conversation_id=assistant_msg.conversation_id,
-        user_message_id=event.message_id,
-        assistant_message_id=assistant_msg.id,
-        content=assistant_msg.content,
+    if not use_outbox:
+        # broker ack를 기다린 뒤에 handler가 끝나야 전달되지 않은 응답 이벤트의 offset이 commit 되지 않는다.
+        await event_publisher.publish(
+            topic=settings.mq_topic_conversation_events,
+            event=responded(assistant_msg),
+            partition_key=str(assistant_msg.conversation_id),
+        )
+
+
+def _ack_when_handled(ack: Callable[[], None], ack_failures: bool, done: asyncio.Future[None]) -> None:
+    # handler가 끝난 이벤트만 ack 해서 offset commit이 처리보다 앞서지 않게 한다. 종료로 취소된 이벤트는 다시 받는다.
+    # retry topic이 없으면 실패한 이벤트도 ack 한다(실패는 dispatcher가 로그로 남긴다). retry topic이 있는데도
+    # 실패했다면 retry topic으로 보내지 못한 것이므로 ack 하지 않아 재시작 때 다시 받는다.
+    if done.cancelled() or (not ack_failures and done.exception() is not None):
+        return
+    ack()
+
+
+async def _wait_until_due(event: BaseEvent) -> None:
+    # 한 retry topic의 이벤트는 모두 같은 지연으로 들어오므로 앞의 이벤트를 기다리는 동안 뒤의 이벤트도 아직 이르다.
+    due_at = retry_due_at(event)
+    if due_at is None:
+        return
+    delay = (due_at - datetime.now(timezone.utc)).total_seconds()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+def build_retry_policy(
+    settings: AppSettings,
+    *,
+    non_retryable: tuple[Type[Exception], ...] = (),
+) -> RetryPolicy | None:
+    if not settings.events_consumer_retry_enabled:
+        return None
+    return RetryPolicy(tuple(settings.events_consumer_retry_delays_seconds), non_retryable=non_retryable)
+
+
+def build_router(
+    settings: AppSettings,
+    *,
+    conversation_service: ConversationService,
+    llm_client: LLMClient,
+    event_publisher: EventPublisher,
+    analytics_service: AnalyticsService,
+    context_builder: ContextBuilder | None = None,
+    summarizer: ConversationSummarizer | None = None,
+) -> EventRouter:
+    """
+    LLM 응답(초 단위)과 analytics 카운터(밀리초 단위)를 서로 다른 consumer group으로 나눈다.
+    analytics lag이 LLM 지연을 따라가지 않고, group마다 따로 띄우고 동시성을 정할 수 있다.
+    """
+    router = EventRouter()
+    responder = router.add_group(
+        settings.mq_group_id_events_consumer,
+        topic=settings.mq_topic_conversation_events,
+        max_concurrency=settings.events_consumer_max_concurrency,
+        max_in_flight=settings.events_consumer_max_in_flight,
+        # 대화나 claim-check 내용이 없으면 다시 시도해도 없으므로 바로 dead-letter로 보낸다.
+        retry=build_retry_policy(settings, non_retryable=(LookupError,)),
     )
-    settings = get_settings()
-    await event_publisher.publish(
+    analytics = router.add_group(
+        settings.mq_group_id_analytics,
         topic=settings.mq_topic_conversation_events,
-        event=responded,
-        partition_key=str(assistant_msg.conversation_id),
+        batch_max_records=settings.analytics_consumer_batch_max_records,
+        batch_timeout_ms=settings.analytics_consumer_batch_timeout_ms,
+        retry=build_retry_policy(settings),
     )
 
+    async def respond(event: MessageReceivedEvent) -> None:
+        await handle_message_received(
+            event,
+            conversation_service=conversation_service,
+            llm_client=llm_client,
+            event_publisher=event_publisher,
+            context_builder=context_builder,
+        )
+
+    router.route(MessageReceivedEvent, respond, group_id=responder.group_id)
+    if summarizer is not None:
+
+        async def summarize(event: AssistantRespondedEvent) -> None:
+            # 요약은 LLM 호출이라 느리므로 다음 이벤트 처리를 막지 않게 백그라운드로 돌린다.
+            summarizer.schedule(event.conversation_id)
+
+        router.route(AssistantRespondedEvent, summarize, group_id=responder.group_id)
+
+    # analytics는 getmany() 배치 단위로 한 번의 upsert만 하므로 장애 후 따라잡을 때도 DB round trip이 적다.
+    router.route_batch(MessageReceivedEvent, analytics_service.handle_batch, group_id=analytics.group_id)
+    router.route_batch(AssistantRespondedEvent, analytics_service.handle_batch, group_id=analytics.group_id)
+    return router
+
 
 async def run_loop(
     subscriber: EventSubscriber,
-    conversation_service: ConversationService,
-    llm_client: LLMClient,
-    event_publisher: EventPublisher,
-    analytics_service: AnalyticsService,
-    topic: str,
+    router: EventRouter,
+    group_id: str,
+    *,
+    processed_events: ProcessedEventStore | None = None,
+    retry_publisher: EventPublisher | None = None,
+    attempt: int = 0,
 ) -> None:
-    async for raw_event in subscriber.iterate(topic=topic):
-        if isinstance(raw_event, MessageReceivedEvent):
-            await handle_message_received(
-                raw_event,
-                conversation_service=conversation_service,
-                llm_client=llm_client,
-                event_publisher=event_publisher,
-            )
-        elif isinstance(raw_event, AssistantRespondedEvent):
-            await analytics_service.handle_assistant_responded(raw_event)
+    """
+    group_id에 route 된 이벤트를 처리한다. attempt > 0이면 그 retry 단계의 topic을 읽고,
+    이벤트마다 retry 시각까지 기다린 뒤 처리한다 (batch group도 retry 단계에서는 이벤트 하나씩).
 
+    retry_publisher가 있고 group에 retry 정책이 있으면 실패한 이벤트는 다음 retry topic이나
+    dead-letter topic으로 보내므로, 한 이벤트가 계속 실패해도 원래 파티션은 계속 진행한다.
+    """
+    group = router.group(group_id)
+    retries = (
+        RetryRouter(retry_publisher, group_id, group.retry)
+        if retry_publisher is not None and group.retry is not None
+        else None
+    )
+    if attempt == 0 and router.is_batch(group_id):
+        await _run_batch_loop(subscriber, router, group_id, processed_events=processed_events, retries=retries)
+        return
+
+    topic = group.topic if attempt == 0 else retry_topic(group_id, attempt)
+    if router.is_batch(group_id):
+        handle_batch = router.batch_handler(group_id)
+
+        async def dispatch(event: BaseEvent) -> None:
+            await handle_batch([event])
+
+    else:
+        dispatch = router.handler(group_id)
+
+    async def handle(event: BaseEvent) -> None:
+        # 재전송된 이벤트(commit 전에 재시작/rebalance)는 LLM을 다시 호출하지 않도록 건너뛴다.
+        if processed_events is not None and not await processed_events.claim(event.event_id):
+            return
+        try:
+            await dispatch(event)
+        except BaseException as e:
+            # 취소(종료/rebalance)도 claim을 풀어야 재전송된 이벤트를 처리된 것으로 보고 건너뛰지 않는다.
+            if processed_events is not None:
+                await processed_events.release(event.event_id)
+            if retries is None or not isinstance(e, Exception):
+                raise
+            await retries.route_failure(event, e, source_topic=topic)
+            return
+        if processed_events is not None:
+            await processed_events.complete(event.event_id)
+
+    # 서로 다른 대화의 이벤트는 동시에 처리하고, 같은 대화 안에서는 도착 순서를 지킨다.
+    # in-flight 한도에 닿으면 submit()이 기다리므로 subscriber에서 더 읽어 오지 않는다.
+    dispatcher = KeyedEventDispatcher(
+        handle,
+        max_concurrency=group.max_concurrency,
+        max_in_flight=group.max_in_flight,
+    )
+    # dispatcher를 먼저 멈춘 뒤 subscriber를 닫아야 마지막 commit에 처리된 이벤트만 반영된다.
+    async with contextlib.aclosing(subscriber.deliveries(topic)) as deliveries:
+        try:
+            async for delivery in deliveries:
+                if attempt > 0:
+                    await _wait_until_due(delivery.event)
+                done = await dispatcher.submit(delivery.event)
+                done.add_done_callback(functools.partial(_ack_when_handled, delivery.ack, retries is None))
+            await dispatcher.join()
+        finally:
+            await dispatcher.stop()
+
+
+async def _run_batch_loop(
+    subscriber: EventSubscriber,
+    router: EventRouter,
+    group_id: str,
+    *,
+    processed_events: ProcessedEventStore | None = None,
+    retries: RetryRouter | None = None,
+) -> None:
+    group = router.group(group_id)
+    handle = router.batch_handler(group_id)
+    async with contextlib.aclosing(
+        subscriber.iterate_batches(
+            group.topic,
+            max_records=group.batch_max_records,
+            timeout_ms=group.batch_timeout_ms,
+        )
+    ) as batches:
+        async for batch in batches:
+            events = [delivery.event for delivery in batch]
+            claimed: set[UUID] = set()
+            if processed_events is not None:
+                claimed = await processed_events.claim_many(event.event_id for event in events)
+                events = [event for event in events if event.event_id in claimed]
+            if await _handle_batch(handle, events, group_id, claimed, processed_events, retries, group.topic):
+                for delivery in batch:
+                    delivery.ack()
+
+
+async def _handle_batch(
+    handle: Callable[[list[BaseEvent]], Awaitable[None]],
+    events: list[BaseEvent],
+    group_id: str,
+    claimed: set[UUID],
+    processed_events: ProcessedEventStore | None,
+    retries: RetryRouter | None,
+    source_topic: str,
+) -> bool:
+    """배치를 처리하고 ack 해도 되면 True를 돌려준다."""
+    attempt = 0
+    try:
+        while True:
+            try:
+                await handle(events)
+                break
+            except Exception as e:
+                print(f"Error handling batch of {len(events)} events in {group_id}: {e}")
+                if retries is not None:
+                    if processed_events is not None:
+                        await processed_events.release_many(claimed)
+                    # retry topic으로 보내지 못한 배치는 ack 하지 않아 재시작 때 다시 받는다.
+                    return await _route_batch_failure(retries, events, e, source_topic)
+            # 보낼 retry topic이 없으면 ack 하지 않고 같은 배치를 다시 처리한다. ack 하면 이 배치를 잃는다.
+            await asyncio.sleep(_BATCH_RETRY_BACKOFF_SECONDS[min(attempt, len(_BATCH_RETRY_BACKOFF_SECONDS) - 1)])
+            attempt += 1
+    except BaseException:
+        if processed_events is not None:
+            await processed_events.release_many(claimed)
+        raise
+    if processed_events is not None:
+        await processed_events.complete_many(claimed)
+    return True
+
+
+async def _route_batch_failure(
+    retries: RetryRouter,
+    events: list[BaseEvent],
+    error: Exception,
+    source_topic: str,
+) -> bool:
+    # 배치 안의 이벤트 하나 때문에 실패했을 수 있으므로 retry topic에서는 이벤트마다 따로 처리한다.
+    try:
+        for event in events:
+            await retries.route_failure(event, error, source_topic=source_topic)
+    except Exception as e:
+        print(f"Could not route failed batch to retry topics: {e}")
+        return False
+    return True
+
+
+async def log_consumer_metrics(subscribers: list[KafkaEventSubscriber], interval_seconds: float) -> None:
+    # 파티션별 lag/처리 시간을 한 줄 JSON으로 남긴다. 로그 수집기나 autoscaler가 읽는다.
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for subscriber in subscribers:
+            metrics = subscriber.metrics()
+            if metrics is not None:
+                print(f"consumer_metrics {json.dumps(asdict(metrics))}")
 
-async def _main_async() -> None:
-    settings = get_settings()
 
+def build_kafka_subscriber(
+    settings: AppSettings,
+    group: ConsumerGroup,
+    event_types: dict[str, Type[BaseEvent]],
+) -> KafkaEventSubscriber:
+    return KafkaEventSubscriber(
+        bootstrap_servers=settings.mq_bootstrap_servers,
+        group_id=group.group_id,
+        event_types=event_types,
+        commit_interval_ms=settings.mq_consumer_commit_interval_ms,
+        commit_max_messages=settings.mq_consumer_commit_max_messages,
+        # 이벤트 단위 group은 dispatcher가 가득 차는 시점에 파티션을 pause 한다.
+        max_buffered_records=group.max_in_flight or settings.mq_consumer_max_buffered_records,
+    )
+
+
+async def serve(
+    settings: AppSettings,
+    event_publisher: EventPublisher,
+    subscriber_factory: SubscriberFactory,
+    *,
+    ready: asyncio.Event | None = None,
+) -> None:
+    """
+    consumer group마다 subscriber_factory로 subscriber를 만들어 run_loop를 돌린다.
+    모든 subscriber를 만든 뒤 ready를 set 한다. event_publisher는 호출한 쪽이 stop 한다.
+    """
     session_maker = get_session_maker()
-    conversation_repo = SqlAlchemyConversationRepository(session_maker)
+    conversation_repo: ConversationRepository = SqlAlchemyConversationRepository(
+        session_maker,
+        outbox=SqlAlchemyOutboxStore(
+            session_maker,
+            topic=settings.mq_topic_conversation_events,
+            claim_check=build_claim_check(settings, session_maker),
+        ),
+    )
+    if settings.conversation_cache_max_bytes > 0:
+        conversation_repo = CachingConversationRepository(
+            conversation_repo,
+            max_bytes=settings.conversation_cache_max_bytes,
+            ttl_seconds=settings.conversation_cache_ttl_seconds,
+        )
+    if settings.redis_url:
+        conversation_repo = TailCachedConversationRepository(
+            conversation_repo,
+            RedisMessageTailCache.from_url(
+                settings.redis_url,
+                window=settings.conversation_history_window,
+                ttl_seconds=settings.history_cache_ttl_seconds,
+            ),
+        )
     conversation_service = ConversationService(conversation_repo)
     analytics_repo = SqlAlchemyAnalyticsRepository(session_maker)
+    # 컨슈머는 handle_batch로 배치마다 바로 쓰므로 버퍼 모드(start/stop)는 쓰지 않는다.
     analytics_service = AnalyticsService(analytics_repo)
 
     llm_client: LLMClient = OllamaClient(
@@ -91,26 +440,74 @@ async def _main_async() -> None:
         model=settings.ollama_model,
     )
 
-    event_publisher: EventPublisher = KafkaEventPublisher(
-        bootstrap_servers=settings.mq_bootstrap_servers,
-    )
-    subscriber: EventSubscriber = KafkaEventSubscriber(
-        bootstrap_servers=settings.mq_bootstrap_servers,
-        group_id=settings.mq_group_id_events_consumer,
-        event_types={
-            "MessageReceivedEvent": MessageReceivedEvent,
-            "AssistantRespondedEvent": AssistantRespondedEvent,
-        },
-    )
+    summary_repo: SummaryRepository | None = None
+    summarizer: ConversationSummarizer | None = None
+    if settings.llm_summary_trigger_messages > 0:
+        summary_repo = SqlAlchemySummaryRepository(session_maker)
+        summarizer = build_summarizer(conversation_service, summary_repo, llm_client, settings)
+    context_builder = build_context_builder(conversation_service, settings, summary_repo)
 
-    await run_loop(
-        subscriber=subscriber,
+    router = build_router(
+        settings,
         conversation_service=conversation_service,
         llm_client=llm_client,
         event_publisher=event_publisher,
         analytics_service=analytics_service,
-        topic=settings.mq_topic_conversation_events,
+        context_builder=context_builder,
+        summarizer=summarizer,
+    )
+    # FLUXMIND_EVENTS_CONSUMER_GROUPS로 이 프로세스가 맡을 group을 고른다 (비어 있으면 전부).
+    groups = [
+        group
+        for group in router.groups
+        if not settings.events_consumer_groups or group.group_id in settings.events_consumer_groups
+    ]
+    # retry 단계마다 그 단계의 topic을 읽는 subscriber를 따로 둔다 (attempt 0 = 원래 topic).
+    consumers = [
+        (group, attempt, subscriber_factory(tier, router.event_types(group.group_id)))
+        for group in groups
+        for attempt, tier in enumerate([group, *router.retry_groups(group.group_id)])
+    ]
+    if ready is not None:
+        ready.set()
+
+    try:
+        async with asyncio.TaskGroup() as tasks:
+            kafka_subscribers = [s for _, _, s in consumers if isinstance(s, KafkaEventSubscriber)]
+            if kafka_subscribers and settings.events_consumer_metrics_interval_seconds > 0:
+                tasks.create_task(
+                    log_consumer_metrics(kafka_subscribers, settings.events_consumer_metrics_interval_seconds)
+                )
+            processed_events = {
+                group.group_id: build_processed_event_store(settings, session_maker, consumer_group=group.group_id)
+                for group in groups
+            }
+            for group, attempt, subscriber in consumers:
+                tasks.create_task(
+                    run_loop(
+                        subscriber,
+                        router,
+                        group.group_id,
+                        processed_events=processed_events[group.group_id],
+                        retry_publisher=event_publisher,
+                        attempt=attempt,
+                    )
+                )
+    finally:
+        if summarizer is not None:
+            await summarizer.stop()
+
+
+async def _main_async() -> None:
+    settings = get_settings()
+    event_publisher = KafkaEventPublisher.from_settings(
+        settings,
+        claim_check=build_claim_check(settings, get_session_maker()),
     )
+    try:
+        await serve(settings, event_publisher, functools.partial(build_kafka_subscriber, settings))
+    finally:
+        await event_publisher.stop()
 
 
 def main() -> None:
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0003_hot_path_indexes"
+down_revision = "0002_conversation_analytics"
+branch_labels = None
+depends_on = None
+
+
+def _drop_if_invalid(name: str) -> None:
+    # CONCURRENTLY 빌드가 실패하면 INVALID 인덱스가 남는다. if_not_exists가 그것을 있는 것으로 보고
+    # 건너뛰지 않도록 다시 실행할 때 먼저 지운다 (정상 인덱스는 그대로 두어 재실행이 멱등하다).
+    invalid = op.get_bind().execute(
+        sa.text(
+            "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name AND pg_catalog.pg_table_is_visible(c.oid) AND NOT i.indisvalid",
+        ),
+        {"name": name},
+    ).first()
+    if invalid is not None:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 안에서 실행할 수 없으므로 autocommit 블록에서 만든다.
+    with op.get_context().autocommit_block():
+        _drop_if_invalid("ix_messages_conversation_id_created_at")
+        op.create_index(
+            "ix_messages_conversation_id_created_at",
+            "messages",
+            ["conversation_id", "created_at", "id"],
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        _drop_if_invalid("ix_conversations_unarchived_updated_at")
+        op.create_index(
+            "ix_conversations_unarchived_updated_at",
+            "conversations",
+            ["updated_at", "id"],
+            postgresql_where=sa.text("NOT is_archived"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_conversations_unarchived_updated_at",
+            table_name="conversations",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            "ix_messages_conversation_id_created_at",
+            table_name="messages",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0004_conversation_summaries"
+down_revision = "0003_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversation_summaries",
+        sa.Column(
+            "conversation_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("conversations.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("last_message_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_message_created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("conversation_summaries")
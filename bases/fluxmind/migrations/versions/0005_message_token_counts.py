@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005_message_token_counts"
+down_revision = "0004_conversation_summaries"
+branch_labels = None
+depends_on = None
+
+# 긴 트랜잭션/행 잠금을 피하기 위해 PK keyset으로 잘라 청크마다 커밋한다.
+_BACKFILL_CHUNK_SIZE = 10_000
+
+# fluxmind.domain_core.estimate_token_count 와 같은 근사치 (UTF-8 4바이트당 1토큰).
+_BACKFILL_MESSAGES = sa.text(
+    """
+    WITH chunk AS (
+        SELECT id FROM messages
+        WHERE id > :after
+        ORDER BY id
+        LIMIT :limit
+    ), filled AS (
+        UPDATE messages m
+        SET token_count = ceil(octet_length(m.content) / 4.0)::int
+        FROM chunk
+        WHERE m.id = chunk.id AND m.token_count IS NULL
+    )
+    SELECT id FROM chunk ORDER BY id DESC LIMIT 1
+    """
+)
+
+_BACKFILL_ANALYTICS = sa.text(
+    """
+    WITH chunk AS (
+        SELECT conversation_id FROM conversation_analytics
+        WHERE conversation_id > :after
+        ORDER BY conversation_id
+        LIMIT :limit
+    ), totals AS (
+        SELECT
+            m.conversation_id,
+            coalesce(sum(m.token_count) FILTER (WHERE m.role = 'user'), 0) AS user_tokens,
+            coalesce(sum(m.token_count) FILTER (WHERE m.role = 'assistant'), 0) AS assistant_tokens
+        FROM messages m
+        JOIN chunk USING (conversation_id)
+        GROUP BY m.conversation_id
+    ), filled AS (
+        UPDATE conversation_analytics a
+        SET user_token_count = totals.user_tokens,
+            assistant_token_count = totals.assistant_tokens
+        FROM totals
+        WHERE a.conversation_id = totals.conversation_id
+    )
+    SELECT conversation_id FROM chunk ORDER BY conversation_id DESC LIMIT 1
+    """
+)
+
+
+def _backfill(statement: sa.TextClause) -> None:
+    conn = op.get_bind()
+    after = "00000000-0000-0000-0000-000000000000"
+    while True:
+        last = conn.execute(statement, {"after": after, "limit": _BACKFILL_CHUNK_SIZE}).scalar()
+        if last is None:
+            break
+        after = last
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("token_count", sa.Integer(), nullable=True))
+    op.add_column(
+        "conversation_analytics",
+        sa.Column("user_token_count", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "conversation_analytics",
+        sa.Column("assistant_token_count", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # 이전 응답의 프롬프트 토큰 수는 기록된 적이 없으므로 0에서 시작한다.
+    op.add_column(
+        "conversation_analytics",
+        sa.Column("prompt_token_count", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+
+    with op.get_context().autocommit_block():
+        _backfill(_BACKFILL_MESSAGES)
+        _backfill(_BACKFILL_ANALYTICS)
+
+
+def downgrade() -> None:
+    op.drop_column("conversation_analytics", "prompt_token_count")
+    op.drop_column("conversation_analytics", "assistant_token_count")
+    op.drop_column("conversation_analytics", "user_token_count")
+    op.drop_column("messages", "token_count")
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision = "0008_analytics_replay"
+down_revision = "0007_outbox_events"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analytics_replay_totals",
+        sa.Column("replay_id", sa.Text(), primary_key=True),
+        sa.Column("conversation_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_message_count", sa.BigInteger(), nullable=False),
+        sa.Column("assistant_message_count", sa.BigInteger(), nullable=False),
+        sa.Column("user_token_count", sa.BigInteger(), nullable=False),
+        sa.Column("assistant_token_count", sa.BigInteger(), nullable=False),
+        sa.Column("prompt_token_count", sa.BigInteger(), nullable=False),
+        sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_table(
+        "analytics_replay_checkpoints",
+        sa.Column("replay_id", sa.Text(), primary_key=True),
+        sa.Column("partition", sa.Integer(), primary_key=True),
+        sa.Column("topic", sa.Text(), nullable=False),
+        sa.Column("next_offset", sa.BigInteger(), nullable=False),
+        sa.Column("end_offset", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("analytics_replay_checkpoints")
+    op.drop_table("analytics_replay_totals")
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0009_processed_event_leases"
+down_revision = "0008_analytics_replay"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("processed_events", sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True))
+    # 이전에는 claim만 기록했으므로 남아 있는 행은 처리된 것으로 본다.
+    op.execute("UPDATE processed_events SET completed_at = processed_at")
+
+
+def downgrade() -> None:
+    op.drop_column("processed_events", "completed_at")
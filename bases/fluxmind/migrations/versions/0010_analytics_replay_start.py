@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0010_analytics_replay_start"
+down_revision = "0009_processed_event_leases"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # 이전 replay의 시작 위치는 기록되지 않았으므로 기본값(처음부터)으로 본다.
+    op.add_column(
+        "analytics_replay_checkpoints",
+        sa.Column("from_beginning", sa.Boolean(), nullable=False, server_default=sa.true()),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("analytics_replay_checkpoints", "from_beginning")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import asyncio
+
+from fluxmind.database import get_session_maker
+from fluxmind.database.outbox_store import SqlAlchemyOutboxStore
+from fluxmind.mq import EventPublisher, OutboxRelay
+from fluxmind.mq.kafka import KafkaEventPublisher
+from fluxmind.platform import AppSettings, get_settings
+
+
+async def serve(settings: AppSettings, event_publisher: EventPublisher) -> None:
+    """outbox_events를 배치로 꺼내 발행한다. 여러 프로세스를 띄워도 SKIP LOCKED로 서로 다른 배치를 가져간다."""
+    store = SqlAlchemyOutboxStore(
+        get_session_maker(),
+        topic=settings.mq_topic_conversation_events,
+        max_attempts=settings.outbox_relay_max_attempts,
+    )
+    relay = OutboxRelay(
+        store,
+        event_publisher,
+        batch_size=settings.outbox_relay_batch_size,
+        poll_interval_ms=settings.outbox_relay_poll_interval_ms,
+    )
+    await relay.run()
+
+
+async def _main_async() -> None:
+    settings = get_settings()
+    # claim-check는 outbox에 기록할 때 이미 적용되어 있다.
+    event_publisher = KafkaEventPublisher.from_settings(settings)
+    try:
+        await serve(settings, event_publisher)
+    finally:
+        await event_publisher.stop()
+
+
+def main() -> None:
+    asyncio.run(_main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+
+import uvicorn
+from fluxmind.api.app import app
+from fluxmind.api.deps import get_event_publisher
+from fluxmind.database.outbox_store import OUTBOX_EVENT_TYPES
+from fluxmind.events_consumer.main import serve as serve_events_consumer
+from fluxmind.mq import (
+    ConsumerGroup,
+    EventCodecRegistry,
+    EventSubscriber,
+    InMemoryBroker,
+    InMemoryEventPublisher,
+    InMemoryEventSubscriber,
+)
+from fluxmind.outbox_relay.main import serve as serve_outbox_relay
+from fluxmind.platform import get_settings
+from fluxmind.worker.main import serve as serve_worker
+
+
+async def _main_async() -> None:
+    """
+    api, events_consumer, outbox relay, worker를 한 프로세스에서 InMemoryBroker로 연결해 돌린다.
+    Kafka 없이 작은 설치나 로컬 부하 테스트에 쓴다 (Postgres와 Ollama는 필요하다).
+    """
+    # in-process bus의 dead-letter topic은 읽거나 replay 할 수 없고, 아무도 읽지 않는 group을 두면
+    # bounded queue가 차서 publish()가 멈춘다. retry topic 없이 실패를 로그로 남기고 넘어간다
+    # (analytics 배치는 그 자리에서 다시 처리한다).
+    settings = get_settings().model_copy(update={"events_consumer_retry_enabled": False})
+    broker = InMemoryBroker(
+        partitions=settings.mq_memory_partitions,
+        max_queue_size=settings.mq_memory_max_queue_size,
+    )
+    # outbox relay가 기록된 payload를 디코드해서 bus에 넘긴다.
+    event_publisher = InMemoryEventPublisher(broker, codec=EventCodecRegistry(OUTBOX_EVENT_TYPES))
+
+    def subscriber_for(group: ConsumerGroup, event_types: dict) -> EventSubscriber:
+        # api가 첫 이벤트를 보내기 전에 group이 있어야 이벤트를 놓치지 않는다.
+        broker.declare(group.topic, group.group_id)
+        return InMemoryEventSubscriber(broker, group.group_id)
+
+    app.dependency_overrides[get_event_publisher] = lambda: event_publisher
+    server = uvicorn.Server(uvicorn.Config(app, host="0.0.0.0", port=settings.api_port))
+
+    consumers_ready = asyncio.Event()
+    tasks = [asyncio.create_task(serve_events_consumer(settings, event_publisher, subscriber_for, ready=consumers_ready))]
+    try:
+        await consumers_ready.wait()
+        tasks.append(asyncio.create_task(serve_outbox_relay(settings, event_publisher)))
+        tasks.append(asyncio.create_task(serve_worker(settings, event_publisher)))
+        tasks.append(asyncio.create_task(server.serve()))
+        # 어느 하나가 끝나면(api 종료 신호 또는 오류) 나머지도 멈춘다.
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await event_publisher.stop()
+
+
+def main() -> None:
+    asyncio.run(_main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from datetime import datetime, timedelta, timezone
 
 from fluxmind.conversation import ConversationService
 from fluxmind.database import get_session_maker
 from fluxmind.database.conversation_repository import SqlAlchemyConversationRepository
+from fluxmind.database.processed_event_store import SqlAlchemyProcessedEventStore
 from fluxmind.domain_core import ConversationArchivedEvent
 from fluxmind.mq import EventPublisher
 from fluxmind.mq.kafka import KafkaEventPublisher
-from fluxmind.platform import get_settings
+from fluxmind.platform import AppSettings, get_settings
 
 
 async def archive_old_conversations(
@@ -18,19 +20,37 @@ async def archive_old_conversations(
     *,
     older_than: datetime,
     topic: str,
+    chunk_size: int = 500,
+    max_per_second: float = 0.0,
 ) -> int:
-    old_convs = await conversation_service.list_old_unarchived(older_than, limit=100)
-
     archived_count = 0
-    for conv in old_convs:
-        archived = await conversation_service.archive_conversation(conv.id)
-        event = ConversationArchivedEvent(conversation_id=archived.id)
-        await event_publisher.publish(
-            topic=topic,
-            event=event,
-            partition_key=str(archived.id),
+    cursor = None
+
+    # 청크 단위로 backlog가 빌 때까지 반복한다. max_per_second > 0이면 처리량을 그 값으로 제한한다.
+    while True:
+        started = time.monotonic()
+        archived = await conversation_service.archive_older_than(
+            older_than,
+            limit=chunk_size,
+            after=cursor,
+        )
+        if not archived:
+            break
+
+        await event_publisher.publish_many(
+            topic,
+            [ConversationArchivedEvent(conversation_id=header.id) for header in archived],
+            partition_keys=[str(header.id) for header in archived],
         )
-        archived_count += 1
+        archived_count += len(archived)
+        cursor = archived[-1]
+
+        # SKIP LOCKED로 다른 트랜잭션이 잠근 행을 건너뛰면 청크가 짧아도 뒤에 행이 남아 있을 수 있으므로
+        # 빈 청크가 나올 때까지 계속한다.
+        if max_per_second > 0:
+            remaining = len(archived) / max_per_second - (time.monotonic() - started)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
 
     return archived_count
 
@@ -42,6 +62,10 @@ async def run_worker_loop(
     archive_interval_seconds: int,
     archive_older_than_days: int,
     topic: str,
+    archive_chunk_size: int = 500,
+    archive_max_per_second: float = 0.0,
+    processed_events: SqlAlchemyProcessedEventStore | None = None,
+    processed_events_retention_hours: int = 168,
 ) -> None:
     while True:
         try:
@@ -51,35 +75,56 @@ async def run_worker_loop(
                 event_publisher=event_publisher,
                 older_than=cutoff,
                 topic=topic,
+                chunk_size=archive_chunk_size,
+                max_per_second=archive_max_per_second,
             )
             if count > 0:
                 print(f"Archived {count} conversations older than {archive_older_than_days} days")
         except Exception as e:
             print(f"Error in archive job: {e}")
 
-        await asyncio.sleep(archive_interval_seconds)
+        if processed_events is not None:
+            try:
+                cutoff = datetime.now(timezone.utc) - timedelta(hours=processed_events_retention_hours)
+                pruned = await processed_events.prune(cutoff)
+                if pruned > 0:
+                    print(f"Pruned {pruned} processed event ids older than {processed_events_retention_hours} hours")
+            except Exception as e:
+                print(f"Error in processed events prune job: {e}")
 
+        await asyncio.sleep(archive_interval_seconds)
 
-async def _main_async() -> None:
-    settings = get_settings()
 
+async def serve(settings: AppSettings, event_publisher: EventPublisher) -> None:
     session_maker = get_session_maker()
     conversation_repo = SqlAlchemyConversationRepository(session_maker)
     conversation_service = ConversationService(conversation_repo)
-
-    event_publisher: EventPublisher = KafkaEventPublisher(
-        bootstrap_servers=settings.mq_bootstrap_servers,
-    )
+    processed_events = None
+    if settings.events_consumer_dedupe_store == "postgres":
+        processed_events = SqlAlchemyProcessedEventStore(session_maker, settings.mq_group_id_events_consumer)
 
     await run_worker_loop(
         conversation_service=conversation_service,
         event_publisher=event_publisher,
         archive_interval_seconds=settings.worker_archive_interval_seconds,
         archive_older_than_days=settings.worker_archive_older_than_days,
+        archive_chunk_size=settings.worker_archive_chunk_size,
+        archive_max_per_second=settings.worker_archive_max_per_second,
         topic=settings.mq_topic_conversation_events,
+        processed_events=processed_events,
+        processed_events_retention_hours=settings.events_consumer_dedupe_retention_hours,
     )
 
 
+async def _main_async() -> None:
+    settings = get_settings()
+    event_publisher = KafkaEventPublisher.from_settings(settings)
+    try:
+        await serve(settings, event_publisher)
+    finally:
+        await event_publisher.stop()
+
+
 def main() -> None:
     asyncio.run(_main_async())
 
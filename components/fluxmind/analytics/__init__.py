@@ -1,3 +1,11 @@
-from .service import AnalyticsRepository, AnalyticsService
+from .replay import AnalyticsReplayStore, MessageCountAggregator, ReplayCheckpoint
+from .service import AnalyticsRepository, AnalyticsService, MessageCountDelta
 
-__all__ = ["AnalyticsService", "AnalyticsRepository"]
+__all__ = [
+    "AnalyticsService",
+    "AnalyticsRepository",
+    "AnalyticsReplayStore",
+    "MessageCountAggregator",
+    "MessageCountDelta",
+    "ReplayCheckpoint",
+]
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Protocol
+from uuid import UUID
+
+from fluxmind.domain_core import ConversationId, MessageRole
+
+from .service import MessageCountDelta
+
+_USER = MessageRole.USER.value
+_UTC_SUFFIX = "+00:00"
+
+
+class MessageCountAggregator:
+    """
+    이벤트 로그를 다시 읽어 conversation_analytics를 재계산할 때 대화별 합계를 메모리에 모은다.
+
+    이벤트 객체 대신 EventCodecRegistry.decode_raw()가 돌려준 (event_type, data)를 받아 UUID/datetime 변환을
+    drain() 때 대화마다 한 번만 한다. 규칙은 AnalyticsService와 같다 (user 메시지와 assistant 응답만 센다).
+    """
+
+    def __init__(self) -> None:
+        # conversation_id 문자열 → [user, assistant, user_tokens, assistant_tokens, prompt_tokens, last_message_at(ISO, UTC)]
+        self._totals: dict[str, list[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def add(self, event_type: str | None, data: Mapping[str, Any]) -> None:
+        if event_type == "AssistantRespondedEvent":
+            index = 1
+        elif event_type == "MessageReceivedEvent" and data.get("role") == _USER:
+            index = 0
+        else:
+            return
+
+        occurred_at = data["occurred_at"]
+        if not occurred_at.endswith(_UTC_SUFFIX):
+            # 같은 UTC ISO 형식끼리는 문자열 비교가 시간 비교와 같으므로 다른 표기만 바꿔 둔다.
+            occurred_at = datetime.fromisoformat(occurred_at).astimezone(timezone.utc).isoformat()
+        totals = self._totals.get(data["conversation_id"])
+        if totals is None:
+            totals = self._totals[data["conversation_id"]] = [0, 0, 0, 0, 0, occurred_at]
+        totals[index] += 1
+        totals[index + 2] += data.get("token_count") or 0
+        if index == 1:
+            totals[4] += data.get("prompt_token_count") or 0
+        if occurred_at > totals[5]:
+            totals[5] = occurred_at
+
+    def drain(self) -> list[MessageCountDelta]:
+        totals, self._totals = self._totals, {}
+        return [
+            MessageCountDelta(
+                conversation_id=ConversationId(UUID(conversation_id)),
+                user_messages=user,
+                assistant_messages=assistant,
+                last_message_at=datetime.fromisoformat(last_message_at),
+                user_tokens=user_tokens,
+                assistant_tokens=assistant_tokens,
+                prompt_tokens=prompt_tokens,
+            )
+            for conversation_id, (
+                user,
+                assistant,
+                user_tokens,
+                assistant_tokens,
+                prompt_tokens,
+                last_message_at,
+            ) in totals.items()
+        ]
+
+
+@dataclass(slots=True)
+class ReplayCheckpoint:
+    """
+    replay가 읽을 범위. positions는 파티션별 다음에 읽을 offset, end_offsets는 멈출 offset(미포함).
+    from_beginning은 topic의 처음부터 읽기 시작했는지다 (--from-timestamp/--from-offset이면 False).
+    """
+
+    topic: str
+    positions: dict[int, int]
+    end_offsets: dict[int, int]
+    from_beginning: bool = True
+    updated_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def finished(self) -> bool:
+        return all(self.positions.get(partition, 0) >= end for partition, end in self.end_offsets.items())
+
+
+class AnalyticsReplayStore(Protocol):
+    """
+    replay 중간 결과(대화별 합계)와 checkpoint. save_progress()는 둘을 한 트랜잭션으로 기록하므로
+    중단된 replay는 checkpoint부터 다시 읽어도 이벤트를 두 번 세지 않는다.
+    """
+
+    async def load_checkpoint(self, replay_id: str) -> ReplayCheckpoint | None: ...
+
+    async def save_progress(
+        self,
+        replay_id: str,
+        deltas: Sequence[MessageCountDelta],
+        checkpoint: ReplayCheckpoint,
+    ) -> None: ...
+
+    async def count_totals(self, replay_id: str) -> int:
+        """지금까지 합계를 모은 대화 수."""
+        ...
+
+    async def replace_analytics(self, replay_id: str) -> int:
+        """
+        conversation_analytics를 replay 결과로 통째로 바꾸고 replay 기록을 지운다. 기록한 대화 수를 돌려준다.
+        처음부터 읽은 replay만 넘겨야 한다 (중간부터 읽은 결과로 바꾸면 그 전의 기록을 잃는다).
+        """
+        ...
+
+    async def discard(self, replay_id: str) -> None: ...
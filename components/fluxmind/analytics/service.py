@@ -1,10 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 from abc import ABC
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Protocol
+from typing import Protocol, Sequence
 
-from fluxmind.domain_core import AssistantRespondedEvent, ConversationId
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+
+
+@dataclass(slots=True)
+class MessageCountDelta:
+    conversation_id: ConversationId
+    user_messages: int
+    assistant_messages: int
+    last_message_at: datetime
+    user_tokens: int = 0
+    assistant_tokens: int = 0
+    # assistant 응답을 만들 때 LLM이 읽은 프롬프트 토큰 (history + 요약 + 시스템 프롬프트).
+    prompt_tokens: int = 0
+
+    def merge(self, other: MessageCountDelta) -> None:
+        self.user_messages += other.user_messages
+        self.assistant_messages += other.assistant_messages
+        self.user_tokens += other.user_tokens
+        self.assistant_tokens += other.assistant_tokens
+        self.prompt_tokens += other.prompt_tokens
+        self.last_message_at = max(self.last_message_at, other.last_message_at)
 
 
 class AnalyticsRepository(Protocol):
@@ -16,17 +44,143 @@ class AnalyticsRepository(Protocol):
         occurred_at: datetime,
     ) -> None: ...
 
+    async def apply_message_count_deltas(
+        self,
+        deltas: Sequence[MessageCountDelta],
+    ) -> None: ...
+
+
+def _delta(event: MessageReceivedEvent | AssistantRespondedEvent) -> MessageCountDelta | None:
+    if isinstance(event, AssistantRespondedEvent):
+        return MessageCountDelta(
+            conversation_id=event.conversation_id,
+            user_messages=0,
+            assistant_messages=1,
+            last_message_at=event.occurred_at,
+            assistant_tokens=event.token_count or 0,
+            prompt_tokens=event.prompt_token_count or 0,
+        )
+    if event.role != MessageRole.USER:
+        return None
+    return MessageCountDelta(
+        conversation_id=event.conversation_id,
+        user_messages=1,
+        assistant_messages=0,
+        last_message_at=event.occurred_at,
+        user_tokens=event.token_count or 0,
+    )
+
 
 class AnalyticsService(ABC):
-    def __init__(self, repository: AnalyticsRepository) -> None:
+    """
+    flush_interval_ms가 0이면 이벤트마다 바로 기록한다.
+    0보다 크면 대화별 증가분을 메모리에 모았다가 flush_interval_ms 또는
+    flush_max_events 마다 한 번의 multi-row upsert로 기록한다 (start()/stop() 필요).
+    버퍼 모드는 handle_message_received()/handle_assistant_responded()를 직접 부르는 경우에만 쓰인다.
+    handle_batch()는 버퍼와 상관없이 받은 이벤트를 대화별로 합쳐 바로 한 번에 기록하며,
+    events consumer는 이 경로만 쓴다.
+    """
+
+    def __init__(
+        self,
+        repository: AnalyticsRepository,
+        *,
+        flush_interval_ms: int = 0,
+        flush_max_events: int = 500,
+    ) -> None:
         self._repository = repository
+        self._flush_interval_ms = flush_interval_ms
+        self._flush_max_events = flush_max_events
+        self._pending: dict[ConversationId, MessageCountDelta] = {}
+        self._pending_events = 0
+        self._flush_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task[None] | None = None
+
+    @property
+    def buffered(self) -> bool:
+        return self._flush_interval_ms > 0
+
+    async def start(self) -> None:
+        if self.buffered and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flush_task
+            self._flush_task = None
+        await self.flush()
+
+    async def handle_message_received(
+        self,
+        event: MessageReceivedEvent,
+    ) -> None:
+        delta = _delta(event)
+        if delta is not None:
+            await self._record(delta)
 
     async def handle_assistant_responded(
         self,
         event: AssistantRespondedEvent,
     ) -> None:
-        await self._repository.increment_conversation_message_count(
-            conversation_id=event.conversation_id,
-            is_assistant=True,
-            occurred_at=event.occurred_at,
-        )
+        await self._record(_delta(event))
+
+    async def handle_batch(
+        self,
+        events: Sequence[MessageReceivedEvent | AssistantRespondedEvent],
+    ) -> None:
+        # consumer가 getmany()로 받은 배치: 한 트랜잭션의 multi-row upsert 한 번으로 기록한 뒤 ack 된다.
+        merged: dict[ConversationId, MessageCountDelta] = {}
+        for event in events:
+            delta = _delta(event)
+            if delta is None:
+                continue
+            existing = merged.get(delta.conversation_id)
+            if existing is None:
+                merged[delta.conversation_id] = delta
+            else:
+                existing.merge(delta)
+        if merged:
+            await self._repository.apply_message_count_deltas(list(merged.values()))
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            pending_events, self._pending_events = self._pending_events, 0
+            try:
+                await self._repository.apply_message_count_deltas(list(pending.values()))
+            except Exception:
+                # 실패한 증가분은 버리지 않고 다음 flush에서 다시 시도한다. 이벤트 수도 되돌려야
+                # flush_max_events에 닿았을 때 다시 flush 한다.
+                for delta in pending.values():
+                    self._merge(delta)
+                self._pending_events += pending_events
+                raise
+
+    async def _record(self, delta: MessageCountDelta) -> None:
+        if not self.buffered:
+            await self._repository.apply_message_count_deltas([delta])
+            return
+
+        self._merge(delta)
+        self._pending_events += 1
+        if self._pending_events >= self._flush_max_events:
+            await self.flush()
+
+    def _merge(self, delta: MessageCountDelta) -> None:
+        existing = self._pending.get(delta.conversation_id)
+        if existing is None:
+            self._pending[delta.conversation_id] = delta
+        else:
+            existing.merge(delta)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_ms / 1000)
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"Error flushing analytics: {e}")
@@ -0,0 +1,8 @@
+from .builder import ContextBuilder
+from .tokens import HeuristicTokenCounter, TokenCounter
+
+__all__ = [
+    "ContextBuilder",
+    "TokenCounter",
+    "HeuristicTokenCounter",
+]
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from typing import Mapping, Sequence
+
+from fluxmind.conversation import ConversationService
+from fluxmind.domain_core import ConversationId, Message, MessageCursor
+from fluxmind.llm import LLMMessage, LLMRole
+from fluxmind.summarization import ConversationSummary, SummaryRepository
+
+from .tokens import TokenCounter
+
+
+class ContextBuilder:
+    """
+    LLM 프롬프트 = system prompt + (rolling summary) + 토큰 예산 안에 들어가는 가장 최근 메시지들.
+
+    메시지는 page_size 단위로 최신부터 거꾸로 읽다가 예산을 넘거나 summary의
+    high-water mark에 닿는 순간 멈추므로 긴 대화에서도 필요한 만큼만 저장소에서
+    읽는다. 가장 최근 메시지는 예산과 관계없이 항상 포함한다.
+    """
+
+    def __init__(
+        self,
+        conversation_service: ConversationService,
+        token_counter: TokenCounter,
+        *,
+        default_budget: int,
+        model_budgets: Mapping[str, int] | None = None,
+        response_reserve: int = 0,
+        system_prompt: str | None = None,
+        page_size: int = 50,
+        summary_repository: SummaryRepository | None = None,
+    ) -> None:
+        self._conversation_service = conversation_service
+        self._token_counter = token_counter
+        self._default_budget = default_budget
+        self._model_budgets = dict(model_budgets or {})
+        self._response_reserve = response_reserve
+        self._system_prompt = system_prompt
+        self._page_size = page_size
+        self._summary_repository = summary_repository
+
+    def budget_for(self, model: str) -> int:
+        return self._model_budgets.get(model, self._default_budget)
+
+    async def build(
+        self,
+        conversation_id: ConversationId,
+        *,
+        model: str,
+    ) -> Sequence[LLMMessage]:
+        remaining = self.budget_for(model) - self._response_reserve
+        if self._system_prompt:
+            remaining -= self._token_counter.count_text(self._system_prompt)
+
+        summary: ConversationSummary | None = None
+        if self._summary_repository is not None:
+            summary = await self._summary_repository.get(conversation_id)
+        if summary is not None:
+            remaining -= self._token_counter.count_text(_summary_text(summary))
+
+        selected: list[Message] = []
+        before: MessageCursor | None = None
+        exhausted = False
+        while not exhausted:
+            page = await self._conversation_service.list_messages(
+                conversation_id,
+                limit=self._page_size,
+                before=before,
+            )
+            for message in reversed(page):
+                if summary is not None and _is_summarized(message, summary):
+                    exhausted = True
+                    break
+                cost = self._token_counter.count_message(message)
+                if selected and cost > remaining:
+                    exhausted = True
+                    break
+                selected.append(message)
+                remaining -= cost
+
+            if len(page) < self._page_size:
+                break
+            before = MessageCursor.of(page[0])
+
+        if not selected and summary is None:
+            raise LookupError(f"Conversation not found: {conversation_id}")
+
+        history = [LLMMessage(role=LLMRole.SYSTEM, content=self._system_prompt)] if self._system_prompt else []
+        if summary is not None:
+            history.append(LLMMessage(role=LLMRole.SYSTEM, content=_summary_text(summary)))
+        history.extend(
+            LLMMessage(
+                role=LLMRole(msg.role.value),
+                content=msg.content,
+            )
+            for msg in reversed(selected)
+        )
+        return history
+
+
+def _summary_text(summary: ConversationSummary) -> str:
+    return f"Summary of the earlier conversation:\n{summary.content}"
+
+
+def _is_summarized(message: Message, summary: ConversationSummary) -> bool:
+    hwm = summary.last_message
+    return (message.created_at, message.id) <= (hwm.created_at, hwm.id)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Protocol
+
+from fluxmind.domain_core import Message, MessageId, estimate_token_count
+
+# 메시지마다 role/구분자 토큰이 붙는다 (chat template 오버헤드 근사치).
+_PER_MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter(Protocol):
+    def count_text(self, text: str) -> int: ...
+
+    def count_message(self, message: Message) -> int: ...
+
+
+class HeuristicTokenCounter(TokenCounter):
+    """
+    토크나이저 없이 쓰는 근사 카운터: UTF-8 4바이트당 1토큰 + 메시지 오버헤드.
+
+    쓰기 시점에 저장된 message.token_count가 있으면 본문을 다시 세지 않는다.
+    없는 (backfill 전) 메시지는 message id 기준으로 결과를 LRU 캐시해 한 번만 센다.
+    """
+
+    def __init__(self, *, bytes_per_token: float = 4.0, cache_size: int = 100_000) -> None:
+        self._bytes_per_token = bytes_per_token
+        self._cache_size = cache_size
+        self._cache: OrderedDict[MessageId, int] = OrderedDict()
+
+    def count_text(self, text: str) -> int:
+        return estimate_token_count(text, bytes_per_token=self._bytes_per_token)
+
+    def count_message(self, message: Message) -> int:
+        if message.token_count is not None:
+            return message.token_count + _PER_MESSAGE_OVERHEAD_TOKENS
+
+        cached = self._cache.get(message.id)
+        if cached is not None:
+            self._cache.move_to_end(message.id)
+            return cached
+
+        count = self.count_text(message.content) + _PER_MESSAGE_OVERHEAD_TOKENS
+        self._cache[message.id] = count
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return count
@@ -1,6 +1,10 @@
-from .service import ConversationRepository, ConversationService
+from .cache import CacheStats, CachingConversationRepository
+from .service import ConversationRepository, ConversationService, OutboxEventFactory
 
 __all__ = [
     "ConversationService",
     "ConversationRepository",
+    "CachingConversationRepository",
+    "CacheStats",
+    "OutboxEventFactory",
 ]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Sequence
+
+from fluxmind.domain_core import (
+    BaseEvent,
+    Conversation,
+    ConversationHeader,
+    ConversationId,
+    Message,
+    MessageRole,
+)
+
+from .delegating import DelegatingConversationRepository
+from .service import ConversationRepository, OutboxEventFactory
+
+# 메시지/대화 객체 자체의 대략적인 오버헤드 (bytes). 정확한 값보다 상한 관리용 추정치다.
+_MESSAGE_OVERHEAD_BYTES = 256
+_CONVERSATION_OVERHEAD_BYTES = 512
+
+
+@dataclass(slots=True, frozen=True)
+class CacheStats:
+    hits: int
+    misses: int
+    stale: int
+    evictions: int
+    entries: int
+    size_bytes: int
+
+
+@dataclass(slots=True)
+class _Entry:
+    conversation: Conversation
+    version: tuple[datetime, bool]
+    size_bytes: int
+    expires_at: float
+
+
+def _version(conversation: Conversation | ConversationHeader) -> tuple[datetime, bool]:
+    return (conversation.updated_at, conversation.is_archived)
+
+
+def _estimate_size(conversation: Conversation) -> int:
+    return _CONVERSATION_OVERHEAD_BYTES + sum(
+        _MESSAGE_OVERHEAD_BYTES + len(msg.content.encode("utf-8")) for msg in conversation.messages
+    )
+
+
+class CachingConversationRepository(DelegatingConversationRepository):
+    """
+    ConversationRepository 앞단의 in-process read-through LRU 캐시.
+
+    get()은 캐시된 대화를 돌려주기 전에 get_header()로 (updated_at, is_archived)를
+    확인하므로, 다른 프로세스가 메시지를 추가했더라도 오래된 대화를 반환하지 않는다.
+    save()/append_message()/archive_older_than()은 해당 항목을 무효화한다.
+    캐시 크기는 메시지 본문 기준 추정 바이트로 제한하고 TTL이 지난 항목은 버린다.
+
+    hit에도 get_header() 한 번은 필요하므로 전체 대화를 자주 다시 읽는 경로에서만 이득이다.
+    API/consumer의 요청 경로는 get()을 쓰지 않아 conversation_cache_max_bytes 기본값(0)으로 꺼 둔다.
+    """
+
+    def __init__(
+        self,
+        inner: ConversationRepository,
+        *,
+        max_bytes: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(inner)
+        self._max_bytes = max_bytes
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[ConversationId, _Entry] = OrderedDict()
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale = 0
+        self._evictions = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            stale=self._stale,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size_bytes=self._size_bytes,
+        )
+
+    def invalidate(self, conversation_id: ConversationId) -> None:
+        entry = self._entries.pop(conversation_id, None)
+        if entry is not None:
+            self._size_bytes -= entry.size_bytes
+
+    async def get(self, conversation_id: ConversationId) -> Conversation | None:
+        entry = self._entries.get(conversation_id)
+        if entry is not None:
+            if entry.expires_at <= self._clock():
+                self.invalidate(conversation_id)
+            else:
+                header = await self._inner.get_header(conversation_id)
+                if header is not None and _version(header) == entry.version:
+                    self._hits += 1
+                    self._entries.move_to_end(conversation_id)
+                    return entry.conversation.copy()
+                self._stale += 1
+                self.invalidate(conversation_id)
+                if header is None:
+                    return None
+
+        self._misses += 1
+        conversation = await self._inner.get(conversation_id)
+        if conversation is not None:
+            self._store(conversation)
+        return conversation
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None:
+        self.invalidate(conversation.id)
+        await super().save(conversation, outbox=outbox)
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message | None:
+        self.invalidate(conversation_id)
+        return await super().append_message(conversation_id, role, content, token_count=token_count, outbox=outbox)
+
+    async def archive_older_than(
+        self,
+        older_than: datetime,
+        *,
+        limit: int,
+        after: ConversationHeader | None = None,
+    ) -> Sequence[ConversationHeader]:
+        archived = await self._inner.archive_older_than(older_than, limit=limit, after=after)
+        for header in archived:
+            self.invalidate(header.id)
+        return archived
+
+    def _store(self, conversation: Conversation) -> None:
+        size_bytes = _estimate_size(conversation)
+        if size_bytes > self._max_bytes:
+            return
+
+        self.invalidate(conversation.id)
+        self._entries[conversation.id] = _Entry(
+            conversation=conversation.copy(),
+            version=_version(conversation),
+            size_bytes=size_bytes,
+            expires_at=self._clock() + self._ttl_seconds,
+        )
+        self._size_bytes += size_bytes
+        self._evict_over_budget()
+
+    def _evict_over_budget(self) -> None:
+        while self._size_bytes > self._max_bytes and self._entries:
+            _, evicted = self._entries.popitem(last=False)
+            self._size_bytes -= evicted.size_bytes
+            self._evictions += 1
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Sequence
+
+from fluxmind.domain_core import (
+    BaseEvent,
+    Conversation,
+    ConversationHeader,
+    ConversationId,
+    Message,
+    MessageCursor,
+    MessageRole,
+)
+
+from .service import ConversationRepository, OutboxEventFactory
+
+
+class DelegatingConversationRepository(ConversationRepository):
+    """모든 호출을 inner 저장소로 넘기는 decorator 베이스. 필요한 메서드만 override 한다."""
+
+    def __init__(self, inner: ConversationRepository) -> None:
+        self._inner = inner
+
+    async def get(self, conversation_id: ConversationId) -> Conversation | None:
+        return await self._inner.get(conversation_id)
+
+    async def get_header(self, conversation_id: ConversationId) -> ConversationHeader | None:
+        return await self._inner.get_header(conversation_id)
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None:
+        await self._inner.save(conversation, outbox=outbox)
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message | None:
+        return await self._inner.append_message(
+            conversation_id,
+            role,
+            content,
+            token_count=token_count,
+            outbox=outbox,
+        )
+
+    async def list_messages(
+        self,
+        conversation_id: ConversationId,
+        limit: int | None = None,
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> Sequence[Message]:
+        return await self._inner.list_messages(conversation_id, limit, before=before, after=after)
+
+    async def list_old_unarchived(
+        self,
+        older_than: datetime,
+        *,
+        limit: int = 100,
+    ) -> Sequence[Conversation]:
+        return await self._inner.list_old_unarchived(older_than, limit=limit)
+
+    async def list_old_unarchived_headers(
+        self,
+        older_than: datetime,
+        *,
+        limit: int = 100,
+    ) -> Sequence[ConversationHeader]:
+        return await self._inner.list_old_unarchived_headers(older_than, limit=limit)
+
+    async def get_many(
+        self,
+        conversation_ids: Sequence[ConversationId],
+    ) -> Sequence[Conversation]:
+        return await self._inner.get_many(conversation_ids)
+
+    async def archive_older_than(
+        self,
+        older_than: datetime,
+        *,
+        limit: int,
+        after: ConversationHeader | None = None,
+    ) -> Sequence[ConversationHeader]:
+        return await self._inner.archive_older_than(older_than, limit=limit, after=after)
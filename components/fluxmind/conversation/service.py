@@ -1,27 +1,56 @@
 from __future__ import annotations
 
 from abc import ABC
+from collections.abc import Callable
 from datetime import datetime
 from typing import Protocol, Sequence
 
 from fluxmind.domain_core import (
+    BaseEvent,
     Conversation,
+    ConversationHeader,
     ConversationId,
     Message,
+    MessageCursor,
     MessageRole,
+    estimate_token_count,
+    message_received_event,
     new_conversation,
 )
 
+# 추가된 메시지로 outbox에 남길 이벤트를 만든다 (메시지 id는 저장소가 정한다).
+OutboxEventFactory = Callable[[Message], Sequence[BaseEvent]]
+
 
 class ConversationRepository(Protocol):
+    """
+    save()/append_message()에 outbox를 넘기면 그 이벤트를 같은 트랜잭션에서 outbox에 기록한다.
+    데이터가 커밋된 이벤트만 relay가 발행하므로 커밋 후 발행이 실패해 이벤트를 잃는 일이 없다.
+    """
+
     async def get(self, conversation_id: ConversationId) -> Conversation | None: ...
 
-    async def save(self, conversation: Conversation) -> None: ...
+    async def get_header(self, conversation_id: ConversationId) -> ConversationHeader | None: ...
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None: ...
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message | None: ...
 
     async def list_messages(
         self,
         conversation_id: ConversationId,
         limit: int | None = None,
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
     ) -> Sequence[Message]: ...
 
     async def list_old_unarchived(
@@ -31,6 +60,26 @@ class ConversationRepository(Protocol):
         limit: int = 100,
     ) -> Sequence[Conversation]: ...
 
+    async def list_old_unarchived_headers(
+        self,
+        older_than: datetime,
+        *,
+        limit: int = 100,
+    ) -> Sequence[ConversationHeader]: ...
+
+    async def get_many(
+        self,
+        conversation_ids: Sequence[ConversationId],
+    ) -> Sequence[Conversation]: ...
+
+    async def archive_older_than(
+        self,
+        older_than: datetime,
+        *,
+        limit: int,
+        after: ConversationHeader | None = None,
+    ) -> Sequence[ConversationHeader]: ...
+
 
 class ConversationService(ABC):
     def __init__(self, repository: ConversationRepository) -> None:
@@ -39,30 +88,37 @@ class ConversationService(ABC):
     async def create_conversation(
         self,
         initial_user_message: str | None = None,
+        *,
+        emit_events: bool = False,
     ) -> Conversation:
+        """emit_events=True면 첫 메시지의 MessageReceivedEvent를 대화와 같은 트랜잭션으로 outbox에 남긴다."""
         conv = new_conversation(initial_user_message)
-        await self._repository.save(conv)
+        outbox = [message_received_event(conv.messages[-1])] if emit_events and conv.messages else []
+        await self._repository.save(conv, outbox=outbox)
         return conv
 
     async def add_user_message(
         self,
         conversation_id: ConversationId,
         content: str,
+        *,
+        token_count: int | None = None,
+        emit_events: bool = False,
     ) -> Message:
-        conv = await self._require_conversation(conversation_id)
-        message = conv.add_message(MessageRole.USER, content)
-        await self._repository.save(conv)
-        return message
+        """emit_events=True면 메시지와 같은 트랜잭션으로 MessageReceivedEvent를 outbox에 남긴다."""
+        outbox = _received_event if emit_events else None
+        return await self._append_message(conversation_id, MessageRole.USER, content, token_count, outbox)
 
     async def add_assistant_message(
         self,
         conversation_id: ConversationId,
         content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
     ) -> Message:
-        conv = await self._require_conversation(conversation_id)
-        message = conv.add_message(MessageRole.ASSISTANT, content)
-        await self._repository.save(conv)
-        return message
+        """outbox를 넘기면 그것이 만든 이벤트(AssistantRespondedEvent 등)를 메시지와 같은 트랜잭션으로 outbox에 남긴다."""
+        return await self._append_message(conversation_id, MessageRole.ASSISTANT, content, token_count, outbox)
 
     async def get_conversation(
         self,
@@ -70,14 +126,29 @@ class ConversationService(ABC):
     ) -> Conversation:
         return await self._require_conversation(conversation_id)
 
+    async def get_conversation_header(
+        self,
+        conversation_id: ConversationId,
+    ) -> ConversationHeader:
+        """메시지 없이 대화가 있는지만 확인할 때 쓴다."""
+        header = await self._repository.get_header(conversation_id)
+        if header is None:
+            raise LookupError(f"Conversation not found: {conversation_id}")
+        return header
+
     async def list_messages(
         self,
         conversation_id: ConversationId,
         limit: int | None = None,
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
     ) -> Sequence[Message]:
         return await self._repository.list_messages(
             conversation_id=conversation_id,
             limit=limit,
+            before=before,
+            after=after,
         )
 
     async def archive_conversation(
@@ -100,6 +171,52 @@ class ConversationService(ABC):
             limit=limit,
         )
 
+    async def list_old_unarchived_headers(
+        self,
+        older_than: datetime,
+        *,
+        limit: int = 100,
+    ) -> Sequence[ConversationHeader]:
+        return await self._repository.list_old_unarchived_headers(
+            older_than=older_than,
+            limit=limit,
+        )
+
+    async def archive_older_than(
+        self,
+        older_than: datetime,
+        *,
+        limit: int,
+        after: ConversationHeader | None = None,
+    ) -> Sequence[ConversationHeader]:
+        return await self._repository.archive_older_than(
+            older_than=older_than,
+            limit=limit,
+            after=after,
+        )
+
+    async def _append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        token_count: int | None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message:
+        # 토큰 수는 쓰기 시점에 한 번만 센다. LLM이 실제 값을 알려주면 그 값을 그대로 쓴다.
+        if token_count is None:
+            token_count = estimate_token_count(content)
+        message = await self._repository.append_message(
+            conversation_id,
+            role,
+            content,
+            token_count=token_count,
+            outbox=outbox,
+        )
+        if message is None:
+            raise LookupError(f"Conversation not found: {conversation_id}")
+        return message
+
     async def _require_conversation(
         self,
         conversation_id: ConversationId,
@@ -108,3 +225,7 @@ class ConversationService(ABC):
         if conv is None:
             raise LookupError(f"Conversation not found: {conversation_id}")
         return conv
+
+
+def _received_event(message: Message) -> Sequence[BaseEvent]:
+    return [message_received_event(message)]
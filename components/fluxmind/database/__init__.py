@@ -1,3 +1,4 @@
-from .session import AsyncSessionMaker, get_async_session, get_session_maker
+from .pool import PoolMetrics
+from .session import AsyncSessionMaker, get_async_session, get_pool_metrics, get_session_maker
 
-__all__ = ["get_async_session", "AsyncSessionMaker", "get_session_maker"]
+__all__ = ["get_async_session", "AsyncSessionMaker", "get_session_maker", "get_pool_metrics", "PoolMetrics"]
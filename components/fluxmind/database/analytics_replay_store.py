@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fluxmind.analytics import AnalyticsReplayStore, MessageCountDelta, ReplayCheckpoint
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import AnalyticsReplayCheckpointRow, AnalyticsReplayTotalRow, ConversationAnalyticsRow
+from .session import AsyncSessionMaker
+
+_STAGING_TABLE = "analytics_replay_staging"
+_STAGING_COLUMNS = (
+    "conversation_id",
+    "user_message_count",
+    "assistant_message_count",
+    "user_token_count",
+    "assistant_token_count",
+    "prompt_token_count",
+    "last_message_at",
+)
+
+
+class SqlAlchemyAnalyticsReplayStore(AnalyticsReplayStore):
+    """
+    analytics_replay_totals / analytics_replay_checkpoints 테이블.
+
+    save_progress()는 합계를 COPY로 임시 테이블에 넣은 뒤 INSERT ... SELECT ... ON CONFLICT 한 문장으로 더한다.
+    대화 수만 개짜리 배치를 VALUES로 보내는 것보다 훨씬 빠르고, checkpoint도 같은 트랜잭션에서 기록한다.
+    """
+
+    def __init__(self, session_maker: AsyncSessionMaker) -> None:
+        self._session_maker = session_maker
+
+    async def load_checkpoint(self, replay_id: str) -> ReplayCheckpoint | None:
+        stmt = select(AnalyticsReplayCheckpointRow).where(AnalyticsReplayCheckpointRow.replay_id == replay_id)
+        async with self._session_maker() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+        if not rows:
+            return None
+        return ReplayCheckpoint(
+            topic=rows[0].topic,
+            positions={row.partition: row.next_offset for row in rows},
+            end_offsets={row.partition: row.end_offset for row in rows},
+            from_beginning=rows[0].from_beginning,
+            updated_at=max(row.updated_at for row in rows),
+        )
+
+    async def save_progress(
+        self,
+        replay_id: str,
+        deltas: Sequence[MessageCountDelta],
+        checkpoint: ReplayCheckpoint,
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        async with self._session_maker() as session:
+            if deltas:
+                await self._add_totals(session, replay_id, deltas)
+
+            stmt = pg_insert(AnalyticsReplayCheckpointRow).values(
+                [
+                    {
+                        "replay_id": replay_id,
+                        "partition": partition,
+                        "topic": checkpoint.topic,
+                        "next_offset": checkpoint.positions.get(partition, 0),
+                        "end_offset": end_offset,
+                        "from_beginning": checkpoint.from_beginning,
+                        "updated_at": now,
+                    }
+                    for partition, end_offset in sorted(checkpoint.end_offsets.items())
+                ],
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[AnalyticsReplayCheckpointRow.replay_id, AnalyticsReplayCheckpointRow.partition],
+                set_={"next_offset": stmt.excluded.next_offset, "updated_at": stmt.excluded.updated_at},
+            )
+            await session.execute(stmt)
+            await session.commit()
+
+    async def _add_totals(self, session: AsyncSession, replay_id: str, deltas: Sequence[MessageCountDelta]) -> None:
+        await session.execute(
+            text(
+                f"CREATE TEMP TABLE IF NOT EXISTS {_STAGING_TABLE} "
+                "(conversation_id uuid, user_message_count bigint, assistant_message_count bigint, "
+                "user_token_count bigint, assistant_token_count bigint, prompt_token_count bigint, "
+                "last_message_at timestamptz) "
+                "ON COMMIT DELETE ROWS",
+            ),
+        )
+        # SQLAlchemy에는 COPY가 없으므로 같은 트랜잭션의 asyncpg 연결을 꺼내 쓴다.
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            _STAGING_TABLE,
+            records=[
+                (
+                    UUID(str(delta.conversation_id)),
+                    delta.user_messages,
+                    delta.assistant_messages,
+                    delta.user_tokens,
+                    delta.assistant_tokens,
+                    delta.prompt_tokens,
+                    delta.last_message_at,
+                )
+                for delta in deltas
+            ],
+            columns=_STAGING_COLUMNS,
+        )
+        await session.execute(
+            text(
+                f"INSERT INTO analytics_replay_totals (replay_id, {', '.join(_STAGING_COLUMNS)}) "
+                f"SELECT :replay_id, {', '.join(_STAGING_COLUMNS)} FROM {_STAGING_TABLE} ORDER BY conversation_id "
+                "ON CONFLICT (replay_id, conversation_id) DO UPDATE SET "
+                "user_message_count = analytics_replay_totals.user_message_count + excluded.user_message_count, "
+                "assistant_message_count = analytics_replay_totals.assistant_message_count "
+                "+ excluded.assistant_message_count, "
+                "user_token_count = analytics_replay_totals.user_token_count + excluded.user_token_count, "
+                "assistant_token_count = analytics_replay_totals.assistant_token_count "
+                "+ excluded.assistant_token_count, "
+                "prompt_token_count = analytics_replay_totals.prompt_token_count + excluded.prompt_token_count, "
+                "last_message_at = greatest(analytics_replay_totals.last_message_at, excluded.last_message_at)",
+            ),
+            {"replay_id": replay_id},
+        )
+
+    async def replace_analytics(self, replay_id: str) -> int:
+        async with self._session_maker() as session:
+            # 실시간 consumer가 쓰는 중이면 잠금을 기다리도록 TRUNCATE 대신 같은 트랜잭션의 DELETE를 쓴다.
+            await session.execute(delete(ConversationAnalyticsRow))
+            result = await session.execute(
+                text(
+                    f"INSERT INTO conversation_analytics ({', '.join(_STAGING_COLUMNS)}) "
+                    f"SELECT {', '.join(_STAGING_COLUMNS)} FROM analytics_replay_totals WHERE replay_id = :replay_id",
+                ),
+                {"replay_id": replay_id},
+            )
+            await self._delete(session, replay_id)
+            await session.commit()
+        return result.rowcount
+
+    async def discard(self, replay_id: str) -> None:
+        async with self._session_maker() as session:
+            await self._delete(session, replay_id)
+            await session.commit()
+
+    async def count_totals(self, replay_id: str) -> int:
+        stmt = select(func.count()).where(AnalyticsReplayTotalRow.replay_id == replay_id)
+        async with self._session_maker() as session:
+            return (await session.execute(stmt)).scalar_one()
+
+    async def _delete(self, session: AsyncSession, replay_id: str) -> None:
+        await session.execute(delete(AnalyticsReplayTotalRow).where(AnalyticsReplayTotalRow.replay_id == replay_id))
+        await session.execute(
+            delete(AnalyticsReplayCheckpointRow).where(AnalyticsReplayCheckpointRow.replay_id == replay_id),
+        )
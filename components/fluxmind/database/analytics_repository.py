@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Sequence
 from uuid import UUID
 
-from fluxmind.analytics import AnalyticsRepository
+from fluxmind.analytics import AnalyticsRepository, MessageCountDelta
 from fluxmind.domain_core import ConversationId
-from sqlalchemy import insert, select, update
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from .models import ConversationAnalyticsRow
 from .session import AsyncSessionMaker
@@ -22,36 +24,73 @@ class SqlAlchemyAnalyticsRepository(AnalyticsRepository):
         is_assistant: bool,
         occurred_at: datetime,
     ) -> None:
-        conv_id = UUID(str(conversation_id))
-        async with self._session_maker() as session:
-            row = (
-                await session.execute(
-                    select(ConversationAnalyticsRow).where(
-                        ConversationAnalyticsRow.conversation_id == conv_id,
-                    ),
-                )
-            ).scalar_one_or_none()
-
-            if row is None:
-                user_count = 0
-                assistant_count = 1 if is_assistant else 0
-                await session.execute(
-                    insert(ConversationAnalyticsRow).values(
-                        conversation_id=conv_id,
-                        user_message_count=user_count,
-                        assistant_message_count=assistant_count,
-                        last_message_at=occurred_at,
-                    ),
-                )
+        await self.apply_message_count_deltas(
+            [
+                MessageCountDelta(
+                    conversation_id=conversation_id,
+                    user_messages=0 if is_assistant else 1,
+                    assistant_messages=1 if is_assistant else 0,
+                    last_message_at=occurred_at,
+                ),
+            ],
+        )
+
+    async def apply_message_count_deltas(
+        self,
+        deltas: Sequence[MessageCountDelta],
+    ) -> None:
+        if not deltas:
+            return
+
+        # 한 문장 안에서 같은 conversation_id가 두 번 나오면 ON CONFLICT가 실패하므로 먼저 합친다.
+        # 정렬해 두면 여러 consumer가 동시에 upsert 해도 행 잠금 순서가 같아 deadlock이 나지 않는다.
+        merged: dict[UUID, MessageCountDelta] = {}
+        for delta in deltas:
+            conv_id = UUID(str(delta.conversation_id))
+            if conv_id in merged:
+                merged[conv_id].merge(delta)
             else:
-                await session.execute(
-                    update(ConversationAnalyticsRow)
-                    .where(ConversationAnalyticsRow.conversation_id == conv_id)
-                    .values(
-                        assistant_message_count=ConversationAnalyticsRow.assistant_message_count
-                        + (1 if is_assistant else 0),
-                        last_message_at=occurred_at,
-                    ),
+                merged[conv_id] = MessageCountDelta(
+                    conversation_id=delta.conversation_id,
+                    user_messages=delta.user_messages,
+                    assistant_messages=delta.assistant_messages,
+                    last_message_at=delta.last_message_at,
+                    user_tokens=delta.user_tokens,
+                    assistant_tokens=delta.assistant_tokens,
+                    prompt_tokens=delta.prompt_tokens,
                 )
 
+        stmt = pg_insert(ConversationAnalyticsRow).values(
+            [
+                {
+                    "conversation_id": conv_id,
+                    "user_message_count": delta.user_messages,
+                    "assistant_message_count": delta.assistant_messages,
+                    "user_token_count": delta.user_tokens,
+                    "assistant_token_count": delta.assistant_tokens,
+                    "prompt_token_count": delta.prompt_tokens,
+                    "last_message_at": delta.last_message_at,
+                }
+                for conv_id, delta in sorted(merged.items())
+            ],
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConversationAnalyticsRow.conversation_id],
+            set_={
+                "user_message_count": ConversationAnalyticsRow.user_message_count + stmt.excluded.user_message_count,
+                "assistant_message_count": ConversationAnalyticsRow.assistant_message_count
+                + stmt.excluded.assistant_message_count,
+                "user_token_count": ConversationAnalyticsRow.user_token_count + stmt.excluded.user_token_count,
+                "assistant_token_count": ConversationAnalyticsRow.assistant_token_count
+                + stmt.excluded.assistant_token_count,
+                "prompt_token_count": ConversationAnalyticsRow.prompt_token_count + stmt.excluded.prompt_token_count,
+                "last_message_at": func.greatest(
+                    ConversationAnalyticsRow.last_message_at,
+                    stmt.excluded.last_message_at,
+                ),
+            },
+        )
+
+        async with self._session_maker() as session:
+            await session.execute(stmt)
             await session.commit()
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from fluxmind.mq import ClaimCheck, ContentStore, FileContentStore
+from fluxmind.platform import AppSettings
+from sqlalchemy import select
+
+from .models import MessageRow
+from .session import AsyncSessionMaker
+
+
+class SqlAlchemyMessageContentStore(ContentStore):
+    """
+    claim-check key(message id)로 messages.content를 읽는 ContentStore.
+
+    이벤트를 보내기 전에 메시지는 이미 messages 테이블에 저장되어 있으므로
+    put()은 아무것도 쓰지 않는다. 본문은 Postgres에 한 번만 저장된다.
+    """
+
+    def __init__(self, session_maker: AsyncSessionMaker) -> None:
+        self._session_maker = session_maker
+
+    async def put(self, key: str, content: str) -> None:
+        return None
+
+    async def get(self, key: str) -> str | None:
+        async with self._session_maker() as session:
+            return (
+                await session.execute(select(MessageRow.content).where(MessageRow.id == UUID(key)))
+            ).scalar_one_or_none()
+
+
+def build_claim_check(settings: AppSettings, session_maker: AsyncSessionMaker) -> ClaimCheck | None:
+    if settings.mq_claim_check_threshold_bytes <= 0:
+        return None
+    store: ContentStore
+    if settings.mq_claim_check_store == "file":
+        store = FileContentStore(settings.mq_claim_check_dir)
+    else:
+        store = SqlAlchemyMessageContentStore(session_maker)
+    return ClaimCheck(store, threshold_bytes=settings.mq_claim_check_threshold_bytes)
@@ -4,20 +4,38 @@ from datetime import datetime
 from typing import Sequence
 from uuid import UUID
 
-from fluxmind.conversation import ConversationRepository
+from fluxmind.conversation import ConversationRepository, OutboxEventFactory
 from fluxmind.domain_core import (
+    BaseEvent,
     Conversation,
+    ConversationHeader,
     ConversationId,
     Message,
+    MessageCursor,
     MessageId,
+    MessageRole,
+    new_message,
 )
-from sqlalchemy import delete, select
+from sqlalchemy import Row, insert, literal, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import ConversationRow, MessageRow
+from .outbox_store import SqlAlchemyOutboxStore
 from .session import AsyncSessionMaker
 
 
+def _row_to_domain_message(row: MessageRow) -> Message:
+    return Message(
+        id=MessageId(row.id),
+        conversation_id=ConversationId(row.conversation_id),
+        role=row.role,
+        content=row.content,
+        created_at=row.created_at,
+        token_count=row.token_count,
+    )
+
+
 def _row_to_domain_conversation(row: ConversationRow, messages: Sequence[MessageRow]) -> Conversation:
     conv = Conversation(
         id=ConversationId(row.id),
@@ -26,21 +44,32 @@ def _row_to_domain_conversation(row: ConversationRow, messages: Sequence[Message
         updated_at=row.updated_at,
     )
     for msg_row in messages:
-        conv.messages.append(
-            Message(
-                id=MessageId(msg_row.id),
-                conversation_id=ConversationId(msg_row.conversation_id),
-                role=msg_row.role,
-                content=msg_row.content,
-                created_at=msg_row.created_at,
-            ),
-        )
+        conv.messages.append(_row_to_domain_message(msg_row))
+    conv.mark_persisted()
     return conv
 
 
+_HEADER_COLUMNS = (
+    ConversationRow.id,
+    ConversationRow.is_archived,
+    ConversationRow.created_at,
+    ConversationRow.updated_at,
+)
+
+
+def _row_to_header(row: Row) -> ConversationHeader:
+    return ConversationHeader(
+        id=ConversationId(row.id),
+        is_archived=row.is_archived,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+    )
+
+
 class SqlAlchemyConversationRepository(ConversationRepository):
-    def __init__(self, session_maker: AsyncSessionMaker) -> None:
+    def __init__(self, session_maker: AsyncSessionMaker, *, outbox: SqlAlchemyOutboxStore | None = None) -> None:
         self._session_maker = session_maker
+        self._outbox = outbox
 
     async def get(self, conversation_id: ConversationId) -> Conversation | None:
         async with self._session_maker() as session:
@@ -60,20 +89,99 @@ class SqlAlchemyConversationRepository(ConversationRepository):
 
             return _row_to_domain_conversation(row, messages)
 
-    async def save(self, conversation: Conversation) -> None:
+    async def get_header(self, conversation_id: ConversationId) -> ConversationHeader | None:
+        async with self._session_maker() as session:
+            row = (
+                await session.execute(
+                    select(*_HEADER_COLUMNS).where(ConversationRow.id == UUID(str(conversation_id)))
+                )
+            ).one_or_none()
+        return _row_to_header(row) if row is not None else None
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None:
         async with self._session_maker() as session:
             await self._upsert_conversation(session, conversation)
+            await self._add_to_outbox(session, outbox)
+            await session.commit()
+        conversation.mark_persisted()
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message | None:
+        conv_id = UUID(str(conversation_id))
+        message = new_message(conversation_id, role, content, token_count=token_count)
+        message_table = MessageRow.__table__
+
+        # 대화 존재 확인 + updated_at 갱신 + 메시지 INSERT를 한 문장(한 round trip)으로 처리한다.
+        # UPDATE가 아무 행도 반환하지 않으면 INSERT ... SELECT도 행을 만들지 않는다.
+        touched = (
+            update(ConversationRow)
+            .where(ConversationRow.id == conv_id)
+            .values(updated_at=message.created_at)
+            .returning(ConversationRow.id)
+            .cte("touched")
+        )
+        stmt = (
+            insert(MessageRow)
+            .from_select(
+                ["id", "conversation_id", "role", "content", "created_at", "token_count"],
+                select(
+                    literal(UUID(str(message.id)), message_table.c.id.type),
+                    touched.c.id,
+                    literal(message.role, message_table.c.role.type),
+                    literal(message.content, message_table.c.content.type),
+                    literal(message.created_at, message_table.c.created_at.type),
+                    literal(message.token_count, message_table.c.token_count.type),
+                ),
+            )
+            .returning(MessageRow.id)
+        )
+
+        async with self._session_maker() as session:
+            inserted = (await session.execute(stmt)).scalar_one_or_none()
+            if inserted is not None and outbox is not None:
+                await self._add_to_outbox(session, outbox(message))
             await session.commit()
 
+        if inserted is None:
+            return None
+        return message
+
     async def list_messages(
         self,
         conversation_id: ConversationId,
         limit: int | None = None,
-    ):
-        conv = await self.get(conversation_id)
-        if conv is None:
-            return []
-        return conv.latest_messages(limit=limit)
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> Sequence[Message]:
+        # 기본은 최신순으로 limit 만큼만 읽은 뒤 시간순으로 뒤집어 반환한다.
+        # before/after는 (created_at, id) keyset 경계이며, after가 주어지면
+        # 그 다음 메시지부터 시간순으로 limit 만큼 읽는다 (앞으로 페이징).
+        key = tuple_(MessageRow.created_at, MessageRow.id)
+        stmt = select(MessageRow).where(MessageRow.conversation_id == UUID(str(conversation_id)))
+        if before is not None:
+            stmt = stmt.where(key < tuple_(before.created_at, UUID(str(before.id))))
+        if after is not None:
+            stmt = stmt.where(key > tuple_(after.created_at, UUID(str(after.id))))
+            stmt = stmt.order_by(MessageRow.created_at.asc(), MessageRow.id.asc())
+        else:
+            stmt = stmt.order_by(MessageRow.created_at.desc(), MessageRow.id.desc())
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        async with self._session_maker() as session:
+            rows = (await session.execute(stmt)).scalars().all()
+
+        if after is None:
+            rows = list(reversed(rows))
+        return [_row_to_domain_message(row) for row in rows]
 
     async def list_old_unarchived(
         self,
@@ -97,23 +205,123 @@ class SqlAlchemyConversationRepository(ConversationRepository):
                 .scalars()
                 .all()
             )
+            return await self._load_with_messages(session, rows)
 
-            result = []
-            for row in rows:
-                messages = (
-                    (
-                        await session.execute(
-                            select(MessageRow)
-                            .where(MessageRow.conversation_id == row.id)
-                            .order_by(MessageRow.created_at)
+    async def list_old_unarchived_headers(
+        self,
+        older_than: datetime,
+        *,
+        limit: int = 100,
+    ) -> Sequence[ConversationHeader]:
+        async with self._session_maker() as session:
+            rows = (
+                await session.execute(
+                    select(*_HEADER_COLUMNS)
+                    .where(
+                        ~ConversationRow.is_archived,
+                        ConversationRow.updated_at < older_than,
+                    )
+                    .order_by(ConversationRow.updated_at)
+                    .limit(limit)
+                )
+            ).all()
+
+        return [_row_to_header(row) for row in rows]
+
+    async def get_many(
+        self,
+        conversation_ids: Sequence[ConversationId],
+    ) -> Sequence[Conversation]:
+        if not conversation_ids:
+            return []
+
+        async with self._session_maker() as session:
+            rows = (
+                (
+                    await session.execute(
+                        select(ConversationRow).where(
+                            ConversationRow.id.in_([UUID(str(conv_id)) for conv_id in conversation_ids]),
                         )
                     )
-                    .scalars()
-                    .all()
                 )
-                result.append(_row_to_domain_conversation(row, messages))
+                .scalars()
+                .all()
+            )
+            return await self._load_with_messages(session, rows)
 
-            return result
+    async def archive_older_than(
+        self,
+        older_than: datetime,
+        *,
+        limit: int,
+        after: ConversationHeader | None = None,
+    ) -> Sequence[ConversationHeader]:
+        # (updated_at, id) keyset 순으로 한 청크를 골라 UPDATE ... RETURNING 한 번으로 보관 처리한다.
+        # 다른 worker가 잡고 있는 행은 SKIP LOCKED로 건너뛴다.
+        candidates = (
+            select(ConversationRow.id)
+            .where(
+                ~ConversationRow.is_archived,
+                ConversationRow.updated_at < older_than,
+            )
+            .order_by(ConversationRow.updated_at, ConversationRow.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        if after is not None:
+            candidates = candidates.where(
+                tuple_(ConversationRow.updated_at, ConversationRow.id) > tuple_(after.updated_at, UUID(str(after.id))),
+            )
+        candidates = candidates.cte("candidates")
+
+        stmt = (
+            update(ConversationRow)
+            .where(ConversationRow.id == candidates.c.id)
+            .values(is_archived=True)
+            .returning(*_HEADER_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with self._session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+            await session.commit()
+
+        headers = [_row_to_header(row) for row in rows]
+        headers.sort(key=lambda header: (header.updated_at, header.id))
+        return headers
+
+    async def _add_to_outbox(self, session: AsyncSession, events: Sequence[BaseEvent]) -> None:
+        if not events:
+            return
+        if self._outbox is None:
+            raise ValueError("Events were given for the outbox but the repository has no outbox store")
+        await self._outbox.add(session, events)
+
+    async def _load_with_messages(
+        self,
+        session: AsyncSession,
+        rows: Sequence[ConversationRow],
+    ) -> list[Conversation]:
+        if not rows:
+            return []
+
+        # 대화마다 SELECT 하지 않고 IN (...) 한 번으로 모든 메시지를 가져온다.
+        messages_by_conv: dict[UUID, list[MessageRow]] = {row.id: [] for row in rows}
+        message_rows = (
+            (
+                await session.execute(
+                    select(MessageRow)
+                    .where(MessageRow.conversation_id.in_(list(messages_by_conv)))
+                    .order_by(MessageRow.conversation_id, MessageRow.created_at)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for msg_row in message_rows:
+            messages_by_conv[msg_row.conversation_id].append(msg_row)
+
+        return [_row_to_domain_conversation(row, messages_by_conv[row.id]) for row in rows]
 
     async def _upsert_conversation(
         self,
@@ -122,31 +330,37 @@ class SqlAlchemyConversationRepository(ConversationRepository):
     ) -> None:
         conv_id: UUID = UUID(str(conv.id))
 
-        row = await session.get(ConversationRow, conv_id)
-        if row is None:
-            row = ConversationRow(
+        await session.execute(
+            pg_insert(ConversationRow)
+            .values(
                 id=conv_id,
                 created_at=conv.created_at,
                 updated_at=conv.updated_at,
                 is_archived=conv.is_archived,
             )
-            session.add(row)
-        else:
-            row.updated_at = conv.updated_at
-            row.is_archived = conv.is_archived
-
-        await session.execute(
-            delete(MessageRow).where(MessageRow.conversation_id == conv_id),
+            .on_conflict_do_update(
+                index_elements=[ConversationRow.id],
+                set_={
+                    "updated_at": conv.updated_at,
+                    "is_archived": conv.is_archived,
+                },
+            ),
         )
 
-        for msg in conv.messages:
-            msg_id: UUID = UUID(str(msg.id))
-            session.add(
-                MessageRow(
-                    id=msg_id,
-                    conversation_id=conv_id,
-                    role=msg.role,
-                    content=msg.content,
-                    created_at=msg.created_at,
-                ),
+        # 이전 save() 이후 추가된 메시지만 INSERT 한다.
+        pending = conv.pending_messages()
+        if pending:
+            await session.execute(
+                insert(MessageRow),
+                [
+                    {
+                        "id": UUID(str(msg.id)),
+                        "conversation_id": conv_id,
+                        "role": msg.role,
+                        "content": msg.content,
+                        "created_at": msg.created_at,
+                        "token_count": msg.token_count,
+                    }
+                    for msg in pending
+                ],
             )
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from uuid import uuid4
 
 from fluxmind.domain_core import MessageRole
-from sqlalchemy import Boolean, DateTime, ForeignKey, Text
+from sqlalchemy import BigInteger, Boolean, DateTime, ForeignKey, Identity, Index, Integer, LargeBinary, Text, text
 from sqlalchemy import Enum as SAEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
@@ -16,6 +16,14 @@ class Base(DeclarativeBase):
 
 class ConversationRow(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        Index(
+            "ix_conversations_unarchived_updated_at",
+            "updated_at",
+            "id",
+            postgresql_where=text("NOT is_archived"),
+        ),
+    )
 
     id: Mapped[uuid4] = mapped_column(
         UUID(as_uuid=True),
@@ -47,6 +55,7 @@ class ConversationRow(Base):
 
 class MessageRow(Base):
     __tablename__ = "messages"
+    __table_args__ = (Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at", "id"),)
 
     id: Mapped[uuid4] = mapped_column(
         UUID(as_uuid=True),
@@ -72,6 +81,10 @@ class MessageRow(Base):
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+    token_count: Mapped[int | None] = mapped_column(
+        Integer,
+        nullable=True,
+    )
 
     conversation: Mapped[ConversationRow] = relationship(
         back_populates="messages",
@@ -93,8 +106,126 @@ class ConversationAnalyticsRow(Base):
         default=0,
         nullable=False,
     )
+    user_token_count: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
+    assistant_token_count: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
+    prompt_token_count: Mapped[int] = mapped_column(
+        BigInteger,
+        default=0,
+        nullable=False,
+    )
     last_message_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         default=lambda: datetime.now(timezone.utc),
         nullable=False,
     )
+
+
+class ConversationSummaryRow(Base):
+    __tablename__ = "conversation_summaries"
+
+    conversation_id: Mapped[uuid4] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    last_message_id: Mapped[uuid4] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=False,
+    )
+    last_message_created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+    )
+    message_count: Mapped[int] = mapped_column(
+        default=0,
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+
+class ProcessedEventRow(Base):
+    __tablename__ = "processed_events"
+    __table_args__ = (Index("ix_processed_events_processed_at", "processed_at"),)
+
+    consumer_group: Mapped[str] = mapped_column(Text, primary_key=True)
+    event_id: Mapped[uuid4] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+    )
+
+
+class OutboxEventRow(Base):
+    __tablename__ = "outbox_events"
+
+    # 기록 순서. relay는 id 순으로 꺼내 발행한다.
+    id: Mapped[int] = mapped_column(BigInteger, Identity(), primary_key=True)
+    topic: Mapped[str] = mapped_column(Text, nullable=False)
+    partition_key: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # EventCodecRegistry로 인코딩한 이벤트 (Kafka에 보내는 것과 같은 형식).
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    # relay가 발행하지 못한 횟수와 마지막 이유. 행은 지우지 않고 남겨 둔다.
+    attempts: Mapped[int] = mapped_column(Integer, default=0, server_default="0", nullable=False)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+
+class AnalyticsReplayTotalRow(Base):
+    """replay가 모으는 중인 대화별 합계. apply 때 conversation_analytics로 옮기고 지운다."""
+
+    __tablename__ = "analytics_replay_totals"
+
+    replay_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    conversation_id: Mapped[uuid4] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+    )
+    user_message_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    assistant_message_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    user_token_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    assistant_token_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    prompt_token_count: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+    last_message_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class AnalyticsReplayCheckpointRow(Base):
+    __tablename__ = "analytics_replay_checkpoints"
+
+    replay_id: Mapped[str] = mapped_column(Text, primary_key=True)
+    partition: Mapped[int] = mapped_column(Integer, primary_key=True)
+    topic: Mapped[str] = mapped_column(Text, nullable=False)
+    # 다음에 읽을 offset과 replay를 시작할 때 정한 끝 offset(미포함).
+    next_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    end_offset: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # 처음부터 읽는 replay만 conversation_analytics를 통째로 바꿀 수 있다.
+    from_beginning: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import contextlib
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime, timezone
+from typing import Type
+
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    BaseEvent,
+    ConversationArchivedEvent,
+    MessageFlaggedEvent,
+    MessageReceivedEvent,
+)
+from fluxmind.mq import ClaimCheck, EventCodecRegistry, OutboxBatch, OutboxEvent, OutboxStore
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .models import OutboxEventRow
+from .session import AsyncSessionMaker
+
+OUTBOX_EVENT_TYPES: tuple[Type[BaseEvent], ...] = (
+    AssistantRespondedEvent,
+    ConversationArchivedEvent,
+    MessageFlaggedEvent,
+    MessageReceivedEvent,
+)
+
+
+class SqlAlchemyOutboxStore(OutboxStore):
+    """
+    outbox_events 테이블.
+
+    add()는 호출한 쪽 session에 INSERT만 하므로 대화/메시지와 같은 트랜잭션으로 커밋된다.
+    claim-check도 여기서 적용해 payload를 Kafka에 보낼 형식 그대로 기록하므로 relay는 다시 인코딩하지 않는다.
+    lease()는 SELECT ... FOR UPDATE SKIP LOCKED로 배치를 잠그므로 relay 여러 개가 서로 다른 행을 가져간다.
+    발행하지 못한 행(예: 배포 중 relay가 모르는 이벤트)은 지우지 않고 attempts와 last_error를 남기며,
+    max_attempts 번 실패한 행은 더 가져가지 않는다 (확인 후 attempts를 0으로 되돌리면 다시 발행한다).
+    """
+
+    def __init__(
+        self,
+        session_maker: AsyncSessionMaker,
+        *,
+        topic: str,
+        event_types: Iterable[Type[BaseEvent]] = OUTBOX_EVENT_TYPES,
+        codec: EventCodecRegistry | None = None,
+        claim_check: ClaimCheck | None = None,
+        max_attempts: int = 5,
+    ) -> None:
+        self._session_maker = session_maker
+        self._topic = topic
+        self._codec = codec or EventCodecRegistry(event_types)
+        self._claim_check = claim_check
+        self._max_attempts = max_attempts
+
+    async def add(self, session: AsyncSession, events: Sequence[BaseEvent]) -> None:
+        if not events:
+            return
+        if self._claim_check is not None:
+            events = [await self._claim_check.offload(event) for event in events]
+        now = datetime.now(timezone.utc)
+        await session.execute(
+            insert(OutboxEventRow),
+            [
+                {
+                    "topic": self._topic,
+                    "partition_key": _partition_key(event),
+                    "payload": self._codec.encode(event),
+                    "created_at": now,
+                }
+                for event in events
+            ],
+        )
+
+    @contextlib.asynccontextmanager
+    async def lease(self, limit: int) -> AsyncIterator[OutboxBatch]:
+        stmt = (
+            select(OutboxEventRow.id, OutboxEventRow.topic, OutboxEventRow.partition_key, OutboxEventRow.payload)
+            .where(OutboxEventRow.attempts < self._max_attempts)
+            .order_by(OutboxEventRow.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._session_maker() as session:
+            rows = (await session.execute(stmt)).all()
+            batch = OutboxBatch([OutboxEvent(row.id, row.topic, row.payload, row.partition_key) for row in rows])
+
+            yield batch
+
+            if not rows:
+                return
+            published = [row.id for row in rows if row.id not in batch.failed]
+            if published:
+                await session.execute(delete(OutboxEventRow).where(OutboxEventRow.id.in_(published)))
+            for event_id, error in batch.failed.items():
+                await session.execute(
+                    update(OutboxEventRow)
+                    .where(OutboxEventRow.id == event_id)
+                    .values(attempts=OutboxEventRow.attempts + 1, last_error=error)
+                )
+            await session.commit()
+
+
+def _partition_key(event: BaseEvent) -> str | None:
+    conversation_id = getattr(event, "conversation_id", None)
+    return str(conversation_id) if conversation_id is not None else None
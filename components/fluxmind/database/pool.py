@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+
+@dataclass(slots=True, frozen=True)
+class PoolMetrics:
+    pool_size: int
+    checked_out: int
+    overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    checkout_wait_seconds_total: float
+    checkout_wait_seconds_max: float
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    AsyncAdaptedQueuePool + checkout 대기 시간/timeout 카운터.
+
+    connect()는 pool에서 연결을 얻을 때마다 호출되므로 여기서 잰 시간이
+    애플리케이션이 연결을 기다린 시간(새 연결 생성 포함)이 된다.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._checkouts = 0
+        self._checkout_timeouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self._checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self._checkouts += 1
+            self._wait_total += waited
+            if waited > self._wait_max:
+                self._wait_max = waited
+
+    def metrics(self) -> PoolMetrics:
+        return PoolMetrics(
+            pool_size=self.size(),
+            checked_out=self.checkedout(),
+            overflow=max(self.overflow(), 0),
+            checkouts=self._checkouts,
+            checkout_timeouts=self._checkout_timeouts,
+            checkout_wait_seconds_total=self._wait_total,
+            checkout_wait_seconds_max=self._wait_max,
+        )
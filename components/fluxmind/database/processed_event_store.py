@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from fluxmind.mq import InMemoryProcessedEventStore, ProcessedEventStore
+from fluxmind.platform import AppSettings
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .models import ProcessedEventRow
+from .session import AsyncSessionMaker
+
+
+class SqlAlchemyProcessedEventStore(ProcessedEventStore):
+    """
+    consumer group별 처리한 event_id를 Postgres에 기록한다.
+    rebalance로 다른 인스턴스가 같은 이벤트를 다시 받아도 한 번만 처리된다.
+
+    claim은 processed_at부터 lease_seconds 동안 유효한 lease다. complete 되지 않은 claim을 다른 consumer가
+    만나면 끝나거나 lease가 지날 때까지 기다린 뒤 이어받으므로, 처리 중에 죽은 consumer의 이벤트도 잃지 않는다.
+    lease_seconds는 handler가 걸리는 가장 긴 시간보다 길어야 한다 (짧으면 같은 이벤트를 두 번 처리할 수 있다).
+    """
+
+    def __init__(
+        self,
+        session_maker: AsyncSessionMaker,
+        consumer_group: str,
+        *,
+        lease_seconds: float = 300.0,
+        poll_interval_seconds: float = 1.0,
+    ) -> None:
+        self._session_maker = session_maker
+        self._consumer_group = consumer_group
+        self._lease = timedelta(seconds=lease_seconds)
+        self._poll_interval = poll_interval_seconds
+
+    async def claim(self, event_id: UUID) -> bool:
+        return event_id in await self.claim_many([event_id])
+
+    async def complete(self, event_id: UUID) -> None:
+        await self.complete_many([event_id])
+
+    async def release(self, event_id: UUID) -> None:
+        await self.release_many([event_id])
+
+    async def claim_many(self, event_ids: Iterable[UUID]) -> set[UUID]:
+        pending = list(dict.fromkeys(event_ids))
+        claimed: set[UUID] = set()
+        while pending:
+            now = datetime.now(timezone.utc)
+            stmt = pg_insert(ProcessedEventRow).values(
+                [
+                    {"consumer_group": self._consumer_group, "event_id": event_id, "processed_at": now}
+                    for event_id in pending
+                ],
+            )
+            # lease가 지난 미완료 claim만 이어받는다. 처리가 끝난 이벤트와 처리 중인 이벤트는 RETURNING에 없다.
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ProcessedEventRow.consumer_group, ProcessedEventRow.event_id],
+                set_={"processed_at": stmt.excluded.processed_at},
+                where=ProcessedEventRow.completed_at.is_(None) & (ProcessedEventRow.processed_at < now - self._lease),
+            ).returning(ProcessedEventRow.event_id)
+            async with self._session_maker() as session:
+                claimed.update((await session.execute(stmt)).scalars())
+                await session.commit()
+                in_progress = set(
+                    (
+                        await session.execute(
+                            select(ProcessedEventRow.event_id).where(
+                                ProcessedEventRow.consumer_group == self._consumer_group,
+                                ProcessedEventRow.event_id.in_([i for i in pending if i not in claimed]),
+                                ProcessedEventRow.completed_at.is_(None),
+                            )
+                        )
+                    ).scalars()
+                )
+            pending = [event_id for event_id in pending if event_id in in_progress]
+            if pending:
+                await asyncio.sleep(self._poll_interval)
+        return claimed
+
+    async def complete_many(self, event_ids: Iterable[UUID]) -> None:
+        ids = list(event_ids)
+        if not ids:
+            return
+        async with self._session_maker() as session:
+            await session.execute(
+                update(ProcessedEventRow)
+                .where(
+                    ProcessedEventRow.consumer_group == self._consumer_group,
+                    ProcessedEventRow.event_id.in_(ids),
+                )
+                .values(completed_at=datetime.now(timezone.utc))
+            )
+            await session.commit()
+
+    async def release_many(self, event_ids: Iterable[UUID]) -> None:
+        ids = list(event_ids)
+        if not ids:
+            return
+        async with self._session_maker() as session:
+            await session.execute(
+                delete(ProcessedEventRow).where(
+                    ProcessedEventRow.consumer_group == self._consumer_group,
+                    ProcessedEventRow.event_id.in_(ids),
+                )
+            )
+            await session.commit()
+
+    async def prune(self, older_than: datetime) -> int:
+        # retention보다 오래된 이벤트는 다시 배달될 일이 없으므로 group과 상관없이 지운다.
+        async with self._session_maker() as session:
+            result = await session.execute(
+                delete(ProcessedEventRow).where(ProcessedEventRow.processed_at < older_than)
+            )
+            await session.commit()
+        return result.rowcount
+
+
+def build_processed_event_store(
+    settings: AppSettings,
+    session_maker: AsyncSessionMaker,
+    consumer_group: str,
+) -> ProcessedEventStore | None:
+    if settings.events_consumer_dedupe_store == "none":
+        return None
+    if settings.events_consumer_dedupe_store == "memory":
+        return InMemoryProcessedEventStore(settings.events_consumer_dedupe_max_entries)
+    return SqlAlchemyProcessedEventStore(
+        session_maker,
+        consumer_group,
+        lease_seconds=settings.events_consumer_dedupe_lease_seconds,
+    )
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 from contextlib import asynccontextmanager
-from typing import AsyncIterator
+from typing import Any, AsyncIterator
+from uuid import uuid4
 
 from fluxmind.platform import get_settings
 from sqlalchemy.ext.asyncio import (
@@ -11,15 +12,38 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
+from .pool import InstrumentedAsyncQueuePool, PoolMetrics
+
 AsyncSessionMaker = async_sessionmaker[AsyncSession]
 
 
 def _create_engine() -> AsyncEngine:
     settings = get_settings()
+
+    connect_args: dict[str, Any] = {
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+        "command_timeout": settings.db_command_timeout_seconds,
+        "timeout": settings.db_connect_timeout_seconds,
+    }
+    if settings.db_pgbouncer_mode:
+        # PgBouncer transaction pooling에서는 서버 연결이 트랜잭션마다 바뀌므로
+        # prepared statement 캐시를 끄고 이름이 겹치지 않게 해야 한다.
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+
     return create_async_engine(
         settings.db_url,
         echo=False,
         future=True,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_pool_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
     )
 
 
@@ -44,6 +68,13 @@ def get_session_maker() -> AsyncSessionMaker:
     return _session_maker
 
 
+def get_pool_metrics() -> PoolMetrics | None:
+    pool = get_engine().pool
+    if isinstance(pool, InstrumentedAsyncQueuePool):
+        return pool.metrics()
+    return None
+
+
 @asynccontextmanager
 async def get_async_session() -> AsyncIterator[AsyncSession]:
     session_maker = get_session_maker()
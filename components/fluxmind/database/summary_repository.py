@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from uuid import UUID
+
+from fluxmind.domain_core import ConversationId, MessageCursor, MessageId
+from fluxmind.summarization import ConversationSummary, SummaryRepository
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from .models import ConversationSummaryRow
+from .session import AsyncSessionMaker
+
+
+def _row_to_domain_summary(row: ConversationSummaryRow) -> ConversationSummary:
+    return ConversationSummary(
+        conversation_id=ConversationId(row.conversation_id),
+        content=row.content,
+        last_message=MessageCursor(
+            created_at=row.last_message_created_at,
+            id=MessageId(row.last_message_id),
+        ),
+        message_count=row.message_count,
+        updated_at=row.updated_at,
+    )
+
+
+class SqlAlchemySummaryRepository(SummaryRepository):
+    def __init__(self, session_maker: AsyncSessionMaker) -> None:
+        self._session_maker = session_maker
+
+    async def get(self, conversation_id: ConversationId) -> ConversationSummary | None:
+        async with self._session_maker() as session:
+            row = await session.get(ConversationSummaryRow, UUID(str(conversation_id)))
+            if row is None:
+                return None
+            return _row_to_domain_summary(row)
+
+    async def save(self, summary: ConversationSummary) -> bool:
+        stmt = pg_insert(ConversationSummaryRow).values(
+            conversation_id=UUID(str(summary.conversation_id)),
+            content=summary.content,
+            last_message_id=UUID(str(summary.last_message.id)),
+            last_message_created_at=summary.last_message.created_at,
+            message_count=summary.message_count,
+            updated_at=summary.updated_at,
+        )
+        # high-water mark가 앞으로 갈 때만 덮어쓴다. 두 인스턴스가 동시에 요약해도
+        # 늦게 끝난 쪽이 더 오래된 요약으로 되돌리지 못한다.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ConversationSummaryRow.conversation_id],
+            set_={
+                "content": stmt.excluded.content,
+                "last_message_id": stmt.excluded.last_message_id,
+                "last_message_created_at": stmt.excluded.last_message_created_at,
+                "message_count": stmt.excluded.message_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=tuple_(
+                ConversationSummaryRow.last_message_created_at,
+                ConversationSummaryRow.last_message_id,
+            )
+            < tuple_(stmt.excluded.last_message_created_at, stmt.excluded.last_message_id),
+        ).returning(ConversationSummaryRow.conversation_id)
+
+        async with self._session_maker() as session:
+            written = (await session.execute(stmt)).scalar_one_or_none()
+            await session.commit()
+        return written is not None
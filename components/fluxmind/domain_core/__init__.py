@@ -5,23 +5,32 @@ from .events import (
     MessageFlaggedEvent,
     MessageReceivedEvent,
 )
-from .factory import new_conversation
+from .factory import assistant_responded_event, message_received_event, new_conversation, new_message
 from .models import (
     Conversation,
+    ConversationHeader,
     ConversationId,
     Message,
+    MessageCursor,
     MessageId,
     MessageRole,
 )
+from .tokens import estimate_token_count
 
 __all__ = [
     "new_conversation",
+    "new_message",
+    "message_received_event",
+    "assistant_responded_event",
+    "estimate_token_count",
     # IDs
     "ConversationId",
     "MessageId",
     # core models
     "Conversation",
+    "ConversationHeader",
     "Message",
+    "MessageCursor",
     "MessageRole",
     # events
     "BaseEvent",
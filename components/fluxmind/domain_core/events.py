@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Mapping
+from typing import Any, ClassVar, Mapping
 from uuid import UUID, uuid4
 
 from .models import ConversationId, MessageId, MessageRole
@@ -10,6 +10,9 @@ from .models import ConversationId, MessageId, MessageRole
 
 @dataclass(kw_only=True)
 class BaseEvent:
+    # 직렬화 형식의 버전. 필드 의미가 바뀌면 하위 클래스에서 올린다.
+    schema_version: ClassVar[int] = 1
+
     event_id: UUID = field(default_factory=uuid4)
     occurred_at: datetime = field(
         default_factory=lambda: datetime.now(timezone.utc),
@@ -26,7 +29,10 @@ class MessageReceivedEvent(BaseEvent):
     conversation_id: ConversationId
     message_id: MessageId
     role: MessageRole
-    content: str
+    # claim-check로 내려보낸 경우 content는 None이고 content_ref로 읽는다.
+    content: str | None
+    content_ref: str | None = None
+    token_count: int | None = None
 
 
 @dataclass(kw_only=True)
@@ -34,7 +40,11 @@ class AssistantRespondedEvent(BaseEvent):
     conversation_id: ConversationId
     user_message_id: MessageId
     assistant_message_id: MessageId
-    content: str
+    content: str | None
+    content_ref: str | None = None
+    token_count: int | None = None
+    # 응답을 만들 때 LLM에 보낸 프롬프트의 토큰 수 (Ollama prompt_eval_count). 모르면 None.
+    prompt_token_count: int | None = None
 
 
 @dataclass(kw_only=True)
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 from uuid import uuid4
 
-from .models import Conversation, ConversationId, MessageRole
+from .events import AssistantRespondedEvent, MessageReceivedEvent
+from .models import Conversation, ConversationId, Message, MessageId, MessageRole
+from .tokens import estimate_token_count
 
 
 def new_conversation(initial_user_message: str | None = None) -> Conversation:
@@ -10,3 +12,45 @@ def new_conversation(initial_user_message: str | None = None) -> Conversation:
     if initial_user_message:
         conv.add_message(MessageRole.USER, initial_user_message)
     return conv
+
+
+def new_message(
+    conversation_id: ConversationId,
+    role: MessageRole,
+    content: str,
+    *,
+    token_count: int | None = None,
+) -> Message:
+    return Message(
+        id=MessageId(uuid4()),
+        conversation_id=conversation_id,
+        role=role,
+        content=content,
+        token_count=token_count if token_count is not None else estimate_token_count(content),
+    )
+
+
+def message_received_event(message: Message) -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=message.conversation_id,
+        message_id=message.id,
+        role=message.role,
+        content=message.content,
+        token_count=message.token_count,
+    )
+
+
+def assistant_responded_event(
+    message: Message,
+    *,
+    user_message_id: MessageId,
+    prompt_token_count: int | None = None,
+) -> AssistantRespondedEvent:
+    return AssistantRespondedEvent(
+        conversation_id=message.conversation_id,
+        user_message_id=user_message_id,
+        assistant_message_id=message.id,
+        content=message.content,
+        token_count=message.token_count,
+        prompt_token_count=prompt_token_count,
+    )
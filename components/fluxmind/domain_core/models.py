@@ -6,6 +6,8 @@ from enum import Enum
 from typing import NewType, Sequence
 from uuid import UUID, uuid4
 
+from .tokens import estimate_token_count
+
 ConversationId = NewType("ConversationId", UUID)
 MessageId = NewType("MessageId", UUID)
 
@@ -25,6 +27,26 @@ class Message:
     created_at: datetime = field(
         default_factory=lambda: datetime.now(timezone.utc),
     )
+    # 쓰기 시점에 한 번 계산해 저장한다. backfill 전의 오래된 행은 None일 수 있다.
+    token_count: int | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class MessageCursor:
+    created_at: datetime
+    id: MessageId
+
+    @classmethod
+    def of(cls, message: Message) -> MessageCursor:
+        return cls(created_at=message.created_at, id=message.id)
+
+
+@dataclass(slots=True, frozen=True)
+class ConversationHeader:
+    id: ConversationId
+    is_archived: bool
+    created_at: datetime
+    updated_at: datetime
 
 
 @dataclass(slots=True)
@@ -38,13 +60,17 @@ class Conversation:
     updated_at: datetime = field(
         default_factory=lambda: datetime.now(timezone.utc),
     )
+    # 저장소에 이미 기록된 메시지 수. messages는 append-only이므로
+    # 이 인덱스 이후의 메시지만 다음 save()에서 INSERT 하면 된다.
+    _persisted_message_count: int = field(default=0, init=False, repr=False, compare=False)
 
-    def add_message(self, role: MessageRole, content: str) -> Message:
+    def add_message(self, role: MessageRole, content: str, *, token_count: int | None = None) -> Message:
         message = Message(
             id=MessageId(uuid4()),
             conversation_id=self.id,
             role=role,
             content=content,
+            token_count=token_count if token_count is not None else estimate_token_count(content),
         )
         self.messages.append(message)
         self.touch()
@@ -61,3 +87,20 @@ class Conversation:
 
     def touch(self) -> None:
         self.updated_at = datetime.now(timezone.utc)
+
+    def copy(self) -> Conversation:
+        clone = Conversation(
+            id=self.id,
+            messages=list(self.messages),
+            is_archived=self.is_archived,
+            created_at=self.created_at,
+            updated_at=self.updated_at,
+        )
+        clone._persisted_message_count = self._persisted_message_count
+        return clone
+
+    def pending_messages(self) -> Sequence[Message]:
+        return tuple(self.messages[self._persisted_message_count :])
+
+    def mark_persisted(self) -> None:
+        self._persisted_message_count = len(self.messages)
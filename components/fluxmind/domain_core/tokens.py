@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+import math
+
+# 토크나이저 없이 쓰는 근사치: UTF-8 4바이트당 1토큰.
+# 마이그레이션 backfill(ceil(octet_length(content) / 4.0))도 같은 값을 쓴다.
+BYTES_PER_TOKEN = 4.0
+
+
+def estimate_token_count(text: str, *, bytes_per_token: float = BYTES_PER_TOKEN) -> int:
+    return math.ceil(len(text.encode("utf-8")) / bytes_per_token)
@@ -0,0 +1,9 @@
+from .interfaces import MessageTailCache
+from .memory import InMemoryMessageTailCache
+from .repository import TailCachedConversationRepository
+
+__all__ = [
+    "MessageTailCache",
+    "InMemoryMessageTailCache",
+    "TailCachedConversationRepository",
+]
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Protocol, Sequence
+
+from fluxmind.domain_core import ConversationId, Message
+
+
+class MessageTailCache(Protocol):
+    """
+    대화별 최근 메시지 window를 담는 공유 캐시.
+
+    fill()은 generation()으로 얻은 값이 그대로일 때만 채워진다. append()/invalidate()가
+    generation을 올리므로, DB를 읽는 사이에 끼어든 쓰기가 있으면 오래된 tail을 채우지 않는다.
+    """
+
+    @property
+    def window(self) -> int: ...
+
+    async def get_tail(self, conversation_id: ConversationId, limit: int) -> Sequence[Message] | None: ...
+
+    async def generation(self, conversation_id: ConversationId) -> int: ...
+
+    async def fill(
+        self,
+        conversation_id: ConversationId,
+        messages: Sequence[Message],
+        *,
+        generation: int,
+    ) -> bool: ...
+
+    async def append(self, message: Message) -> None: ...
+
+    async def invalidate(self, conversation_id: ConversationId) -> None: ...
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Sequence
+
+from fluxmind.domain_core import ConversationId, Message
+
+from .interfaces import MessageTailCache
+
+
+class InMemoryMessageTailCache(MessageTailCache):
+    def __init__(self, window: int) -> None:
+        self._window = window
+        self._tails: dict[ConversationId, deque[Message]] = {}
+        self._generations: dict[ConversationId, int] = {}
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    async def get_tail(self, conversation_id: ConversationId, limit: int) -> Sequence[Message] | None:
+        tail = self._tails.get(conversation_id)
+        if tail is None:
+            return None
+        return list(tail)[-limit:]
+
+    async def generation(self, conversation_id: ConversationId) -> int:
+        return self._generations.get(conversation_id, 0)
+
+    async def fill(
+        self,
+        conversation_id: ConversationId,
+        messages: Sequence[Message],
+        *,
+        generation: int,
+    ) -> bool:
+        if not messages or conversation_id in self._tails:
+            return False
+        if self._generations.get(conversation_id, 0) != generation:
+            return False
+        self._tails[conversation_id] = deque(messages, maxlen=self._window)
+        return True
+
+    async def append(self, message: Message) -> None:
+        self._bump(message.conversation_id)
+        tail = self._tails.get(message.conversation_id)
+        if tail is not None:
+            tail.append(message)
+
+    async def invalidate(self, conversation_id: ConversationId) -> None:
+        self._bump(conversation_id)
+        self._tails.pop(conversation_id, None)
+
+    def _bump(self, conversation_id: ConversationId) -> None:
+        self._generations[conversation_id] = self._generations.get(conversation_id, 0) + 1
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import Sequence
+from uuid import UUID
+
+from fluxmind.domain_core import ConversationId, Message, MessageId, MessageRole
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from .interfaces import MessageTailCache
+
+# KEYS[1]=tail, KEYS[2]=generation / ARGV[1]=expected generation, ARGV[2]=window, ARGV[3]=ttl, ARGV[4..]=messages
+_FILL_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[2]) or '0')
+if current ~= tonumber(ARGV[1]) or redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('RPUSH', KEYS[1], unpack(ARGV, 4))
+redis.call('LTRIM', KEYS[1], -tonumber(ARGV[2]), -1)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[3]))
+return 1
+"""
+
+
+def _encode(message: Message) -> str:
+    return json.dumps(
+        {
+            "id": str(message.id),
+            "conversation_id": str(message.conversation_id),
+            "role": message.role.value,
+            "content": message.content,
+            "created_at": message.created_at.isoformat(),
+            "token_count": message.token_count,
+        },
+    )
+
+
+def _decode(raw: bytes | str) -> Message:
+    data = json.loads(raw)
+    return Message(
+        id=MessageId(UUID(data["id"])),
+        conversation_id=ConversationId(UUID(data["conversation_id"])),
+        role=MessageRole(data["role"]),
+        content=data["content"],
+        created_at=datetime.fromisoformat(data["created_at"]),
+        token_count=data.get("token_count"),
+    )
+
+
+class RedisMessageTailCache(MessageTailCache):
+    """
+    대화별 capped list (RPUSH + LTRIM)로 최근 메시지를 replica 간에 공유한다.
+
+    Redis 오류는 캐시 miss로 취급해 호출자가 Postgres로 fallback 하게 한다.
+    """
+
+    def __init__(
+        self,
+        client: Redis,
+        *,
+        window: int,
+        ttl_seconds: int,
+        key_prefix: str = "fluxmind:conv",
+    ) -> None:
+        self._client = client
+        self._window = window
+        self._ttl_seconds = ttl_seconds
+        self._key_prefix = key_prefix
+        self._fill = client.register_script(_FILL_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, *, window: int, ttl_seconds: int) -> RedisMessageTailCache:
+        return cls(Redis.from_url(url), window=window, ttl_seconds=ttl_seconds)
+
+    @property
+    def window(self) -> int:
+        return self._window
+
+    async def get_tail(self, conversation_id: ConversationId, limit: int) -> Sequence[Message] | None:
+        try:
+            raw = await self._client.lrange(self._tail_key(conversation_id), -limit, -1)
+        except RedisError as e:
+            print(f"Redis history cache read failed: {e}")
+            return None
+        if not raw:
+            return None
+        return [_decode(item) for item in raw]
+
+    async def generation(self, conversation_id: ConversationId) -> int:
+        try:
+            value = await self._client.get(self._generation_key(conversation_id))
+        except RedisError as e:
+            print(f"Redis history cache read failed: {e}")
+            return -1
+        return int(value) if value is not None else 0
+
+    async def fill(
+        self,
+        conversation_id: ConversationId,
+        messages: Sequence[Message],
+        *,
+        generation: int,
+    ) -> bool:
+        if not messages or generation < 0:
+            return False
+        try:
+            filled = await self._fill(
+                keys=[self._tail_key(conversation_id), self._generation_key(conversation_id)],
+                args=[generation, self._window, self._ttl_seconds, *(_encode(msg) for msg in messages)],
+            )
+        except RedisError as e:
+            print(f"Redis history cache fill failed: {e}")
+            return False
+        return bool(filled)
+
+    async def append(self, message: Message) -> None:
+        tail_key = self._tail_key(message.conversation_id)
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key(message.conversation_id))
+                pipe.expire(self._generation_key(message.conversation_id), self._ttl_seconds)
+                # 목록이 없으면(아직 채워지지 않았으면) 일부만 있는 tail을 만들지 않도록 RPUSHX를 쓴다.
+                pipe.rpushx(tail_key, _encode(message))
+                pipe.ltrim(tail_key, -self._window, -1)
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Redis history cache append failed: {e}")
+            await self.invalidate(message.conversation_id)
+
+    async def invalidate(self, conversation_id: ConversationId) -> None:
+        try:
+            async with self._client.pipeline(transaction=True) as pipe:
+                pipe.incr(self._generation_key(conversation_id))
+                pipe.expire(self._generation_key(conversation_id), self._ttl_seconds)
+                pipe.delete(self._tail_key(conversation_id))
+                await pipe.execute()
+        except RedisError as e:
+            print(f"Redis history cache invalidate failed: {e}")
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    def _tail_key(self, conversation_id: ConversationId) -> str:
+        return f"{self._key_prefix}:{conversation_id}:tail"
+
+    def _generation_key(self, conversation_id: ConversationId) -> str:
+        return f"{self._key_prefix}:{conversation_id}:gen"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from fluxmind.conversation import ConversationRepository, OutboxEventFactory
+from fluxmind.conversation.delegating import DelegatingConversationRepository
+from fluxmind.domain_core import (
+    BaseEvent,
+    Conversation,
+    ConversationId,
+    Message,
+    MessageCursor,
+    MessageRole,
+)
+
+from .interfaces import MessageTailCache
+
+
+class TailCachedConversationRepository(DelegatingConversationRepository):
+    """
+    list_messages()의 최근 메시지 조회를 MessageTailCache에서 먼저 읽고,
+    없으면 window 만큼 Postgres에서 읽어 채운다. 쓰기는 캐시에도 반영한다.
+    """
+
+    def __init__(self, inner: ConversationRepository, cache: MessageTailCache) -> None:
+        super().__init__(inner)
+        self._cache = cache
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None:
+        await super().save(conversation, outbox=outbox)
+        await self._cache.invalidate(conversation.id)
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox: OutboxEventFactory | None = None,
+    ) -> Message | None:
+        message = await super().append_message(conversation_id, role, content, token_count=token_count, outbox=outbox)
+        if message is not None:
+            await self._cache.append(message)
+        return message
+
+    async def list_messages(
+        self,
+        conversation_id: ConversationId,
+        limit: int | None = None,
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> Sequence[Message]:
+        if before is not None or after is not None or limit is None or limit > self._cache.window:
+            return await self._inner.list_messages(conversation_id, limit, before=before, after=after)
+
+        cached = await self._cache.get_tail(conversation_id, limit)
+        if cached is not None:
+            return cached
+
+        generation = await self._cache.generation(conversation_id)
+        messages = await self._inner.list_messages(conversation_id, self._cache.window)
+        await self._cache.fill(conversation_id, messages, generation=generation)
+        return messages[-limit:]
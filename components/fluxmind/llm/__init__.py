@@ -1,7 +1,8 @@
-from .interfaces import LLMClient, LLMMessage, LLMRole
+from .interfaces import LLMClient, LLMCompletion, LLMMessage, LLMRole
 
 __all__ = [
     "LLMClient",
+    "LLMCompletion",
     "LLMMessage",
     "LLMRole",
 ]
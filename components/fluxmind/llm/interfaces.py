@@ -17,6 +17,14 @@ class LLMMessage:
     content: str
 
 
+@dataclass(slots=True)
+class LLMCompletion:
+    content: str
+    # 백엔드가 보고한 실제 토큰 수 (Ollama: prompt_eval_count / eval_count). 모르면 None.
+    prompt_tokens: int | None = None
+    completion_tokens: int | None = None
+
+
 class LLMClient(Protocol):
     async def generate(
         self,
@@ -26,3 +34,15 @@ class LLMClient(Protocol):
         temperature: float | None = None,
         max_tokens: int | None = None,
     ) -> str: ...
+
+    async def complete(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        model: str,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> LLMCompletion:
+        # 토큰 사용량을 알려주지 않는 구현을 위한 기본 동작.
+        content = await self.generate(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        return LLMCompletion(content=content)
@@ -4,7 +4,7 @@ from typing import Sequence
 
 import httpx
 
-from .interfaces import LLMClient, LLMMessage
+from .interfaces import LLMClient, LLMCompletion, LLMMessage
 
 
 class OllamaClient(LLMClient):
@@ -21,6 +21,17 @@ class OllamaClient(LLMClient):
         temperature: float | None = None,
         max_tokens: int | None = None,
     ) -> str:
+        completion = await self.complete(messages, model=model, temperature=temperature, max_tokens=max_tokens)
+        return completion.content
+
+    async def complete(
+        self,
+        messages: Sequence[LLMMessage],
+        *,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> LLMCompletion:
         payload = {
             "model": model or self._model,
             "messages": [{"role": m.role.value, "content": m.content} for m in messages],
@@ -35,7 +46,13 @@ class OllamaClient(LLMClient):
         resp = await self._client.post("/v1/chat/completions", json=payload)
         resp.raise_for_status()
         data = resp.json()
-        return data["choices"][0]["message"]["content"]
+        # OpenAI 호환 엔드포인트는 Ollama의 prompt_eval_count/eval_count를 usage로 돌려준다.
+        usage = data.get("usage") or {}
+        return LLMCompletion(
+            content=data["choices"][0]["message"]["content"],
+            prompt_tokens=usage.get("prompt_tokens", data.get("prompt_eval_count")),
+            completion_tokens=usage.get("completion_tokens", data.get("eval_count")),
+        )
 
     async def aclose(self) -> None:
         await self._client.aclose()
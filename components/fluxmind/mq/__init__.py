@@ -1,6 +1,39 @@
-from .interfaces import EventPublisher, EventSubscriber
+from .claim_check import ClaimCheck, ContentStore, FileContentStore
+from .codec import EventCodec, EventCodecRegistry
+from .dedupe import InMemoryProcessedEventStore, ProcessedEventStore
+from .dispatcher import KeyedEventDispatcher
+from .interfaces import Delivery, EventPublisher, EventSubscriber
+from .memory import InMemoryBroker, InMemoryEventPublisher, InMemoryEventSubscriber
+from .offsets import OffsetTracker
+from .outbox import OutboxBatch, OutboxEvent, OutboxRelay, OutboxStore
+from .retry import RetryPolicy, RetryRouter, dead_letter_topic, retry_topic
+from .routing import ConsumerGroup, EventRouter, Route
 
 __all__ = [
+    "ClaimCheck",
+    "ConsumerGroup",
+    "ContentStore",
+    "Delivery",
+    "FileContentStore",
+    "EventCodec",
+    "EventCodecRegistry",
     "EventPublisher",
+    "EventRouter",
     "EventSubscriber",
+    "InMemoryBroker",
+    "InMemoryEventPublisher",
+    "InMemoryEventSubscriber",
+    "InMemoryProcessedEventStore",
+    "KeyedEventDispatcher",
+    "OffsetTracker",
+    "OutboxBatch",
+    "OutboxEvent",
+    "OutboxRelay",
+    "OutboxStore",
+    "ProcessedEventStore",
+    "RetryPolicy",
+    "RetryRouter",
+    "Route",
+    "dead_letter_topic",
+    "retry_topic",
 ]
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+import tempfile
+from pathlib import Path
+from typing import Protocol
+
+from fluxmind.domain_core import AssistantRespondedEvent, BaseEvent, MessageReceivedEvent
+
+# content를 싣는 이벤트 → claim key로 쓸 message id 필드.
+_CONTENT_KEY_FIELDS: dict[type[BaseEvent], str] = {
+    MessageReceivedEvent: "message_id",
+    AssistantRespondedEvent: "assistant_message_id",
+}
+
+
+class ContentStore(Protocol):
+    async def put(self, key: str, content: str) -> None: ...
+
+    async def get(self, key: str) -> str | None: ...
+
+
+class FileContentStore(ContentStore):
+    """로컬(또는 공유 마운트) 디렉터리에 key 하나당 파일 하나로 저장한다."""
+
+    def __init__(self, base_dir: str | os.PathLike[str]) -> None:
+        self._base_dir = Path(base_dir)
+
+    async def put(self, key: str, content: str) -> None:
+        await asyncio.to_thread(self._write, key, content)
+
+    async def get(self, key: str) -> str | None:
+        return await asyncio.to_thread(self._read, key)
+
+    def _path(self, key: str) -> Path:
+        # key는 message id(UUID)라 디렉터리 구분자가 들어갈 일은 없지만 방어적으로 막는다.
+        if not key or "/" in key or "\\" in key or key.startswith("."):
+            raise ValueError(f"Invalid claim-check key: {key!r}")
+        return self._base_dir / key[:2] / key
+
+    def _write(self, key: str, content: str) -> None:
+        path = self._path(key)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 rename 한다.
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as tmp:
+            tmp.write(content)
+        os.replace(tmp.name, path)
+
+    def _read(self, key: str) -> str | None:
+        try:
+            return self._path(key).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+
+class ClaimCheck:
+    """
+    threshold_bytes를 넘는 content를 ContentStore에 맡기고 이벤트에는 참조(content_ref)만 싣는다.
+
+    publisher는 offload()로 이벤트를 바꿔 보내고, consumer 쪽 handler는 content가
+    실제로 필요할 때만 resolve()로 읽는다.
+    """
+
+    def __init__(self, store: ContentStore, *, threshold_bytes: int) -> None:
+        self._store = store
+        self._threshold_bytes = threshold_bytes
+
+    async def offload(self, event: BaseEvent) -> BaseEvent:
+        key_field = _CONTENT_KEY_FIELDS.get(type(event))
+        content = getattr(event, "content", None) if key_field is not None else None
+        if content is None or len(content.encode("utf-8")) <= self._threshold_bytes:
+            return event
+
+        key = str(getattr(event, key_field))
+        await self._store.put(key, content)
+        return dataclasses.replace(event, content=None, content_ref=key)
+
+    async def resolve(self, event: BaseEvent) -> str | None:
+        content = getattr(event, "content", None)
+        ref = getattr(event, "content_ref", None)
+        if content is not None or ref is None:
+            return content
+        resolved = await self._store.get(ref)
+        if resolved is None:
+            raise LookupError(f"Claim-checked content not found: {ref}")
+        return resolved
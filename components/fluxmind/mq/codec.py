@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import dataclasses
+import json
+import types
+import typing
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from enum import Enum
+from typing import Any, Type
+from uuid import UUID
+
+from fluxmind.domain_core import BaseEvent
+
+try:  # 선택 의존성: 설치되어 있으면 더 빠른 JSON 백엔드를 쓴다.
+    import orjson
+except ImportError:  # pragma: no cover - 환경에 따라 다름
+    orjson = None
+
+
+def _dumps_json(obj: Any) -> bytes:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _loads_json(raw: bytes) -> Any:
+    return json.loads(raw)
+
+
+def _unwrap_optional(tp: Any) -> tuple[Any, bool]:
+    if typing.get_origin(tp) in (typing.Union, types.UnionType):
+        args = [arg for arg in typing.get_args(tp) if arg is not type(None)]
+        if len(args) == 1:
+            return args[0], True
+    return tp, False
+
+
+def _field_templates(tp: Any, type_name: str, *, native: bool) -> tuple[str, str, Any]:
+    """
+    필드 타입에 맞는 (encode, decode) 식 템플릿과 decode에 쓸 타입.
+    native=True면 JSON 백엔드(orjson)가 UUID/datetime/Enum을 직접 직렬화하므로 encode는 그대로 둔다.
+    """
+    tp, optional = _unwrap_optional(tp)
+    while hasattr(tp, "__supertype__"):  # NewType (ConversationId, MessageId, ...)
+        tp = tp.__supertype__
+
+    encode, decode = "{v}", "{v}"
+    if tp is UUID:
+        encode, decode = "str({v})", type_name + "({v})"
+    elif tp is datetime:
+        encode, decode = "{v}.isoformat()", type_name + ".fromisoformat({v})"
+    elif isinstance(tp, type) and issubclass(tp, Enum):
+        encode, decode = "{v}.value", type_name + "({v})"
+
+    if native:
+        encode = "{v}"
+    if optional:
+        if encode != "{v}":
+            encode = "(None if {v} is None else " + encode + ")"
+        if decode != "{v}":
+            decode = "(None if {v} is None else " + decode + ")"
+    return encode, decode, tp
+
+
+class EventCodec:
+    """
+    하나의 BaseEvent 하위 클래스용 encoder/decoder.
+
+    필드 목록과 타입 변환을 생성 시점에 파이썬 함수로 컴파일해 두므로 encode/decode는
+    json.dumps(default=...)처럼 값마다 타입을 검사하지 않고, decode는
+    UUID/datetime/Enum 필드를 원래 타입으로 되돌린다.
+    """
+
+    def __init__(self, event_cls: Type[BaseEvent], *, native: bool = False) -> None:
+        self.event_cls = event_cls
+        self.event_type = event_cls.__name__
+        self.schema_version = event_cls.schema_version
+
+        hints = typing.get_type_hints(event_cls)
+        namespace: dict[str, Any] = {"_cls": event_cls}
+        encode_items: list[str] = []
+        decode_items: list[str] = []
+        slow_decode: list[str] = []
+        for i, f in enumerate(field for field in dataclasses.fields(event_cls) if field.init):
+            type_name = f"_t{i}"
+            encode, decode, namespace[type_name] = _field_templates(hints[f.name], type_name, native=native)
+            encode_items.append(f"{f.name!r}: " + encode.format(v=f"e.{f.name}"))
+            decode_items.append(f"{f.name}=" + decode.format(v=f"d[{f.name!r}]"))
+            slow_decode.append(
+                f"    if {f.name!r} in d:\n        kw[{f.name!r}] = " + decode.format(v=f"d[{f.name!r}]")
+            )
+
+        source = (
+            "def encode(e):\n"
+            f"    return {{'event_type': {self.event_type!r}, 'schema_version': {self.schema_version},"
+            f" 'data': {{{', '.join(encode_items)}}}}}\n"
+            "def decode_complete(d):\n"
+            f"    return _cls({', '.join(decode_items)})\n"
+            "def decode_partial(d):\n"
+            "    kw = {}\n" + "\n".join(slow_decode) + "\n"
+            "    return _cls(**kw)\n"
+        )
+        exec(compile(source, f"<codec {self.event_type}>", "exec"), namespace)
+        self.to_payload: Callable[[BaseEvent], dict[str, Any]] = namespace["encode"]
+        self._decode_complete: Callable[[dict[str, Any]], BaseEvent] = namespace["decode_complete"]
+        self._decode_partial: Callable[[dict[str, Any]], BaseEvent] = namespace["decode_partial"]
+
+    def from_data(self, data: dict[str, Any]) -> BaseEvent:
+        # 더 새로운/오래된 schema의 이벤트는 아는 필드만 읽고 없는 필드는 기본값을 쓴다.
+        try:
+            return self._decode_complete(data)
+        except KeyError:
+            return self._decode_partial(data)
+
+
+class EventCodecRegistry:
+    """
+    event_type 이름 → EventCodec. 등록하지 않은 클래스는 처음 encode 할 때 codec을 만든다.
+
+    봉투 형식은 {"event_type", "schema_version", "data"}이며, schema_version이 없는
+    이전 형식의 메시지도 그대로 읽는다.
+    """
+
+    def __init__(
+        self,
+        event_types: Iterable[Type[BaseEvent]] = (),
+        *,
+        use_fast_json: bool = True,
+    ) -> None:
+        fast = use_fast_json and orjson is not None
+        self._native = fast
+        self._dumps: Callable[[Any], bytes] = orjson.dumps if fast else _dumps_json
+        self._loads: Callable[[bytes], Any] = orjson.loads if fast else _loads_json
+        self._by_class: dict[Type[BaseEvent], EventCodec] = {}
+        self._by_name: dict[str, EventCodec] = {}
+        for event_cls in event_types:
+            self.register(event_cls)
+
+    @property
+    def backend(self) -> str:
+        return "orjson" if self._native else "json"
+
+    def register(self, event_cls: Type[BaseEvent]) -> EventCodec:
+        codec = EventCodec(event_cls, native=self._native)
+        self._by_class[event_cls] = codec
+        self._by_name[codec.event_type] = codec
+        return codec
+
+    def encode(self, event: BaseEvent) -> bytes:
+        codec = self._by_class.get(type(event)) or self.register(type(event))
+        return self._dumps(codec.to_payload(event))
+
+    def decode_raw(self, raw: bytes) -> tuple[str | None, dict[str, Any]]:
+        """
+        이벤트 객체를 만들지 않고 (event_type, data)만 돌려준다. UUID/datetime/Enum 필드는 JSON 값(문자열) 그대로다.
+        몇 개 필드만 읽는 대량 replay에서 decode()의 필드 변환과 객체 생성 비용을 건너뛸 때 쓴다.
+        """
+        payload = self._loads(raw)
+        return payload.get("event_type"), payload.get("data", {})
+
+    def decode(self, raw: bytes) -> BaseEvent | None:
+        payload = self._loads(raw)
+        codec = self._by_name.get(payload.get("event_type"))
+        if codec is None:
+            return None
+        return codec.from_data(payload.get("data", {}))
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Protocol
+from uuid import UUID
+
+
+class ProcessedEventStore(Protocol):
+    """
+    consumer가 처리한 event_id 기록. redelivery된 이벤트가 handler(LLM 호출 등)를 다시 실행하지 않게 한다.
+
+    claim()이 True를 돌려준 쪽만 이벤트를 처리하고, 성공하면 complete()로 처리 완료를 기록한다.
+    handler가 실패하거나 취소되면 release()로 claim을 지워 재전송 때 다시 처리할 수 있게 한다.
+    release() 전에 프로세스가 죽어 complete 되지 않은 claim은 구현이 정한 lease가 끝나면 다시 claim 할 수 있다.
+    """
+
+    async def claim(self, event_id: UUID) -> bool: ...
+
+    async def complete(self, event_id: UUID) -> None: ...
+
+    async def release(self, event_id: UUID) -> None: ...
+
+    async def claim_many(self, event_ids: Iterable[UUID]) -> set[UUID]:
+        """새로 claim 한 event_id만 돌려준다. batch consumer가 한 번의 round trip으로 거를 때 쓴다."""
+        return {event_id for event_id in event_ids if await self.claim(event_id)}
+
+    async def complete_many(self, event_ids: Iterable[UUID]) -> None:
+        for event_id in event_ids:
+            await self.complete(event_id)
+
+    async def release_many(self, event_ids: Iterable[UUID]) -> None:
+        for event_id in event_ids:
+            await self.release(event_id)
+
+
+class InMemoryProcessedEventStore(ProcessedEventStore):
+    """프로세스 안에서만 유효한 최근 max_entries 개의 event_id (LRU)."""
+
+    def __init__(self, max_entries: int) -> None:
+        self._max_entries = max_entries
+        self._seen: OrderedDict[UUID, None] = OrderedDict()
+
+    async def claim(self, event_id: UUID) -> bool:
+        if event_id in self._seen:
+            self._seen.move_to_end(event_id)
+            return False
+        self._seen[event_id] = None
+        while len(self._seen) > self._max_entries:
+            self._seen.popitem(last=False)
+        return True
+
+    async def complete(self, event_id: UUID) -> None:
+        # 기록은 프로세스와 함께 사라지므로 lease가 필요 없다. claim이 곧 처리 기록이다.
+        return None
+
+    async def release(self, event_id: UUID) -> None:
+        self._seen.pop(event_id, None)
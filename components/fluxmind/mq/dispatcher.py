@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+from fluxmind.domain_core import BaseEvent
+
+EventHandler = Callable[[BaseEvent], Awaitable[Any]]
+
+
+def conversation_key(event: BaseEvent) -> Hashable:
+    # conversation이 없는 이벤트는 순서를 지킬 대상이 없으므로 이벤트마다 다른 key를 쓴다.
+    return getattr(event, "conversation_id", None) or event.event_id
+
+
+class KeyedEventDispatcher:
+    """
+    key(기본: conversation_id)별 큐로 이벤트를 나눠 처리한다.
+
+    - 같은 key의 이벤트는 도착 순서대로 하나씩 처리한다.
+    - 서로 다른 key는 최대 max_concurrency 개까지 동시에 handler를 실행한다.
+    - 아직 끝나지 않은(대기 + 실행 중) 이벤트가 max_in_flight 개면 submit()이
+      자리가 날 때까지 기다리므로 consumer가 더 읽어 오지 않는다 (backpressure).
+
+    handler 예외는 로그를 남기고 해당 이벤트의 future에 담으며, 같은 key의 다음 이벤트는 계속 처리한다.
+    """
+
+    def __init__(
+        self,
+        handler: EventHandler,
+        *,
+        max_concurrency: int,
+        max_in_flight: int | None = None,
+        key: Callable[[BaseEvent], Hashable] = conversation_key,
+    ) -> None:
+        self._handler = handler
+        self._key = key
+        self._running = asyncio.Semaphore(max_concurrency)
+        self._in_flight = asyncio.Semaphore(max_in_flight or max_concurrency * 4)
+        self._queues: dict[Hashable, deque[tuple[BaseEvent, asyncio.Future[Any]]]] = {}
+        self._workers: set[asyncio.Task[None]] = set()
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def active_keys(self) -> int:
+        return len(self._queues)
+
+    async def submit(self, event: BaseEvent) -> asyncio.Future[Any]:
+        await self._in_flight.acquire()
+        done: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        key = self._key(event)
+        queue = self._queues.get(key)
+        if queue is not None:
+            queue.append((event, done))
+            return done
+
+        self._queues[key] = deque([(event, done)])
+        self._idle.clear()
+        worker = asyncio.create_task(self._drain(key))
+        self._workers.add(worker)
+        worker.add_done_callback(self._workers.discard)
+        return done
+
+    async def join(self) -> None:
+        await self._idle.wait()
+
+    async def stop(self) -> None:
+        for worker in list(self._workers):
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for queue in self._queues.values():
+            for _, done in queue:
+                done.cancel()
+        self._queues.clear()
+        self._idle.set()
+
+    async def _drain(self, key: Hashable) -> None:
+        queue = self._queues[key]
+        while queue:
+            event, done = queue[0]
+            try:
+                async with self._running:
+                    result = await self._handler(event)
+            except asyncio.CancelledError:
+                # finally에서 큐에서 빠지므로 stop()이 취소하지 못한다. 여기서 취소해야 기다리는 쪽이 멈추지 않는다.
+                done.cancel()
+                raise
+            except Exception as e:
+                print(f"Error handling {event.event_type} {event.event_id}: {e}")
+                done.set_exception(e)
+                # 결과를 기다리는 쪽이 없어도 "exception was never retrieved" 경고가 나지 않게 한다.
+                done.exception()
+            else:
+                done.set_result(result)
+            finally:
+                queue.popleft()
+                self._in_flight.release()
+
+        del self._queues[key]
+        if not self._queues:
+            self._idle.set()
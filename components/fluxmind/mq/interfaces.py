@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import inspect
 from abc import ABC, abstractmethod
-from collections.abc import AsyncIterator, Callable
-from typing import Protocol, TypeVar
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Protocol, TypeVar
 
 from fluxmind.domain_core import BaseEvent
 
@@ -12,6 +15,64 @@ E = TypeVar("E", bound=BaseEvent)
 class EventPublisher(Protocol):
     async def publish(self, topic: str, event: BaseEvent, *, partition_key: str | None = None) -> None: ...
 
+    async def publish_many(
+        self,
+        topic: str,
+        events: Sequence[BaseEvent],
+        *,
+        partition_keys: Sequence[str | None] | None = None,
+    ) -> None:
+        keys = partition_keys if partition_keys is not None else [None] * len(events)
+        for event, key in zip(events, keys, strict=True):
+            await self.publish(topic, event, partition_key=key)
+
+    async def publish_encoded_many(
+        self,
+        topic: str,
+        payloads: Sequence[bytes],
+        *,
+        partition_keys: Sequence[str | None] | None = None,
+    ) -> list[Exception | None]:
+        """
+        EventCodecRegistry로 이미 인코딩한 이벤트를 다시 인코딩하지 않고 보낸다 (outbox relay).
+        이벤트마다 보내지 못한 이유를 돌려주고(보냈으면 None), 전송 자체가 실패하면 예외를 올린다.
+        """
+        ...
+
+    async def send(
+        self,
+        topic: str,
+        event: BaseEvent,
+        *,
+        partition_key: str | None = None,
+    ) -> asyncio.Future[Any]:
+        """
+        전송을 큐에 넣고 delivery future를 바로 돌려준다 (fire-and-collect).
+        배치 전송을 지원하지 않는 구현은 publish() 후 완료된 future를 돌려준다.
+        """
+        await self.publish(topic, event, partition_key=partition_key)
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        future.set_result(None)
+        return future
+
+    async def flush(self) -> None:
+        return None
+
+
+def _noop() -> None:
+    return None
+
+
+@dataclass(slots=True, frozen=True)
+class Delivery:
+    """
+    subscriber가 넘겨준 이벤트와 처리 완료 신호.
+    ack()를 호출한 이벤트까지만 offset이 commit 되므로 handler가 끝난 뒤에 호출한다.
+    """
+
+    event: BaseEvent
+    ack: Callable[[], None] = _noop
+
 
 class EventSubscriber(ABC):
     @abstractmethod
@@ -20,10 +81,31 @@ class EventSubscriber(ABC):
         topic: str,
     ) -> AsyncIterator[BaseEvent]: ...
 
+    async def deliveries(self, topic: str) -> AsyncIterator[Delivery]:
+        # 수동 commit을 지원하지 않는 구현은 ack가 아무 일도 하지 않는다.
+        async for event in self.iterate(topic):
+            yield Delivery(event)
+
+    async def iterate_batches(
+        self,
+        topic: str,
+        *,
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+    ) -> AsyncIterator[list[Delivery]]:
+        """
+        최대 max_records 개씩 묶어서 돌려준다. 쌓인 이벤트가 없으면 timeout_ms까지 기다린다.
+        배치를 지원하지 않는 구현은 이벤트 하나짜리 배치를 돌려준다.
+        """
+        async for delivery in self.deliveries(topic):
+            yield [delivery]
+
     async def consume(
         self,
         topic: str,
-        handler: Callable[[BaseEvent], None | object | BaseException],
+        handler: Callable[[BaseEvent], Awaitable[None] | None],
     ) -> None:
         async for event in self.iterate(topic):
-            handler(event)
+            result = handler(event)
+            if inspect.isawaitable(result):
+                await result
@@ -1,49 +1,103 @@
 from __future__ import annotations
 
-import json
-from collections.abc import AsyncIterator
-from datetime import datetime
-from enum import Enum
-from typing import Type
-from uuid import UUID
-
-from aiokafka import AIOKafkaConsumer, AIOKafkaProducer
-from fluxmind.domain_core import BaseEvent
+import asyncio
+import contextlib
+import functools
+import time
+from collections.abc import AsyncIterator, Sequence
+from dataclasses import dataclass
+from typing import Any, Type
 
-from .interfaces import EventPublisher, EventSubscriber
+from aiokafka import AIOKafkaConsumer, AIOKafkaProducer, TopicPartition
+from aiokafka.abc import ConsumerRebalanceListener
+from fluxmind.domain_core import BaseEvent
+from fluxmind.platform import AppSettings
 
+from .claim_check import ClaimCheck
+from .codec import EventCodecRegistry
+from .interfaces import Delivery, EventPublisher, EventSubscriber
+from .offsets import OffsetTracker
 
-def _json_default(obj: object) -> str:
-    """
-    중앙 집중 JSON 직렬화 규칙.
 
-    - UUID      → str
-    - datetime  → ISO 문자열
-    - Enum      → value
-    나머지는 일단 str()로 강제 직렬화한다.
-    """
-    if isinstance(obj, UUID):
-        return str(obj)
-    if isinstance(obj, datetime):
-        return obj.isoformat()
-    if isinstance(obj, Enum):
-        return obj.value
-    return str(obj)
+@dataclass(slots=True, frozen=True)
+class PublisherMetrics:
+    sent: int
+    delivered: int
+    failed: int
+    in_flight: int
+    batches: int
+    batch_events_total: int
+    batch_events_max: int
+    delivery_seconds_total: float
+    delivery_seconds_max: float
 
 
 class KafkaEventPublisher(EventPublisher):
-    def __init__(self, bootstrap_servers: str) -> None:
+    """
+    publish()는 전송 완료(ack)까지 기다리고, send()는 producer 배치에 넣은 뒤
+    delivery future를 바로 돌려준다. 완료되지 않은 전송이 max_in_flight 개에
+    이르면 다음 send()가 flush()로 전부 끝날 때까지 기다린다.
+    publish_many()는 모든 이벤트를 먼저 배치에 넣고 한 번에 기다리므로
+    linger_ms/max_batch_size 안에서 broker round trip을 공유한다.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        *,
+        linger_ms: int = 0,
+        max_batch_size: int = 16384,
+        compression_type: str | None = None,
+        acks: int | str = 1,
+        enable_idempotence: bool = False,
+        max_in_flight: int = 1000,
+        codec: EventCodecRegistry | None = None,
+        claim_check: ClaimCheck | None = None,
+    ) -> None:
         self._bootstrap_servers = bootstrap_servers
+        self._codec = codec or EventCodecRegistry()
+        self._claim_check = claim_check
+        self._linger_ms = linger_ms
+        self._max_batch_size = max_batch_size
+        self._compression_type = compression_type
+        self._acks = acks
+        self._enable_idempotence = enable_idempotence
+        self._max_in_flight = max_in_flight
         self._producer: AIOKafkaProducer | None = None
         self._started: bool = False
+        self._in_flight: set[asyncio.Future[Any]] = set()
+        self._sent = 0
+        self._delivered = 0
+        self._failed = 0
+        self._batches = 0
+        self._batch_events_total = 0
+        self._batch_events_max = 0
+        self._delivery_total = 0.0
+        self._delivery_max = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings, *, claim_check: ClaimCheck | None = None) -> KafkaEventPublisher:
+        acks = settings.mq_producer_acks
+        return cls(
+            bootstrap_servers=settings.mq_bootstrap_servers,
+            linger_ms=settings.mq_producer_linger_ms,
+            max_batch_size=settings.mq_producer_max_batch_size,
+            compression_type=settings.mq_producer_compression_type or None,
+            acks=acks if acks == "all" else int(acks),
+            enable_idempotence=settings.mq_producer_enable_idempotence,
+            max_in_flight=settings.mq_producer_max_in_flight,
+            claim_check=claim_check,
+        )
 
     async def _ensure_started(self) -> None:
         if self._producer is None:
             self._producer = AIOKafkaProducer(
                 bootstrap_servers=self._bootstrap_servers,
-                # 이벤트(dataclass)를 그대로 넘기되,
-                # json.dumps(default=_json_default)로 UUID/datetime/Enum 등을 문자열로 변환한다.
-                value_serializer=lambda v: json.dumps(v, default=_json_default).encode("utf-8"),
+                linger_ms=self._linger_ms,
+                max_batch_size=self._max_batch_size,
+                compression_type=self._compression_type,
+                acks=self._acks,
+                enable_idempotence=self._enable_idempotence,
             )
         if not self._started:
             await self._producer.start()
@@ -51,44 +105,626 @@ class KafkaEventPublisher(EventPublisher):
 
     async def stop(self) -> None:
         if self._producer is not None and self._started:
+            await self.flush()
             await self._producer.stop()
             self._started = False
 
     async def publish(self, topic: str, event: BaseEvent, *, partition_key: str | None = None) -> None:
+        await (await self.send(topic, event, partition_key=partition_key))
+
+    async def publish_many(
+        self,
+        topic: str,
+        events: Sequence[BaseEvent],
+        *,
+        partition_keys: Sequence[str | None] | None = None,
+    ) -> None:
+        keys = partition_keys if partition_keys is not None else [None] * len(events)
+        futures = [
+            await self.send(topic, event, partition_key=key) for event, key in zip(events, keys, strict=True)
+        ]
+        self._record_batch(len(futures))
+        await asyncio.gather(*futures)
+
+    async def publish_encoded_many(
+        self,
+        topic: str,
+        payloads: Sequence[bytes],
+        *,
+        partition_keys: Sequence[str | None] | None = None,
+    ) -> list[Exception | None]:
+        keys = partition_keys if partition_keys is not None else [None] * len(payloads)
+        futures = [
+            await self._send_encoded(topic, payload, partition_key=key)
+            for payload, key in zip(payloads, keys, strict=True)
+        ]
+        self._record_batch(len(futures))
+        await asyncio.gather(*futures)
+        # bytes를 그대로 보내므로 이벤트 하나만 거절되는 일은 없다.
+        return [None] * len(futures)
+
+    async def send(
+        self,
+        topic: str,
+        event: BaseEvent,
+        *,
+        partition_key: str | None = None,
+    ) -> asyncio.Future[Any]:
+        if self._claim_check is not None:
+            event = await self._claim_check.offload(event)
+        return await self._send_encoded(topic, self._codec.encode(event), partition_key=partition_key)
+
+    async def _send_encoded(self, topic: str, payload: bytes, *, partition_key: str | None) -> asyncio.Future[Any]:
         await self._ensure_started()
         assert self._producer is not None
-        payload = {
-            "event_type": event.event_type,
-            "data": event.__dict__,
-        }
-        if partition_key:
-            await self._producer.send_and_wait(topic, payload, key=partition_key.encode("utf-8"))
-        else:
-            await self._producer.send_and_wait(topic, payload)
+        if len(self._in_flight) >= self._max_in_flight:
+            await self.flush()
+
+        started = time.perf_counter()
+        future = await self._producer.send(
+            topic,
+            payload,
+            key=partition_key.encode("utf-8") if partition_key else None,
+        )
+        self._sent += 1
+        self._in_flight.add(future)
+        future.add_done_callback(functools.partial(self._on_delivery, started))
+        return future
+
+    async def flush(self) -> None:
+        if not self._in_flight:
+            return
+        pending = list(self._in_flight)
+        self._record_batch(len(pending))
+        if self._producer is not None:
+            # linger_ms를 기다리지 않고 쌓인 배치를 바로 보낸다.
+            await self._producer.flush()
+        # 실패는 _on_delivery에서 집계/로그하므로 여기서는 완료만 기다린다.
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def metrics(self) -> PublisherMetrics:
+        return PublisherMetrics(
+            sent=self._sent,
+            delivered=self._delivered,
+            failed=self._failed,
+            in_flight=len(self._in_flight),
+            batches=self._batches,
+            batch_events_total=self._batch_events_total,
+            batch_events_max=self._batch_events_max,
+            delivery_seconds_total=self._delivery_total,
+            delivery_seconds_max=self._delivery_max,
+        )
+
+    def _record_batch(self, size: int) -> None:
+        self._batches += 1
+        self._batch_events_total += size
+        self._batch_events_max = max(self._batch_events_max, size)
+
+    def _on_delivery(self, started: float, future: asyncio.Future[Any]) -> None:
+        self._in_flight.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            self._failed += 1
+            if not future.cancelled():
+                print(f"Kafka delivery failed: {future.exception()}")
+            return
+        elapsed = time.perf_counter() - started
+        self._delivered += 1
+        self._delivery_total += elapsed
+        self._delivery_max = max(self._delivery_max, elapsed)
+
+
+@dataclass(slots=True, frozen=True)
+class PartitionMetrics:
+    topic: str
+    partition: int
+    # highwater - 연속으로 처리가 끝난 위치. 아직 처리하지 못한(버퍼/처리 중 포함) 레코드 수.
+    lag: int | None
+    in_flight: int
+    processed: int
+    processing_seconds_total: float
+    processing_seconds_max: float
+
+
+@dataclass(slots=True, frozen=True)
+class ConsumerMetrics:
+    group_id: str
+    topic: str
+    in_flight: int
+    paused: bool
+    pauses: int
+    partitions: list[PartitionMetrics]
+
+
+@dataclass(slots=True)
+class _PartitionStats:
+    processed: int = 0
+    seconds_total: float = 0.0
+    seconds_max: float = 0.0
+
+
+class _ConsumerFlow(ConsumerRebalanceListener):
+    """
+    수동 commit consumer 하나의 흐름 제어.
+
+    - ack 된 offset을 모아 commit_interval_ms마다, 또는 ack가 commit_max_messages 개
+      쌓일 때마다 한 번에 commit 한다. 파티션을 뺏기기 전에도 끝난 만큼 commit 한다.
+    - 받았지만 ack 되지 않은 레코드가 max_buffered 개에 이르면 할당된 파티션을 모두
+      pause() 해서 fetch를 멈추고, resume_buffered 개 이하로 줄면 resume() 한다.
+      wait_for_capacity()는 그 사이 레코드를 더 넘겨주지 않도록 기다린다.
+    - 파티션별 처리 시간(넘겨준 시점 → ack)을 집계한다.
+    """
+
+    def __init__(
+        self,
+        consumer: AIOKafkaConsumer,
+        tracker: OffsetTracker,
+        *,
+        interval_ms: int,
+        max_messages: int,
+        max_buffered: int,
+        resume_buffered: int,
+    ) -> None:
+        self._consumer = consumer
+        self._tracker = tracker
+        self._interval = interval_ms / 1000
+        self._max_messages = max_messages
+        self._max_buffered = max_buffered
+        self._resume_buffered = resume_buffered
+        self._acked = 0
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self._started: dict[tuple[TopicPartition, int], float] = {}
+        self._stats: dict[TopicPartition, _PartitionStats] = {}
+        # 이 consumer가 아직 ack 하지 않은 파티션의 group commit 위치. 첫 ack 전 lag 계산에 쓴다.
+        self._committed: dict[TopicPartition, int] = {}
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self._paused = False
+        self._pauses = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._started)
+
+    @property
+    def available(self) -> int:
+        return max(self._max_buffered - self.in_flight, 0)
+
+    def track(self, partition: TopicPartition, offset: int) -> None:
+        self._tracker.track(partition, offset)
+        self._started[(partition, offset)] = time.monotonic()
+        if self.in_flight >= self._max_buffered:
+            self._capacity.clear()
+            if not self._paused:
+                self._consumer.pause(*self._consumer.assignment())
+                self._paused = True
+                self._pauses += 1
+
+    def ack(self, partition: TopicPartition, offset: int) -> None:
+        started = self._started.pop((partition, offset), None)
+        if started is None:
+            # rebalance로 이미 내려놓은 파티션. 다른 consumer가 다시 처리한다.
+            return
+        self._tracker.complete(partition, offset)
+        elapsed = time.monotonic() - started
+        stats = self._stats.setdefault(partition, _PartitionStats())
+        stats.processed += 1
+        stats.seconds_total += elapsed
+        stats.seconds_max = max(stats.seconds_max, elapsed)
+
+        if self.in_flight < self._max_buffered:
+            self._capacity.set()
+        if self._paused and self.in_flight <= self._resume_buffered:
+            self._consumer.resume(*self._consumer.assignment())
+            self._paused = False
+
+        self._acked += 1
+        if self._acked >= self._max_messages:
+            self._wake.set()
+
+    async def wait_for_capacity(self) -> None:
+        await self._capacity.wait()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.commit()
+
+    async def commit(self) -> None:
+        async with self._lock:
+            offsets = self._tracker.committable()
+            self._acked = 0
+            if not offsets:
+                return
+            try:
+                await self._consumer.commit(offsets)
+            except Exception as e:
+                # rebalance 중 실패하면 다음 주기에 다시 시도한다. 못 하면 재전송되고 dedupe가 거른다.
+                print(f"Kafka offset commit failed: {e}")
+                return
+            self._tracker.mark_committed(offsets)
+
+    def metrics(self, group_id: str, topic: str) -> ConsumerMetrics:
+        in_flight: dict[TopicPartition, int] = {}
+        for partition, _ in self._started:
+            in_flight[partition] = in_flight.get(partition, 0) + 1
+
+        partitions = []
+        for partition in sorted(self._consumer.assignment()):
+            highwater = self._consumer.highwater(partition)
+            position = self._tracker.position(partition)
+            if position is None:
+                # 할당 후 아직 끝난 레코드가 없으면 group이 commit 한 위치부터 (없으면 받은 첫 레코드부터) 밀려 있다.
+                position = self._committed.get(partition)
+            if position is None:
+                position = min((offset for tp, offset in self._started if tp == partition), default=None)
+            stats = self._stats.get(partition, _PartitionStats())
+            partitions.append(
+                PartitionMetrics(
+                    topic=partition.topic,
+                    partition=partition.partition,
+                    lag=highwater - position if highwater is not None and position is not None else None,
+                    in_flight=in_flight.get(partition, 0),
+                    processed=stats.processed,
+                    processing_seconds_total=stats.seconds_total,
+                    processing_seconds_max=stats.seconds_max,
+                )
+            )
+        return ConsumerMetrics(
+            group_id=group_id,
+            topic=topic,
+            in_flight=self.in_flight,
+            paused=self._paused,
+            pauses=self._pauses,
+            partitions=partitions,
+        )
+
+    async def on_partitions_revoked(self, revoked: list[TopicPartition]) -> None:
+        await self.commit()
+        self._tracker.forget(revoked)
+        revoked_set = set(revoked)
+        for key in [key for key in self._started if key[0] in revoked_set]:
+            del self._started[key]
+        for partition in revoked_set:
+            self._stats.pop(partition, None)
+            self._committed.pop(partition, None)
+        if self.in_flight < self._max_buffered:
+            self._capacity.set()
+
+    async def on_partitions_assigned(self, assigned: list[TopicPartition]) -> None:
+        # pause 중에 새로 받은 파티션도 resume 전까지는 fetch 하지 않는다.
+        if self._paused and assigned:
+            self._consumer.pause(*assigned)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self._interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.commit()
+            await self._load_committed()
+
+    async def _load_committed(self) -> None:
+        for partition in self._consumer.assignment():
+            if partition in self._committed or self._tracker.position(partition) is not None:
+                continue
+            try:
+                offset = await self._consumer.committed(partition)
+            except Exception as e:
+                print(f"Could not fetch committed offset of {partition.topic}[{partition.partition}]: {e}")
+                continue
+            if offset is not None:
+                self._committed[partition] = offset
 
 
 class KafkaEventSubscriber(EventSubscriber):
-    def __init__(self, bootstrap_servers: str, group_id: str, event_types: dict[str, Type[BaseEvent]]) -> None:
+    """
+    iterate()는 aiokafka auto-commit을 쓴다. deliveries()/iterate_batches()는 auto-commit을 끄고
+    ack()된 이벤트까지만, 파티션별로 연속해서 끝난 offset까지만 배치로 commit 한다.
+    iterate_batches()는 getmany()로 쌓여 있는 레코드를 한 번에 가져온다.
+
+    ack 되지 않은 레코드는 max_buffered_records 개를 넘지 않는다. 한도에 이르면 파티션을
+    pause 하고, resume_buffered_records 개(기본: 절반) 이하로 줄면 resume 한다.
+    metrics()는 진행 중인 consumer의 파티션별 lag과 처리 시간을 돌려준다.
+    """
+
+    def __init__(
+        self,
+        bootstrap_servers: str,
+        group_id: str,
+        event_types: dict[str, Type[BaseEvent]],
+        *,
+        codec: EventCodecRegistry | None = None,
+        commit_interval_ms: int = 1000,
+        commit_max_messages: int = 100,
+        max_buffered_records: int = 1000,
+        resume_buffered_records: int | None = None,
+    ) -> None:
         self._bootstrap_servers = bootstrap_servers
         self._group_id = group_id
-        self._event_types = event_types
+        self._codec = codec or EventCodecRegistry(event_types.values())
+        self._commit_interval_ms = commit_interval_ms
+        self._commit_max_messages = commit_max_messages
+        self._max_buffered_records = max_buffered_records
+        self._resume_buffered_records = (
+            resume_buffered_records if resume_buffered_records is not None else max_buffered_records // 2
+        )
+        self._flow: tuple[str, _ConsumerFlow] | None = None
+
+    def metrics(self) -> ConsumerMetrics | None:
+        if self._flow is None:
+            return None
+        topic, flow = self._flow
+        return flow.metrics(self._group_id, topic)
 
     async def iterate(self, topic: str) -> AsyncIterator[BaseEvent]:
         consumer = AIOKafkaConsumer(
             topic,
             bootstrap_servers=self._bootstrap_servers,
             group_id=self._group_id,
-            value_deserializer=lambda v: json.loads(v.decode("utf-8")),
         )
         await consumer.start()
         try:
             async for msg in consumer:
-                payload = msg.value
-                event_type = payload.get("event_type")
-                data = payload.get("data", {})
-                cls = self._event_types.get(event_type)
-                if cls is None:
+                event = self._codec.decode(msg.value)
+                if event is None:
                     continue
-                yield cls(**data)
+                yield event
+        finally:
+            await consumer.stop()
+
+    async def deliveries(self, topic: str) -> AsyncIterator[Delivery]:
+        async with self._manual_commit_consumer(topic) as (consumer, flow):
+            while True:
+                await flow.wait_for_capacity()
+                delivery = self._delivery(await consumer.getone(), flow)
+                if delivery is not None:
+                    yield delivery
+
+    async def iterate_batches(
+        self,
+        topic: str,
+        *,
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+    ) -> AsyncIterator[list[Delivery]]:
+        async with self._manual_commit_consumer(topic) as (consumer, flow):
+            while True:
+                await flow.wait_for_capacity()
+                records = await consumer.getmany(
+                    timeout_ms=timeout_ms,
+                    max_records=min(max_records, flow.available),
+                )
+                batch = [
+                    delivery
+                    for messages in records.values()
+                    for msg in messages
+                    if (delivery := self._delivery(msg, flow)) is not None
+                ]
+                if batch:
+                    yield batch
+
+    @contextlib.asynccontextmanager
+    async def _manual_commit_consumer(
+        self,
+        topic: str,
+    ) -> AsyncIterator[tuple[AIOKafkaConsumer, _ConsumerFlow]]:
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=self._bootstrap_servers,
+            group_id=self._group_id,
+            enable_auto_commit=False,
+        )
+        flow = _ConsumerFlow(
+            consumer,
+            OffsetTracker(),
+            interval_ms=self._commit_interval_ms,
+            max_messages=self._commit_max_messages,
+            max_buffered=self._max_buffered_records,
+            resume_buffered=self._resume_buffered_records,
+        )
+        consumer.subscribe([topic], listener=flow)
+        await consumer.start()
+        flow.start()
+        self._flow = (topic, flow)
+        try:
+            yield consumer, flow
+        finally:
+            self._flow = None
+            await flow.stop()
+            await consumer.stop()
+
+    def _delivery(self, msg: Any, flow: _ConsumerFlow) -> Delivery | None:
+        partition = TopicPartition(msg.topic, msg.partition)
+        flow.track(partition, msg.offset)
+        try:
+            event = self._codec.decode(msg.value)
+        except Exception as e:
+            # 읽을 수 없는 레코드 하나 때문에 파티션 전체가 멈추지 않도록 위치를 남기고 건너뛴다.
+            print(f"Skipping undecodable record {msg.topic}[{msg.partition}]@{msg.offset}: {e}")
+            event = None
+        if event is None:
+            # 모르는 이벤트도 commit 위치를 막지 않도록 바로 끝난 것으로 친다.
+            flow.ack(partition, msg.offset)
+            return None
+        return Delivery(event, functools.partial(flow.ack, partition, msg.offset))
+
+
+@dataclass(slots=True, frozen=True)
+class TopicRecord:
+    partition: int
+    offset: int
+    event: BaseEvent
+
+
+async def read_topic(
+    bootstrap_servers: str,
+    topic: str,
+    event_types: dict[str, Type[BaseEvent]],
+    *,
+    codec: EventCodecRegistry | None = None,
+) -> AsyncIterator[TopicRecord]:
+    """
+    topic을 처음부터, 읽기 시작한 시점의 끝 offset까지 읽고 끝낸다.
+    consumer group 없이 읽으므로 offset을 commit 하지 않고, 다른 consumer에 영향이 없다 (dead-letter 점검용).
+    """
+    codec = codec or EventCodecRegistry(event_types.values())
+    consumer = AIOKafkaConsumer(bootstrap_servers=bootstrap_servers, enable_auto_commit=False)
+    await consumer.start()
+    try:
+        await consumer.topics()  # 파티션 목록을 알기 위해 metadata를 받아 온다.
+        partitions = [TopicPartition(topic, p) for p in sorted(consumer.partitions_for_topic(topic) or ())]
+        if not partitions:
+            return
+        consumer.assign(partitions)
+        await consumer.seek_to_beginning(*partitions)
+        beginning = await consumer.beginning_offsets(partitions)
+        end = await consumer.end_offsets(partitions)
+        remaining = {tp for tp in partitions if end[tp] > beginning[tp]}
+        while remaining:
+            records = await consumer.getmany(*remaining, timeout_ms=1000)
+            for tp, messages in records.items():
+                for msg in messages:
+                    if msg.offset >= end[tp]:
+                        continue
+                    event = codec.decode(msg.value)
+                    if event is not None:
+                        yield TopicRecord(msg.partition, msg.offset, event)
+            for tp in list(remaining):
+                if await consumer.position(tp) >= end[tp]:
+                    remaining.discard(tp)
+    finally:
+        await consumer.stop()
+
+
+class KafkaTopicReader:
+    """
+    topic의 파티션을 직접 배정해서 정해진 offset 범위를 읽는다 (analytics replay용).
+
+    consumer group에 참여하지 않으므로 실시간 consumer의 rebalance를 일으키지 않는다.
+    디코딩은 하지 않고 원본 bytes를 돌려주어 호출한 쪽이 가장 싼 경로로 처리하게 한다.
+    """
+
+    def __init__(self, bootstrap_servers: str, topic: str, *, max_records: int = 5000) -> None:
+        self._bootstrap_servers = bootstrap_servers
+        self._topic = topic
+        self._max_records = max_records
+        self._consumer: AIOKafkaConsumer | None = None
+        self._partitions: list[TopicPartition] = []
+
+    @property
+    def topic(self) -> str:
+        return self._topic
+
+    async def start(self) -> None:
+        # 큰 fetch로 왕복 횟수를 줄인다. replay는 지연보다 처리량이 중요하다.
+        self._consumer = AIOKafkaConsumer(
+            bootstrap_servers=self._bootstrap_servers,
+            enable_auto_commit=False,
+            auto_offset_reset="earliest",
+            fetch_max_bytes=64 * 1024 * 1024,
+            max_partition_fetch_bytes=8 * 1024 * 1024,
+        )
+        await self._consumer.start()
+        await self._consumer.topics()  # 파티션 목록을 알기 위해 metadata를 받아 온다.
+        self._partitions = [
+            TopicPartition(self._topic, p) for p in sorted(self._consumer.partitions_for_topic(self._topic) or ())
+        ]
+        if self._partitions:
+            self._consumer.assign(self._partitions)
+
+    async def stop(self) -> None:
+        if self._consumer is not None:
+            await self._consumer.stop()
+            self._consumer = None
+
+    async def end_offsets(self) -> dict[int, int]:
+        consumer = self._started()
+        if not self._partitions:
+            return {}
+        end = await consumer.end_offsets(self._partitions)
+        return {tp.partition: offset for tp, offset in end.items()}
+
+    async def start_offsets(
+        self,
+        *,
+        from_timestamp_ms: int | None = None,
+        from_offset: int | None = None,
+    ) -> dict[int, int]:
+        """아무것도 주지 않으면 처음부터. from_offset은 모든 파티션에 같이 적용하고 남아 있는 범위로 자른다."""
+        consumer = self._started()
+        if not self._partitions:
+            return {}
+        beginning = await consumer.beginning_offsets(self._partitions)
+        end = await consumer.end_offsets(self._partitions)
+        if from_timestamp_ms is not None:
+            found = await consumer.offsets_for_times({tp: from_timestamp_ms for tp in self._partitions})
+            # 그 시각 이후 메시지가 없는 파티션은 None이므로 끝에서 시작한다.
+            return {tp.partition: found[tp].offset if found[tp] is not None else end[tp] for tp in self._partitions}
+        if from_offset is not None:
+            return {tp.partition: min(max(from_offset, beginning[tp]), end[tp]) for tp in self._partitions}
+        return {tp.partition: beginning[tp] for tp in self._partitions}
+
+    async def read(
+        self,
+        positions: dict[int, int],
+        end_offsets: dict[int, int],
+    ) -> AsyncIterator[tuple[int, list[bytes], int]]:
+        """(partition, values, 다음에 읽을 offset)을 fetch 단위로 돌려준다. 모든 파티션이 end_offsets에 닿으면 끝난다."""
+        consumer = self._started()
+        remaining = set()
+        for tp in self._partitions:
+            if positions.get(tp.partition, 0) < end_offsets.get(tp.partition, 0):
+                consumer.seek(tp, positions[tp.partition])
+                remaining.add(tp)
+        while remaining:
+            records = await consumer.getmany(*remaining, timeout_ms=1000, max_records=self._max_records)
+            for tp, messages in records.items():
+                end = end_offsets[tp.partition]
+                values = [msg.value for msg in messages if msg.offset < end and msg.value is not None]
+                if messages:
+                    yield tp.partition, values, min(messages[-1].offset + 1, end)
+            for tp in list(remaining):
+                # compaction/트랜잭션 마커로 offset이 비어 있을 수 있으므로 마지막 메시지가 아니라 position으로 판단한다.
+                if await consumer.position(tp) >= end_offsets[tp.partition]:
+                    remaining.discard(tp)
+                    yield tp.partition, [], end_offsets[tp.partition]
+
+    async def committed(self, group_id: str) -> dict[int, int]:
+        """group이 commit 한 offset. commit이 없는 파티션은 빠진다."""
+        async with self._group_consumer(group_id) as consumer:
+            committed = {tp.partition: await consumer.committed(tp) for tp in self._partitions}
+        return {partition: offset for partition, offset in committed.items() if offset is not None}
+
+    async def commit(self, group_id: str, offsets: dict[int, int]) -> None:
+        """
+        group에 offset을 commit 한다. group member가 살아 있으면 broker가 거절하므로 (generation이 없다)
+        실시간 consumer를 멈추지 않은 채 실행하면 여기서 실패한다.
+        """
+        async with self._group_consumer(group_id) as consumer:
+            await consumer.commit({TopicPartition(self._topic, p): offset for p, offset in offsets.items()})
+
+    @contextlib.asynccontextmanager
+    async def _group_consumer(self, group_id: str) -> AsyncIterator[AIOKafkaConsumer]:
+        consumer = AIOKafkaConsumer(
+            bootstrap_servers=self._bootstrap_servers,
+            group_id=group_id,
+            enable_auto_commit=False,
+        )
+        await consumer.start()
+        try:
+            consumer.assign(self._partitions)
+            yield consumer
         finally:
             await consumer.stop()
+
+    def _started(self) -> AIOKafkaConsumer:
+        if self._consumer is None:
+            raise RuntimeError("KafkaTopicReader.start() must be called first")
+        return self._consumer
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import zlib
+from collections.abc import AsyncIterator, Sequence
+
+from fluxmind.domain_core import BaseEvent
+
+from .codec import EventCodecRegistry
+from .interfaces import Delivery, EventPublisher, EventSubscriber
+
+
+class _GroupQueues:
+    """한 topic을 읽는 consumer group 하나: 파티션별 bounded queue와 파티션 → member 배정."""
+
+    def __init__(self, partitions: int, max_queue_size: int) -> None:
+        self.queues: list[asyncio.Queue[BaseEvent]] = [asyncio.Queue(max_queue_size) for _ in range(partitions)]
+        self.members: list[object] = []
+        self.assignment: dict[object, list[asyncio.Queue[BaseEvent]]] = {}
+        # 새 이벤트가 들어왔거나 배정이 바뀌면 set 된다. 깨어난 member는 자기 파티션을 다시 확인한다.
+        self.changed = asyncio.Event()
+
+    def rebalance(self) -> None:
+        count = len(self.members)
+        self.assignment = {
+            member: [queue for partition, queue in enumerate(self.queues) if partition % count == index]
+            for index, member in enumerate(self.members)
+        }
+        self.changed.set()
+
+
+class InMemoryBroker:
+    """
+    한 프로세스 안의 asyncio 이벤트 버스. Kafka 없이 전체 파이프라인을 돌릴 때 쓴다.
+
+    - topic마다 partitions 개의 파티션이 있고 partition_key가 같은 이벤트는 같은 파티션으로 간다.
+    - consumer group마다 모든 이벤트를 한 번씩 받는다. 같은 group의 subscriber들은 파티션을 나눠 갖는다.
+    - 파티션 queue는 max_queue_size 개로 제한되며, 가득 차면 publish()가 기다린다.
+
+    메모리에만 있으므로 재시작하면 처리되지 않은 이벤트는 사라지고, 아직 declare() 되지 않은
+    group은 그 이전 이벤트를 받지 못한다.
+    """
+
+    def __init__(self, *, partitions: int = 8, max_queue_size: int = 1000) -> None:
+        self._partitions = partitions
+        self._max_queue_size = max_queue_size
+        self._groups: dict[str, dict[str, _GroupQueues]] = {}
+        self._round_robin = itertools.count()
+
+    def declare(self, topic: str, group_id: str) -> None:
+        groups = self._groups.setdefault(topic, {})
+        if group_id not in groups:
+            groups[group_id] = _GroupQueues(self._partitions, self._max_queue_size)
+
+    def partition_for(self, partition_key: str | None) -> int:
+        if partition_key is None:
+            return next(self._round_robin) % self._partitions
+        # hash()는 프로세스마다 달라지므로 고정된 checksum을 쓴다.
+        return zlib.crc32(partition_key.encode("utf-8")) % self._partitions
+
+    async def publish(self, topic: str, event: BaseEvent, *, partition_key: str | None = None) -> None:
+        partition = self.partition_for(partition_key)
+        for group in list(self._groups.get(topic, {}).values()):
+            await group.queues[partition].put(event)
+            group.changed.set()
+
+    def backlog(self, topic: str, group_id: str) -> int:
+        group = self._groups.get(topic, {}).get(group_id)
+        return sum(queue.qsize() for queue in group.queues) if group is not None else 0
+
+    def join(self, topic: str, group_id: str, member: object) -> _GroupQueues:
+        self.declare(topic, group_id)
+        group = self._groups[topic][group_id]
+        group.members.append(member)
+        group.rebalance()
+        return group
+
+    def leave(self, group: _GroupQueues, member: object) -> None:
+        group.members.remove(member)
+        group.rebalance()
+
+
+class InMemoryEventPublisher(EventPublisher):
+    """
+    broker에는 이벤트 객체를 넘기므로 publish_encoded_many()는 codec으로 디코드해서 보낸다.
+    읽을 수 없거나 codec이 모르는 이벤트는 보내지 않고 이유를 돌려준다.
+    """
+
+    def __init__(self, broker: InMemoryBroker, *, codec: EventCodecRegistry | None = None) -> None:
+        self._broker = broker
+        self._codec = codec or EventCodecRegistry()
+
+    async def publish(self, topic: str, event: BaseEvent, *, partition_key: str | None = None) -> None:
+        await self._broker.publish(topic, event, partition_key=partition_key)
+
+    async def publish_encoded_many(
+        self,
+        topic: str,
+        payloads: Sequence[bytes],
+        *,
+        partition_keys: Sequence[str | None] | None = None,
+    ) -> list[Exception | None]:
+        keys = partition_keys if partition_keys is not None else [None] * len(payloads)
+        errors: list[Exception | None] = []
+        for payload, key in zip(payloads, keys, strict=True):
+            try:
+                event = self._codec.decode(payload)
+            except Exception as e:
+                errors.append(e)
+                continue
+            if event is None:
+                errors.append(LookupError(f"Unknown event type {self._codec.decode_raw(payload)[0]!r}"))
+                continue
+            await self._broker.publish(topic, event, partition_key=key)
+            errors.append(None)
+        return errors
+
+    async def stop(self) -> None:
+        return None
+
+
+class InMemoryEventSubscriber(EventSubscriber):
+    """
+    InMemoryBroker의 consumer group member. 이벤트는 메모리에서 바로 넘어오므로
+    commit할 offset이 없고 ack는 아무 일도 하지 않는다.
+    """
+
+    def __init__(self, broker: InMemoryBroker, group_id: str) -> None:
+        self._broker = broker
+        self._group_id = group_id
+
+    async def iterate(self, topic: str) -> AsyncIterator[BaseEvent]:
+        async for batch in self._batches(topic, max_records=1, timeout_ms=None):
+            yield batch[0]
+
+    async def iterate_batches(
+        self,
+        topic: str,
+        *,
+        max_records: int = 500,
+        timeout_ms: int = 1000,
+    ) -> AsyncIterator[list[Delivery]]:
+        async for batch in self._batches(topic, max_records=max_records, timeout_ms=timeout_ms):
+            yield [Delivery(event) for event in batch]
+
+    async def _batches(
+        self,
+        topic: str,
+        *,
+        max_records: int,
+        timeout_ms: int | None,
+    ) -> AsyncIterator[list[BaseEvent]]:
+        member = object()
+        group = self._broker.join(topic, self._group_id, member)
+        turn = 0
+        try:
+            while True:
+                batch: list[BaseEvent] = []
+                # 파티션을 돌아가며 하나씩 꺼내 한 파티션이 배치를 독차지하지 않게 한다.
+                while len(batch) < max_records:
+                    assigned = group.assignment.get(member, [])
+                    turn += 1
+                    start = turn % len(assigned) if assigned else 0
+                    ready = [queue for queue in assigned[start:] + assigned[:start] if not queue.empty()]
+                    if not ready:
+                        break
+                    for queue in ready[: max_records - len(batch)]:
+                        batch.append(queue.get_nowait())
+                if batch:
+                    yield batch
+                    continue
+
+                group.changed.clear()
+                if timeout_ms is None:
+                    await group.changed.wait()
+                    continue
+                try:
+                    await asyncio.wait_for(group.changed.wait(), timeout=timeout_ms / 1000)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._broker.leave(group, member)
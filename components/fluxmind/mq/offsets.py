@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Hashable, Iterable
+
+
+class OffsetTracker:
+    """
+    파티션별로 받은 offset과 처리가 끝난 offset을 추적한다.
+
+    handler가 순서와 상관없이 끝나도 commit 위치는 앞에서부터 연속으로 끝난 offset까지만
+    전진한다. 예: 10, 11, 12를 받고 10, 12만 끝났다면 commit 위치는 11이다.
+    """
+
+    def __init__(self) -> None:
+        self._pending: dict[Hashable, deque[int]] = {}
+        self._done: dict[Hashable, set[int]] = {}
+        self._position: dict[Hashable, int] = {}
+        self._committed: dict[Hashable, int] = {}
+
+    def track(self, partition: Hashable, offset: int) -> None:
+        self._pending.setdefault(partition, deque()).append(offset)
+
+    def complete(self, partition: Hashable, offset: int) -> None:
+        pending = self._pending.get(partition)
+        if pending is None:
+            # rebalance로 이미 내려놓은 파티션. 다른 consumer가 다시 처리한다.
+            return
+        done = self._done.setdefault(partition, set())
+        done.add(offset)
+        while pending and pending[0] in done:
+            finished = pending.popleft()
+            done.discard(finished)
+            self._position[partition] = finished + 1
+
+    def position(self, partition: Hashable) -> int | None:
+        """앞에서부터 연속으로 처리가 끝난 다음 offset. 아직 끝난 레코드가 없으면 None."""
+        return self._position.get(partition)
+
+    def committable(self) -> dict[Hashable, int]:
+        """마지막 commit 이후 전진한 파티션의 다음 commit 위치(다음에 읽을 offset)."""
+        return {
+            partition: position
+            for partition, position in self._position.items()
+            if self._committed.get(partition) != position
+        }
+
+    def mark_committed(self, offsets: dict[Hashable, int]) -> None:
+        self._committed.update(offsets)
+
+    def forget(self, partitions: Iterable[Hashable]) -> None:
+        for partition in partitions:
+            self._pending.pop(partition, None)
+            self._done.pop(partition, None)
+            self._position.pop(partition, None)
+            self._committed.pop(partition, None)
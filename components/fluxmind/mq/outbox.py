@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from .interfaces import EventPublisher
+
+
+@dataclass(slots=True, frozen=True)
+class OutboxEvent:
+    """
+    outbox에 기록된 이벤트 한 건. payload는 기록할 때 인코딩한 bytes이며 relay는 디코드하지 않고 그대로 보낸다.
+    """
+
+    id: int
+    topic: str
+    payload: bytes
+    partition_key: str | None = None
+
+
+@dataclass(slots=True)
+class OutboxBatch:
+    events: Sequence[OutboxEvent]
+    # 보내지 못한 이벤트 id → 이유. 이 이벤트들은 지우지 않는다.
+    failed: dict[int, str] = field(default_factory=dict)
+
+
+class OutboxStore(Protocol):
+    def lease(self, limit: int) -> contextlib.AbstractAsyncContextManager[OutboxBatch]:
+        """
+        아직 발행하지 않은 이벤트를 기록 순서대로 최대 limit 개 잠가서 돌려준다.
+        블록이 정상적으로 끝나면 발행한 이벤트를 지우고, failed에 든 이벤트는 실패를 기록해 남긴다.
+        예외로 끝나면 모두 그대로 두어 다음 lease에서 다시 가져간다. 다른 relay가 잠근 이벤트는 건너뛴다.
+        """
+        ...
+
+
+class OutboxRelay:
+    """
+    outbox에 커밋된 이벤트를 배치로 꺼내 발행한다. 이벤트는 발행이 끝난 뒤에 지우므로
+    적어도 한 번 발행된다 (발행 직후 죽으면 다시 발행되고, consumer가 event_id로 걸러낸다).
+
+    배치 안에서는 기록 순서를 지킨다. relay를 여러 개 띄우면 서로 다른 배치를 동시에 발행하므로
+    같은 대화의 이벤트 순서가 배치 경계에서 바뀔 수 있다.
+    """
+
+    def __init__(
+        self,
+        store: OutboxStore,
+        publisher: EventPublisher,
+        *,
+        batch_size: int = 500,
+        poll_interval_ms: int = 100,
+    ) -> None:
+        self._store = store
+        self._publisher = publisher
+        self._batch_size = batch_size
+        self._poll_interval = poll_interval_ms / 1000
+
+    async def relay_once(self) -> int:
+        async with self._store.lease(self._batch_size) as batch:
+            by_topic: dict[str, list[OutboxEvent]] = {}
+            for item in batch.events:
+                by_topic.setdefault(item.topic, []).append(item)
+            # topic마다 한 번에 배치 전체를 보내고 모든 ack를 한 번에 기다린다.
+            for topic, items in by_topic.items():
+                errors = await self._publisher.publish_encoded_many(
+                    topic,
+                    [item.payload for item in items],
+                    partition_keys=[item.partition_key for item in items],
+                )
+                for item, error in zip(items, errors, strict=True):
+                    if error is not None:
+                        print(f"Could not publish outbox event {item.id} to {topic}: {error}")
+                        batch.failed[item.id] = f"{type(error).__name__}: {error}"
+        return len(batch.events)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                relayed = await self.relay_once()
+            except Exception as e:
+                print(f"Outbox relay failed: {e}")
+                relayed = 0
+            # 배치가 가득 찼으면 밀린 이벤트가 더 있으므로 기다리지 않고 바로 다음 배치를 가져간다.
+            if relayed < self._batch_size:
+                await asyncio.sleep(self._poll_interval)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Type
+
+from fluxmind.domain_core import BaseEvent
+
+from .interfaces import EventPublisher
+
+# BaseEvent.metadata에 남기는 재시도 정보. 값은 JSON으로 그대로 직렬화되는 타입만 쓴다.
+RETRY_GROUP = "retry_group"
+RETRY_ATTEMPT = "retry_attempt"
+RETRY_SOURCE_TOPIC = "retry_source_topic"
+RETRY_ERROR = "retry_error"
+RETRY_FAILED_AT = "retry_failed_at"
+RETRY_DUE_AT = "retry_due_at"
+RETRY_REPLAYED_AT = "retry_replayed_at"
+
+_MAX_ERROR_LENGTH = 1000
+
+
+@dataclass(slots=True, frozen=True)
+class RetryPolicy:
+    """
+    handler가 실패한 이벤트를 retry topic 단계마다 delays_seconds 만큼 늦춰 다시 처리하고,
+    마지막 단계에서도 실패하면 dead-letter topic으로 보낸다.
+    non_retryable 예외(예: 없는 대화)는 재시도하지 않고 바로 dead-letter로 보낸다.
+    """
+
+    delays_seconds: tuple[float, ...] = (5.0, 30.0, 120.0)
+    non_retryable: tuple[Type[Exception], ...] = ()
+
+
+def retry_topic(group_id: str, attempt: int) -> str:
+    # retry/dead-letter topic은 consumer group마다 따로 두어 실패하지 않은 group이 다시 받지 않게 한다.
+    return f"{group_id}.retry-{attempt}"
+
+
+def dead_letter_topic(group_id: str) -> str:
+    return f"{group_id}.dlq"
+
+
+def retry_attempt(event: BaseEvent) -> int:
+    return int(event.metadata.get(RETRY_ATTEMPT, 0))
+
+
+def retry_due_at(event: BaseEvent) -> datetime | None:
+    due_at = event.metadata.get(RETRY_DUE_AT)
+    return datetime.fromisoformat(due_at) if due_at else None
+
+
+def _partition_key(event: BaseEvent) -> str | None:
+    conversation_id = getattr(event, "conversation_id", None)
+    return str(conversation_id) if conversation_id is not None else None
+
+
+class RetryRouter:
+    """
+    실패한 이벤트를 다음 retry topic(또는 dead-letter topic)으로 보내 원래 파티션이 막히지 않게 한다.
+    같은 대화의 이벤트가 같은 파티션으로 가도록 partition_key는 conversation_id를 그대로 쓴다.
+    """
+
+    def __init__(self, publisher: EventPublisher, group_id: str, policy: RetryPolicy) -> None:
+        self._publisher = publisher
+        self._group_id = group_id
+        self._policy = policy
+
+    def destination(self, event: BaseEvent, error: Exception) -> str:
+        attempt = retry_attempt(event) + 1
+        if isinstance(error, self._policy.non_retryable) or attempt > len(self._policy.delays_seconds):
+            return dead_letter_topic(self._group_id)
+        return retry_topic(self._group_id, attempt)
+
+    async def route_failure(self, event: BaseEvent, error: Exception, *, source_topic: str) -> str:
+        topic = self.destination(event, error)
+        now = datetime.now(timezone.utc)
+        metadata = {
+            **event.metadata,
+            RETRY_GROUP: self._group_id,
+            RETRY_SOURCE_TOPIC: event.metadata.get(RETRY_SOURCE_TOPIC, source_topic),
+            RETRY_ERROR: f"{type(error).__name__}: {error}"[:_MAX_ERROR_LENGTH],
+            RETRY_FAILED_AT: now.isoformat(),
+        }
+        if topic != dead_letter_topic(self._group_id):
+            attempt = retry_attempt(event) + 1
+            delay = self._policy.delays_seconds[attempt - 1]
+            metadata[RETRY_ATTEMPT] = attempt
+            metadata[RETRY_DUE_AT] = (now + timedelta(seconds=delay)).isoformat()
+        else:
+            metadata.pop(RETRY_DUE_AT, None)
+
+        await self._publisher.publish(
+            topic,
+            dataclasses.replace(event, metadata=metadata),
+            partition_key=_partition_key(event),
+        )
+        print(f"{event.event_type} {event.event_id} failed in {self._group_id} ({metadata[RETRY_ERROR]}); sent to {topic}")
+        return topic
+
+    async def replay(self, event: BaseEvent) -> str:
+        """
+        dead-letter 이벤트를 이 group만 다시 처리하도록 첫 retry topic으로 바로 보낸다 (지연 없음).
+        retry 단계가 없으면 원래 topic으로 보내며, 이미 처리한 다른 group은 processed event 기록으로 건너뛴다.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        metadata = {**event.metadata, RETRY_REPLAYED_AT: now}
+        if self._policy.delays_seconds:
+            topic = retry_topic(self._group_id, 1)
+            metadata.update({RETRY_ATTEMPT: 1, RETRY_DUE_AT: now})
+        else:
+            topic = event.metadata.get(RETRY_SOURCE_TOPIC) or ""
+            if not topic:
+                raise ValueError(f"Dead-lettered event {event.event_id} has no {RETRY_SOURCE_TOPIC}")
+            metadata.pop(RETRY_ATTEMPT, None)
+            metadata.pop(RETRY_DUE_AT, None)
+
+        await self._publisher.publish(
+            topic,
+            dataclasses.replace(event, metadata=metadata),
+            partition_key=_partition_key(event),
+        )
+        return topic
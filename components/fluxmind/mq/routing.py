@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Type
+
+from fluxmind.domain_core import BaseEvent
+
+from .dispatcher import EventHandler
+from .retry import RetryPolicy, retry_topic
+
+BatchEventHandler = Callable[[Sequence[BaseEvent]], Awaitable[Any]]
+
+
+@dataclass(slots=True, frozen=True)
+class ConsumerGroup:
+    group_id: str
+    topic: str
+    max_concurrency: int = 1
+    max_in_flight: int | None = None
+    # batch handler를 쓰는 group이 getmany() 한 번에 가져올 최대 레코드 수와 대기 시간.
+    batch_max_records: int = 500
+    batch_timeout_ms: int = 1000
+    # None이면 실패한 이벤트는 로그만 남기고 넘어간다.
+    retry: RetryPolicy | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class Route:
+    event_type: Type[BaseEvent]
+    handler: EventHandler | BatchEventHandler
+    group_id: str
+    batch: bool = False
+
+
+class EventRouter:
+    """
+    이벤트 타입 → (handler, consumer group) 선언.
+
+    consumer group마다 topic과 동시성 설정을 따로 두므로, 느린 작업(LLM 응답)과
+    빠른 작업(analytics 카운터)을 서로 다른 consumer로 띄워 따로 확장할 수 있다.
+    한 이벤트 타입을 여러 group에 route 하면 group마다 독립적으로 한 번씩 처리된다.
+    retry 정책이 있는 group은 retry 단계마다 별도 topic을 읽는 consumer group이 더 있다 (retry_groups()).
+
+    route_batch()로 등록한 handler는 이벤트 목록을 한 번에 받는다 (예: multi-row upsert 한 번).
+    한 group 안에서 이벤트 단위 handler와 batch handler를 섞을 수는 없다.
+    """
+
+    def __init__(self) -> None:
+        self._groups: dict[str, ConsumerGroup] = {}
+        self._routes: list[Route] = []
+
+    @property
+    def groups(self) -> list[ConsumerGroup]:
+        return list(self._groups.values())
+
+    def add_group(
+        self,
+        group_id: str,
+        *,
+        topic: str,
+        max_concurrency: int = 1,
+        max_in_flight: int | None = None,
+        batch_max_records: int = 500,
+        batch_timeout_ms: int = 1000,
+        retry: RetryPolicy | None = None,
+    ) -> ConsumerGroup:
+        if group_id in self._groups:
+            raise ValueError(f"Consumer group already registered: {group_id}")
+        group = ConsumerGroup(
+            group_id,
+            topic,
+            max_concurrency,
+            max_in_flight,
+            batch_max_records,
+            batch_timeout_ms,
+            retry,
+        )
+        self._groups[group_id] = group
+        return group
+
+    def route(self, event_type: Type[BaseEvent], handler: EventHandler, *, group_id: str) -> None:
+        self._add(Route(event_type, handler, group_id))
+
+    def route_batch(self, event_type: Type[BaseEvent], handler: BatchEventHandler, *, group_id: str) -> None:
+        self._add(Route(event_type, handler, group_id, batch=True))
+
+    def is_batch(self, group_id: str) -> bool:
+        return any(route.batch for route in self._routes if route.group_id == group_id)
+
+    def group(self, group_id: str) -> ConsumerGroup:
+        return self._groups[group_id]
+
+    def retry_groups(self, group_id: str) -> list[ConsumerGroup]:
+        """retry 단계(1부터)마다 그 단계의 topic을 같은 이름의 consumer group으로 읽는 설정."""
+        group = self._groups[group_id]
+        if group.retry is None:
+            return []
+        return [
+            dataclasses.replace(group, group_id=retry_topic(group_id, attempt), topic=retry_topic(group_id, attempt))
+            for attempt in range(1, len(group.retry.delays_seconds) + 1)
+        ]
+
+    def event_types(self, group_id: str) -> dict[str, Type[BaseEvent]]:
+        return {route.event_type.__name__: route.event_type for route in self._routes if route.group_id == group_id}
+
+    def handler(self, group_id: str) -> EventHandler:
+        """group에 route 된 handler를 등록 순서대로 호출하는 handler. route가 없는 타입은 무시한다."""
+        handlers: dict[Type[BaseEvent], list[EventHandler]] = {}
+        for route in self._routes:
+            if route.group_id == group_id:
+                handlers.setdefault(route.event_type, []).append(route.handler)
+
+        async def handle(event: BaseEvent) -> None:
+            for handler in handlers.get(type(event), ()):
+                await handler(event)
+
+        return handle
+
+    def batch_handler(self, group_id: str) -> BatchEventHandler:
+        """
+        group의 batch handler마다 route 된 타입의 이벤트만, 받은 순서대로 모아 한 번씩 호출한다.
+        같은 handler를 여러 타입에 route 하면 한 번의 호출로 함께 받는다.
+        """
+        handlers: dict[BatchEventHandler, set[Type[BaseEvent]]] = {}
+        for route in self._routes:
+            if route.group_id == group_id and route.batch:
+                handlers.setdefault(route.handler, set()).add(route.event_type)
+
+        async def handle(events: Sequence[BaseEvent]) -> None:
+            for handler, event_types in handlers.items():
+                selected = [event for event in events if type(event) in event_types]
+                if selected:
+                    await handler(selected)
+
+        return handle
+
+    def _add(self, route: Route) -> None:
+        if route.group_id not in self._groups:
+            raise ValueError(f"Unknown consumer group: {route.group_id}")
+        if any(existing.batch != route.batch for existing in self._routes if existing.group_id == route.group_id):
+            raise ValueError(f"Consumer group mixes batch and per-event handlers: {route.group_id}")
+        self._routes.append(route)
@@ -0,0 +1,7 @@
+from .service import ConversationSummarizer, ConversationSummary, SummaryRepository
+
+__all__ = [
+    "ConversationSummarizer",
+    "ConversationSummary",
+    "SummaryRepository",
+]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Protocol, Sequence
+from uuid import UUID
+
+from fluxmind.conversation import ConversationService
+from fluxmind.domain_core import ConversationId, Message, MessageCursor, MessageId
+from fluxmind.llm import LLMClient, LLMMessage, LLMRole
+
+_SUMMARY_INSTRUCTION = (
+    "You maintain a running summary of a conversation between a user and an assistant. "
+    "Update the summary with the new messages. Keep facts, names, decisions and open questions; "
+    "drop small talk. Reply with the updated summary only."
+)
+
+# 아직 요약이 없을 때 쓰는 시작 cursor. after 조회는 시간순이라 가장 오래된 메시지부터 읽게 된다.
+_BEGINNING = MessageCursor(created_at=datetime.min.replace(tzinfo=timezone.utc), id=MessageId(UUID(int=0)))
+
+
+@dataclass(slots=True, frozen=True)
+class ConversationSummary:
+    conversation_id: ConversationId
+    content: str
+    # high-water mark: 요약에 반영된 마지막 메시지. 다음 pass는 이 이후 메시지만 읽는다.
+    last_message: MessageCursor
+    message_count: int
+    updated_at: datetime
+
+
+class SummaryRepository(Protocol):
+    async def get(self, conversation_id: ConversationId) -> ConversationSummary | None: ...
+
+    async def save(self, summary: ConversationSummary) -> bool: ...
+
+
+class ConversationSummarizer:
+    """
+    최근 keep_recent 개를 제외한 오래된 메시지를 저장된 rolling summary에 접어 넣는다.
+
+    요약되지 않은 오래된 메시지가 trigger_messages 개 이상 쌓였을 때만 LLM을 호출하며,
+    한 pass에서는 high-water mark 이후 최대 max_messages_per_pass 개만 처리한다.
+    schedule()은 응답 경로를 막지 않도록 백그라운드 task로 실행하고,
+    같은 대화에 대한 요약이 이미 진행 중이면 건너뛴다.
+    """
+
+    def __init__(
+        self,
+        conversation_service: ConversationService,
+        summary_repository: SummaryRepository,
+        llm_client: LLMClient,
+        *,
+        model: str,
+        trigger_messages: int,
+        keep_recent: int,
+        max_messages_per_pass: int = 200,
+        max_tokens: int | None = None,
+        max_concurrency: int = 2,
+    ) -> None:
+        if keep_recent < 0:
+            raise ValueError(f"keep_recent must be >= 0, got {keep_recent}")
+        if trigger_messages > max_messages_per_pass:
+            # 한 pass가 읽는 메시지가 trigger보다 적으면 요약 조건을 영원히 만족하지 못한다.
+            raise ValueError(
+                f"trigger_messages ({trigger_messages}) must not exceed max_messages_per_pass ({max_messages_per_pass})",
+            )
+        self._conversation_service = conversation_service
+        self._summary_repository = summary_repository
+        self._llm_client = llm_client
+        self._model = model
+        self._trigger_messages = trigger_messages
+        self._keep_recent = keep_recent
+        self._max_messages_per_pass = max_messages_per_pass
+        self._max_tokens = max_tokens
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._in_flight: dict[ConversationId, asyncio.Task[None]] = {}
+
+    def schedule(self, conversation_id: ConversationId) -> None:
+        if conversation_id in self._in_flight:
+            return
+        task = asyncio.create_task(self._run_scheduled(conversation_id))
+        self._in_flight[conversation_id] = task
+        task.add_done_callback(lambda _: self._in_flight.pop(conversation_id, None))
+
+    async def stop(self) -> None:
+        tasks = list(self._in_flight.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def summarize(self, conversation_id: ConversationId) -> ConversationSummary | None:
+        summary = await self._summary_repository.get(conversation_id)
+
+        # 최근 keep_recent 개는 프롬프트에 원문 그대로 들어가므로 요약 대상에서 뺀다.
+        # keep_recent가 0이면 경계 없이 high-water mark 이후 메시지를 모두 요약한다.
+        before = None
+        if self._keep_recent > 0:
+            tail = await self._conversation_service.list_messages(conversation_id, limit=self._keep_recent)
+            if len(tail) < self._keep_recent:
+                return summary
+            before = MessageCursor.of(tail[0])
+
+        pending = await self._conversation_service.list_messages(
+            conversation_id,
+            limit=self._max_messages_per_pass,
+            after=summary.last_message if summary is not None else _BEGINNING,
+            before=before,
+        )
+        if len(pending) < self._trigger_messages:
+            return summary
+
+        content = await self._llm_client.generate(
+            self._prompt(summary, pending),
+            model=self._model,
+            max_tokens=self._max_tokens,
+        )
+        updated = ConversationSummary(
+            conversation_id=conversation_id,
+            content=content.strip(),
+            last_message=MessageCursor.of(pending[-1]),
+            message_count=(summary.message_count if summary is not None else 0) + len(pending),
+            updated_at=datetime.now(timezone.utc),
+        )
+        if not await self._summary_repository.save(updated):
+            # 다른 인스턴스가 더 앞선 high-water mark를 먼저 기록했다.
+            return await self._summary_repository.get(conversation_id)
+        return updated
+
+    async def _run_scheduled(self, conversation_id: ConversationId) -> None:
+        async with self._semaphore:
+            try:
+                await self.summarize(conversation_id)
+            except Exception as e:
+                print(f"Error summarizing conversation {conversation_id}: {e}")
+
+    @staticmethod
+    def _prompt(summary: ConversationSummary | None, messages: Sequence[Message]) -> list[LLMMessage]:
+        transcript = "\n".join(f"{msg.role.value}: {msg.content}" for msg in messages)
+        previous = summary.content if summary is not None else "(none)"
+        return [
+            LLMMessage(role=LLMRole.SYSTEM, content=_SUMMARY_INSTRUCTION),
+            LLMMessage(
+                role=LLMRole.USER,
+                content=f"Current summary:\n{previous}\n\nNew messages:\n{transcript}",
+            ),
+        ]
@@ -0,0 +1,135 @@
+"""
+analytics replay 처리량: decode() 후 이벤트마다 MessageCountDelta를 합치는 경로 vs decode_raw() + MessageCountAggregator.
+
+    uv run python development/benchmarks/analytics_replay.py [--events N] [--conversations N]
+    FLUXMIND_DB_URL=postgresql+asyncpg://... uv run python development/benchmarks/analytics_replay.py --database
+
+--database를 주면 같은 레코드를 메모리 reader로 AnalyticsReplay.run()에 흘려
+analytics_replay_totals에 COPY로 기록하는 것까지 포함한 처리량을 잰다 (replay 기록은 끝나면 지운다).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from uuid import UUID, uuid4
+
+from fluxmind.analytics import MessageCountAggregator, MessageCountDelta
+from fluxmind.domain_core import AssistantRespondedEvent, ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import EventCodecRegistry
+
+
+class _MemoryReader:
+    def __init__(self, records: list[bytes], fetch_size: int) -> None:
+        self._records = records
+        self._fetch_size = fetch_size
+
+    @property
+    def topic(self) -> str:
+        return "benchmark"
+
+    async def start_offsets(self, *, from_timestamp_ms=None, from_offset=None) -> dict[int, int]:
+        return {0: 0}
+
+    async def end_offsets(self) -> dict[int, int]:
+        return {0: len(self._records)}
+
+    async def read(self, positions, end_offsets):
+        for offset in range(positions[0], end_offsets[0], self._fetch_size):
+            next_offset = min(offset + self._fetch_size, end_offsets[0])
+            yield 0, self._records[offset:next_offset], next_offset
+
+
+def _records(codec: EventCodecRegistry, events: int, conversations: int) -> list[bytes]:
+    conversation_ids = [ConversationId(uuid4()) for _ in range(conversations)]
+    records = []
+    for i in range(events):
+        conversation_id = conversation_ids[i % conversations]
+        if i % 2:
+            event = AssistantRespondedEvent(
+                conversation_id=conversation_id,
+                user_message_id=MessageId(uuid4()),
+                assistant_message_id=MessageId(uuid4()),
+                content="x" * 200,
+                token_count=50,
+            )
+        else:
+            event = MessageReceivedEvent(
+                conversation_id=conversation_id,
+                message_id=MessageId(uuid4()),
+                role=MessageRole.USER,
+                content="x" * 200,
+                token_count=50,
+            )
+        records.append(codec.encode(event))
+    return records
+
+
+def _fold_decoded(codec: EventCodecRegistry, records: list[bytes]) -> int:
+    merged: dict[UUID, MessageCountDelta] = {}
+    for raw in records:
+        event = codec.decode(raw)
+        is_assistant = isinstance(event, AssistantRespondedEvent)
+        delta = MessageCountDelta(
+            conversation_id=event.conversation_id,
+            user_messages=0 if is_assistant else 1,
+            assistant_messages=1 if is_assistant else 0,
+            last_message_at=event.occurred_at,
+            user_tokens=0 if is_assistant else event.token_count or 0,
+            assistant_tokens=event.token_count or 0 if is_assistant else 0,
+        )
+        if event.conversation_id in merged:
+            merged[event.conversation_id].merge(delta)
+        else:
+            merged[event.conversation_id] = delta
+    return len(merged)
+
+
+def _fold_raw(codec: EventCodecRegistry, records: list[bytes]) -> int:
+    aggregator = MessageCountAggregator()
+    add, decode_raw = aggregator.add, codec.decode_raw
+    for raw in records:
+        add(*decode_raw(raw))
+    return len(aggregator.drain())
+
+
+async def _replay_to_database(codec: EventCodecRegistry, records: list[bytes], checkpoint_events: int) -> float:
+    from fluxmind.database import get_session_maker
+    from fluxmind.database.analytics_replay_store import SqlAlchemyAnalyticsReplayStore
+    from fluxmind.events_consumer.analytics_replay import AnalyticsReplay
+
+    store = SqlAlchemyAnalyticsReplayStore(get_session_maker())
+    replay_id = f"benchmark-{uuid4()}"
+    replay = AnalyticsReplay(_MemoryReader(records, 5000), store, codec=codec, checkpoint_events=checkpoint_events)
+    started = time.perf_counter()
+    try:
+        await replay.run(replay_id)
+        return len(records) / (time.perf_counter() - started)
+    finally:
+        await store.discard(replay_id)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--conversations", type=int, default=10_000)
+    parser.add_argument("--checkpoint-events", type=int, default=200_000)
+    parser.add_argument("--database", action="store_true")
+    args = parser.parse_args()
+
+    codec = EventCodecRegistry([MessageReceivedEvent, AssistantRespondedEvent])
+    records = _records(codec, args.events, args.conversations)
+
+    print(f"{'path':>22} {'events/s':>12}")
+    for name, fold in (("decode + delta merge", _fold_decoded), ("decode_raw + aggregate", _fold_raw)):
+        started = time.perf_counter()
+        fold(codec, records)
+        print(f"{name:>22} {args.events / (time.perf_counter() - started):>12,.0f}")
+    if args.database:
+        rate = asyncio.run(_replay_to_database(codec, records, args.checkpoint_events))
+        print(f"{'replay to postgres':>22} {rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
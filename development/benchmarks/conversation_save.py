@@ -0,0 +1,78 @@
+"""
+대화 길이에 따른 save() 한 턴당 쓰기 비용 측정.
+
+    FLUXMIND_DB_URL=postgresql+asyncpg://... uv run python development/benchmarks/conversation_save.py
+
+history 길이별로 대화를 만든 뒤 user/assistant 턴을 반복 저장하면서
+턴당 실행된 SQL 문 수, 기록된 행 수, 평균 지연을 출력한다.
+append-only save는 history 길이와 무관하게 값이 일정해야 한다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from fluxmind.database import get_session_maker
+from fluxmind.database.conversation_repository import SqlAlchemyConversationRepository
+from fluxmind.database.session import get_engine
+from fluxmind.domain_core import MessageRole, new_conversation
+from sqlalchemy import event
+
+
+class _WriteCounter:
+    def __init__(self) -> None:
+        self.statements = 0
+        self.rows = 0
+
+    def reset(self) -> None:
+        self.statements = 0
+        self.rows = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        if not statement.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")):
+            return
+        self.statements += 1
+        self.rows += len(parameters) if executemany else 1
+
+
+async def _run(history_sizes: list[int], turns: int) -> None:
+    repo = SqlAlchemyConversationRepository(get_session_maker())
+    counter = _WriteCounter()
+    event.listen(get_engine().sync_engine, "before_cursor_execute", counter)
+
+    print(f"{'history':>8} {'stmts/turn':>11} {'rows/turn':>10} {'ms/turn':>9}")
+    for size in history_sizes:
+        conv = new_conversation()
+        for i in range(size):
+            role = MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT
+            conv.add_message(role, f"seed message {i}")
+        await repo.save(conv)
+
+        counter.reset()
+        started = time.perf_counter()
+        for i in range(turns):
+            role = MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT
+            conv.add_message(role, f"turn {i}")
+            await repo.save(conv)
+        elapsed = time.perf_counter() - started
+
+        print(
+            f"{size:>8} {counter.statements / turns:>11.1f} {counter.rows / turns:>10.1f} "
+            f"{elapsed / turns * 1000:>9.2f}"
+        )
+
+    await get_engine().dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 500, 1000])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(_run(args.history, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+이벤트 직렬화 처리량 비교: 이전 json.dumps(__dict__, default=...) 경로 vs EventCodecRegistry.
+
+    uv run python development/benchmarks/event_codec.py
+
+orjson이 설치되어 있으면 orjson 백엔드도 함께 잰다.
+이전 경로의 decode는 cls(**data)라 UUID/datetime/Enum이 문자열로 남는다는 점에 유의.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime
+from enum import Enum
+from uuid import UUID, uuid4
+
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import EventCodecRegistry
+from fluxmind.mq.codec import orjson
+
+
+def _legacy_default(obj: object) -> str:
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def _legacy_encode(event: MessageReceivedEvent) -> bytes:
+    payload = {"event_type": event.event_type, "data": event.__dict__}
+    return json.dumps(payload, default=_legacy_default).encode("utf-8")
+
+
+def _legacy_decode(raw: bytes) -> MessageReceivedEvent:
+    payload = json.loads(raw.decode("utf-8"))
+    return MessageReceivedEvent(**payload["data"])
+
+
+def _rate(fn, items, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return len(items) * repeat / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--content-bytes", type=int, default=200)
+    args = parser.parse_args()
+
+    events = [
+        MessageReceivedEvent(
+            conversation_id=ConversationId(uuid4()),
+            message_id=MessageId(uuid4()),
+            role=MessageRole.USER,
+            content="x" * args.content_bytes,
+            token_count=args.content_bytes // 4,
+        )
+        for _ in range(args.events)
+    ]
+
+    paths = [("legacy json", _legacy_encode, _legacy_decode)]
+    for use_fast_json in (False, True):
+        if use_fast_json and orjson is None:
+            continue
+        registry = EventCodecRegistry([MessageReceivedEvent], use_fast_json=use_fast_json)
+        paths.append((f"codec/{registry.backend}", registry.encode, registry.decode))
+
+    print(f"{'path':>14} {'encode/s':>12} {'decode/s':>12}")
+    for name, encode, decode in paths:
+        encoded = [encode(e) for e in events]
+        print(f"{name:>14} {_rate(encode, events, args.repeat):>12,.0f} {_rate(decode, encoded, args.repeat):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
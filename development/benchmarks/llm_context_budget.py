@@ -0,0 +1,92 @@
+"""
+긴 대화에서 전체 history 전송 vs 토큰 예산(ContextBuilder) 적용 시 LLM 지연 비교.
+
+    FLUXMIND_OLLAMA_BASE_URL=http://localhost:11434 uv run python development/benchmarks/llm_context_budget.py
+
+대화는 메모리에 합성하므로 Postgres는 필요 없고 Ollama만 떠 있으면 된다.
+응답 길이의 영향을 줄이기 위해 max_tokens를 작게 두고 prompt 처리 시간을 본다.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fluxmind.context_builder import ContextBuilder, HeuristicTokenCounter
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import Conversation, ConversationId, MessageRole, new_conversation
+from fluxmind.llm import LLMMessage, LLMRole
+from fluxmind.llm.ollama_client import OllamaClient
+from fluxmind.platform import get_settings
+
+_FILLER = "The quick brown fox jumps over the lazy dog while the committee reviews the quarterly numbers. "
+
+
+class _InMemoryConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+
+    async def save(self, conversation: Conversation) -> None:
+        self._store[conversation.id] = conversation
+
+    async def list_messages(self, conversation_id, limit=None, *, before=None, after=None):
+        messages = list(self._store[conversation_id].messages)
+        if before is not None:
+            messages = [m for m in messages if (m.created_at, m.id) < (before.created_at, before.id)]
+        return messages[-limit:] if limit is not None else messages
+
+
+async def _timed(client: OllamaClient, history, model: str, runs: int, max_tokens: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await client.generate(history, model=model, max_tokens=max_tokens)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+async def _run(turns_list: list[int], budget: int, runs: int, max_tokens: int) -> None:
+    settings = get_settings()
+    client = OllamaClient(base_url=settings.ollama_base_url, model=settings.ollama_model)
+    repo = _InMemoryConversationRepository()
+    counter = HeuristicTokenCounter()
+    builder = ContextBuilder(
+        ConversationService(repo),
+        counter,
+        default_budget=budget,
+        page_size=settings.conversation_history_window,
+    )
+
+    print(f"{'turns':>6} {'mode':>8} {'messages':>9} {'~tokens':>8} {'median ms':>10}")
+    for turns in turns_list:
+        conv = new_conversation()
+        for i in range(turns):
+            role = MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT
+            conv.add_message(role, f"Turn {i}. " + _FILLER * 3)
+        await repo.save(conv)
+
+        full = [LLMMessage(role=LLMRole(m.role.value), content=m.content) for m in conv.messages]
+        budgeted = await builder.build(conv.id, model=settings.ollama_model)
+
+        for mode, history in (("full", full), ("budget", budgeted)):
+            tokens = sum(counter.count_text(m.content) for m in history)
+            latency = await _timed(client, history, settings.ollama_model, runs, max_tokens)
+            print(f"{turns:>6} {mode:>8} {len(history):>9} {tokens:>8} {latency * 1000:>10.1f}")
+
+    await client.aclose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, nargs="+", default=[20, 100, 400])
+    parser.add_argument("--budget", type=int, default=2048)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(_run(args.turns, args.budget, args.runs, args.max_tokens))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+InMemoryBroker 처리량/지연 측정: publisher → consumer group 두 개(responder, analytics).
+
+    uv run python development/benchmarks/memory_bus.py
+
+외부 서비스 없이 broker hop만 잰다. responder는 KeyedEventDispatcher로 이벤트 단위로,
+analytics는 iterate_batches()로 배치 단위로 읽는다.
+publisher는 --burst 개마다 한 번 event loop에 양보한다 (1 = 요청마다 따로 publish 하는 API와 비슷,
+크게 주면 queue가 찰 때까지 몰아서 보내므로 지연에 queue 대기 시간이 포함된다).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import InMemoryBroker, InMemoryEventPublisher, InMemoryEventSubscriber, KeyedEventDispatcher
+
+
+async def _run(events: int, conversations: int, partitions: int, queue_size: int, burst: int) -> None:
+    broker = InMemoryBroker(partitions=partitions, max_queue_size=queue_size)
+    broker.declare("events", "responder")
+    broker.declare("events", "analytics")
+    publisher = InMemoryEventPublisher(broker)
+
+    sent_at: dict[MessageId, float] = {}
+    latencies: list[float] = []
+    responder_done = asyncio.Event()
+    analytics_done = asyncio.Event()
+
+    async def handle(event: MessageReceivedEvent) -> None:
+        latencies.append(time.perf_counter() - sent_at[event.message_id])
+        if len(latencies) == events:
+            responder_done.set()
+
+    async def respond() -> None:
+        dispatcher = KeyedEventDispatcher(handle, max_concurrency=64, max_in_flight=256)
+        async for event in InMemoryEventSubscriber(broker, "responder").iterate("events"):
+            await dispatcher.submit(event)
+
+    async def count() -> None:
+        seen = 0
+        async for batch in InMemoryEventSubscriber(broker, "analytics").iterate_batches("events", max_records=500):
+            seen += len(batch)
+            if seen == events:
+                analytics_done.set()
+
+    conversation_ids = [ConversationId(uuid4()) for _ in range(conversations)]
+    consumers = [asyncio.create_task(respond()), asyncio.create_task(count())]
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    for i in range(events):
+        conversation_id = conversation_ids[i % conversations]
+        event = MessageReceivedEvent(
+            conversation_id=conversation_id,
+            message_id=MessageId(uuid4()),
+            role=MessageRole.USER,
+            content="hello",
+        )
+        sent_at[event.message_id] = time.perf_counter()
+        await publisher.publish("events", event, partition_key=str(conversation_id))
+        if (i + 1) % burst == 0:
+            await asyncio.sleep(0)
+    await responder_done.wait()
+    await analytics_done.wait()
+    elapsed = time.perf_counter() - started
+
+    for task in consumers:
+        task.cancel()
+    await asyncio.gather(*consumers, return_exceptions=True)
+
+    latencies.sort()
+    print(f"events={events} conversations={conversations} partitions={partitions} queue={queue_size} burst={burst}")
+    print(f"  throughput: {events / elapsed:,.0f} events/s (both groups)")
+    print(
+        f"  publish→handler latency: p50={statistics.median(latencies) * 1e6:.0f}us"
+        f" p99={latencies[int(len(latencies) * 0.99)] * 1e6:.0f}us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--conversations", type=int, default=1_000)
+    parser.add_argument("--partitions", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=1_000)
+    parser.add_argument("--burst", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(_run(args.events, args.conversations, args.partitions, args.queue_size, args.burst))
+
+
+if __name__ == "__main__":
+    main()
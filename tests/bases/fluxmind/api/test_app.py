@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from fluxmind.api.app import _decode_cursor, _encode_cursor, app
+from fluxmind.api.deps import get_conversation_service, get_event_publisher
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import (
+    BaseEvent,
+    Conversation,
+    ConversationHeader,
+    ConversationId,
+    Message,
+    MessageCursor,
+    MessageRole,
+    new_conversation,
+)
+from fluxmind.jwt import get_current_user
+from fluxmind.mq import EventPublisher
+
+
+class InMemoryConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+        self.outbox: list[BaseEvent] = []
+
+    async def get(self, conversation_id: ConversationId) -> Conversation | None:
+        return self._store.get(conversation_id)
+
+    async def get_header(self, conversation_id: ConversationId) -> ConversationHeader | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        return ConversationHeader(conv.id, conv.is_archived, conv.created_at, conv.updated_at)
+
+    async def save(self, conversation: Conversation, *, outbox: Sequence[BaseEvent] = ()) -> None:
+        self._store[conversation.id] = conversation
+        self.outbox.extend(outbox)
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox=None,
+    ) -> Message | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        message = conv.add_message(role, content, token_count=token_count)
+        if outbox is not None:
+            self.outbox.extend(outbox(message))
+        return message
+
+    async def list_messages(
+        self,
+        conversation_id: ConversationId,
+        limit: int | None = None,
+        *,
+        before: MessageCursor | None = None,
+        after: MessageCursor | None = None,
+    ) -> Sequence[Message]:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return []
+        messages = sorted(conv.messages, key=lambda m: (m.created_at, m.id))
+        if before is not None:
+            messages = [m for m in messages if (m.created_at, m.id) < (before.created_at, before.id)]
+        return messages[-limit:] if limit else messages
+
+
+class CollectingEventPublisher(EventPublisher):
+    def __init__(self) -> None:
+        self.published: list[tuple[str, BaseEvent]] = []
+
+    async def publish(self, topic: str, event: BaseEvent, *, partition_key: str | None = None) -> None:
+        self.published.append((topic, event))
+
+
+@pytest.fixture
+def repository():
+    repo = InMemoryConversationRepository()
+    publisher = CollectingEventPublisher()
+    app.dependency_overrides[get_conversation_service] = lambda: ConversationService(repo)
+    app.dependency_overrides[get_event_publisher] = lambda: publisher
+    app.dependency_overrides[get_current_user] = lambda: {"sub": "test-user"}
+    yield repo
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(repository):
+    return TestClient(app)
+
+
+def test_post_message_appends_to_the_conversation_and_records_the_event(client, repository):
+    conversation_id = client.post("/conversations", json={"initial_message": "hello"}).json()["conversation_id"]
+
+    response = client.post(f"/conversations/{conversation_id}/messages", json={"content": "again"})
+
+    assert response.status_code == 201
+    messages = client.get(f"/conversations/{conversation_id}/messages").json()["messages"]
+    assert [m["content"] for m in messages] == ["hello", "again"]
+    assert messages[-1]["id"] == response.json()["message_id"]
+    assert [event.content for event in repository.outbox] == ["hello", "again"]
+
+
+def test_post_message_to_unknown_conversation_is_404(client, repository):
+    response = client.post(f"/conversations/{uuid4()}/messages", json={"content": "hi"})
+
+    assert response.status_code == 404
+    assert repository.outbox == []
+
+
+def test_list_messages_of_unknown_conversation_is_404(client):
+    response = client.get(f"/conversations/{uuid4()}/messages")
+
+    assert response.status_code == 404
+
+
+def test_list_messages_of_empty_conversation_is_an_empty_page(client):
+    conversation_id = client.post("/conversations", json={}).json()["conversation_id"]
+
+    response = client.get(f"/conversations/{conversation_id}/messages")
+
+    assert response.status_code == 200
+    assert response.json() == {"messages": [], "next_cursor": None}
+
+
+def test_next_cursor_pages_back_through_history(client):
+    conversation_id = client.post("/conversations", json={"initial_message": "m0"}).json()["conversation_id"]
+    for i in range(1, 5):
+        client.post(f"/conversations/{conversation_id}/messages", json={"content": f"m{i}"})
+
+    pages = []
+    params = {"limit": 2}
+    while True:
+        body = client.get(f"/conversations/{conversation_id}/messages", params=params).json()
+        pages.append([m["content"] for m in body["messages"]])
+        if body["next_cursor"] is None:
+            break
+        params = {"limit": 2, "before": body["next_cursor"]}
+
+    assert pages == [["m3", "m4"], ["m1", "m2"], ["m0"]]
+
+
+def test_cursor_round_trips_the_message_key():
+    message = new_conversation("hello").messages[0]
+
+    assert _decode_cursor(_encode_cursor(message)) == MessageCursor.of(message)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "aGVsbG8=", "MjAyNi0wMS0wMXxub3QtYS11dWlk"])
+def test_malformed_cursor_is_400(client, cursor):
+    conversation_id = client.post("/conversations", json={"initial_message": "hello"}).json()["conversation_id"]
+
+    response = client.get(f"/conversations/{conversation_id}/messages", params={"before": cursor})
+
+    assert response.status_code == 400
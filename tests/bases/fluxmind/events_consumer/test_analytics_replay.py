@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import copy
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+from fluxmind.analytics import AnalyticsReplayStore, MessageCountDelta, ReplayCheckpoint
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.events_consumer.analytics_replay import AnalyticsReplay
+from fluxmind.mq import EventCodecRegistry
+
+CODEC = EventCodecRegistry([MessageReceivedEvent])
+
+
+class InMemoryTopicReader:
+    def __init__(self, partitions: dict[int, list[bytes]], *, fetch_size: int = 2) -> None:
+        self.partitions = partitions
+        self.fetch_size = fetch_size
+        self.group_offsets: dict[str, dict[int, int]] = {}
+
+    @property
+    def topic(self) -> str:
+        return "events"
+
+    async def start_offsets(self, *, from_timestamp_ms=None, from_offset=None) -> dict[int, int]:
+        return {p: min(from_offset or 0, len(values)) for p, values in self.partitions.items()}
+
+    async def end_offsets(self) -> dict[int, int]:
+        return {p: len(values) for p, values in self.partitions.items()}
+
+    async def read(self, positions, end_offsets):
+        for partition, end in end_offsets.items():
+            offset = positions.get(partition, 0)
+            while offset < end:
+                next_offset = min(offset + self.fetch_size, end)
+                yield partition, self.partitions[partition][offset:next_offset], next_offset
+                offset = next_offset
+
+    async def committed(self, group_id: str) -> dict[int, int]:
+        return dict(self.group_offsets.get(group_id, {}))
+
+    async def commit(self, group_id: str, offsets: dict[int, int]) -> None:
+        self.group_offsets[group_id] = dict(offsets)
+
+
+class InMemoryReplayStore(AnalyticsReplayStore):
+    def __init__(self, *, fail_after_saves: int | None = None) -> None:
+        self.totals: dict[str, dict[ConversationId, MessageCountDelta]] = {}
+        self.checkpoints: dict[str, ReplayCheckpoint] = {}
+        self.analytics: dict[ConversationId, MessageCountDelta] = {}
+        self.fail_after_saves = fail_after_saves
+
+    async def load_checkpoint(self, replay_id: str) -> ReplayCheckpoint | None:
+        return copy.deepcopy(self.checkpoints.get(replay_id))
+
+    async def save_progress(self, replay_id, deltas, checkpoint) -> None:
+        if self.fail_after_saves is not None:
+            if self.fail_after_saves == 0:
+                raise ConnectionError("database went away")
+            self.fail_after_saves -= 1
+        totals = self.totals.setdefault(replay_id, {})
+        for delta in deltas:
+            if delta.conversation_id in totals:
+                totals[delta.conversation_id].merge(delta)
+            else:
+                totals[delta.conversation_id] = delta
+        self.checkpoints[replay_id] = copy.deepcopy(checkpoint)
+
+    async def count_totals(self, replay_id: str) -> int:
+        return len(self.totals.get(replay_id, {}))
+
+    async def replace_analytics(self, replay_id: str) -> int:
+        self.analytics = self.totals.pop(replay_id, {})
+        self.checkpoints.pop(replay_id, None)
+        return len(self.analytics)
+
+    async def discard(self, replay_id: str) -> None:
+        self.totals.pop(replay_id, None)
+        self.checkpoints.pop(replay_id, None)
+
+
+def _user_message(conversation_id: ConversationId) -> bytes:
+    return CODEC.encode(
+        MessageReceivedEvent(
+            conversation_id=conversation_id,
+            message_id=MessageId(uuid4()),
+            role=MessageRole.USER,
+            content="hi",
+            token_count=1,
+        ),
+    )
+
+
+@pytest.mark.asyncio
+async def test_interrupted_replay_resumes_without_counting_events_twice():
+    a, b = ConversationId(uuid4()), ConversationId(uuid4())
+    reader = InMemoryTopicReader({0: [_user_message(a) for _ in range(5)], 1: [_user_message(b) for _ in range(3)]})
+    store = InMemoryReplayStore(fail_after_saves=2)
+
+    with pytest.raises(ConnectionError):
+        await AnalyticsReplay(reader, store, codec=CODEC, checkpoint_events=2).run("r1")
+    assert not store.checkpoints["r1"].finished
+
+    store.fail_after_saves = None
+    checkpoint = await AnalyticsReplay(reader, store, codec=CODEC, checkpoint_events=2).run("r1")
+
+    assert checkpoint.finished
+    assert {cid: delta.user_messages for cid, delta in store.totals["r1"].items()} == {a: 5, b: 3}
+    assert store.totals["r1"][a].user_tokens == 5
+
+
+@pytest.mark.asyncio
+async def test_apply_catches_up_to_the_stopped_consumer_and_commits_the_replay_position():
+    a = ConversationId(uuid4())
+    reader = InMemoryTopicReader({0: [_user_message(a) for _ in range(4)]})
+    store = InMemoryReplayStore()
+    replay = AnalyticsReplay(reader, store, codec=CODEC)
+    await replay.run("r1")
+
+    # replay가 끝난 뒤 이벤트가 더 쌓였고, 멈춘 analytics consumer는 그중 일부까지 처리했다.
+    reader.partitions[0].extend(_user_message(a) for _ in range(3))
+    reader.group_offsets["analytics"] = {0: 6}
+
+    assert await replay.apply("r1", "analytics") == 1
+    assert store.analytics[a].user_messages == 6
+    assert reader.group_offsets["analytics"] == {0: 6}
+    assert store.checkpoints == {}
+
+
+@pytest.mark.asyncio
+async def test_events_published_twice_by_the_outbox_relay_are_counted_once():
+    a = ConversationId(uuid4())
+    first, second = _user_message(a), _user_message(a)
+    # relay가 발행 후 지우기 전에 죽어 같은 배치를 다시 발행했다.
+    reader = InMemoryTopicReader({0: [first, second, first, second, _user_message(a)]})
+    store = InMemoryReplayStore()
+
+    await AnalyticsReplay(reader, store, codec=CODEC).run("r1")
+
+    assert store.totals["r1"][a].user_messages == 3
+    assert store.totals["r1"][a].user_tokens == 3
+
+
+@pytest.mark.asyncio
+async def test_apply_refuses_a_replay_that_started_later_in_the_log():
+    a = ConversationId(uuid4())
+    reader = InMemoryTopicReader({0: [_user_message(a) for _ in range(4)]})
+    store = InMemoryReplayStore()
+    store.analytics = {
+        a: MessageCountDelta(conversation_id=a, user_messages=4, assistant_messages=0, last_message_at=datetime.now()),
+    }
+    replay = AnalyticsReplay(reader, store, codec=CODEC)
+    await replay.run("r1", from_offset=2)
+
+    # 처음 두 이벤트를 세지 않은 결과로 바꾸면 기록을 잃으므로 apply 하지 않는다.
+    with pytest.raises(ValueError):
+        await replay.apply("r1", "analytics")
+    assert store.analytics[a].user_messages == 4
+    assert reader.group_offsets == {}
+    assert "r1" in store.checkpoints
@@ -1,24 +1,57 @@
 from __future__ import annotations
 
+import asyncio
+from uuid import uuid4
+
 import pytest
+from fluxmind.analytics import AnalyticsRepository, AnalyticsService
 from fluxmind.conversation import ConversationRepository, ConversationService
-from fluxmind.domain_core import Conversation, ConversationId, MessageReceivedEvent, MessageRole
-from fluxmind.events_consumer.main import handle_message_received
-from fluxmind.llm import LLMClient, LLMMessage, LLMRole
-from fluxmind.mq import EventPublisher
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    Conversation,
+    ConversationId,
+    Message,
+    MessageId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+from fluxmind.events_consumer import main as events_consumer
+from fluxmind.events_consumer.main import build_router, handle_message_received, run_loop
+from fluxmind.llm import LLMClient, LLMCompletion, LLMMessage, LLMRole
+from fluxmind.mq import Delivery, EventPublisher, EventSubscriber, InMemoryProcessedEventStore
+from fluxmind.platform import get_settings
 
 
 class InMemoryConversationRepository(ConversationRepository):
     def __init__(self) -> None:
         self._store: dict[ConversationId, Conversation] = {}
+        self.outbox: list[object] = []
 
     async def get(self, conversation_id: ConversationId) -> Conversation | None:
         return self._store.get(conversation_id)
 
-    async def save(self, conversation: Conversation) -> None:
+    async def save(self, conversation: Conversation, *, outbox=()) -> None:
         self._store[conversation.id] = conversation
+        self.outbox.extend(outbox)
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox=None,
+    ) -> Message | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        message = conv.add_message(role, content, token_count=token_count)
+        if outbox is not None:
+            self.outbox.extend(outbox(message))
+        return message
 
-    async def list_messages(self, conversation_id: ConversationId, limit: int | None = None):
+    async def list_messages(self, conversation_id: ConversationId, limit: int | None = None, *, before=None, after=None):
         conv = self._store.get(conversation_id)
         if conv is None:
             return []
@@ -43,6 +76,12 @@ class EchoLLMClient(LLMClient):
         return "echo: (no user message)"
 
 
+class UsageReportingLLMClient(EchoLLMClient):
+    async def complete(self, messages, *, model: str, temperature=None, max_tokens=None) -> LLMCompletion:
+        content = await self.generate(messages, model=model)
+        return LLMCompletion(content=content, prompt_tokens=42, completion_tokens=11)
+
+
 @pytest.mark.asyncio
 async def test_message_flow_user_to_assistant():
     repo = InMemoryConversationRepository()
@@ -71,10 +110,303 @@ async def test_message_flow_user_to_assistant():
     assert updated_conv.messages[-1].role == MessageRole.ASSISTANT
     assert "echo: hello" == updated_conv.messages[-1].content
 
-    assert len(publisher.published) == 1
-    topic, evt = publisher.published[0]
-    from fluxmind.domain_core import AssistantRespondedEvent
-
+    # 응답 이벤트는 응답 메시지와 함께 outbox에 기록되고 consumer가 직접 발행하지 않는다.
+    assert publisher.published == []
+    assert len(repo.outbox) == 1
+    evt = repo.outbox[0]
     assert isinstance(evt, AssistantRespondedEvent)
     assert evt.conversation_id == conv.id
     assert evt.user_message_id == user_msg.id
+    assert evt.assistant_message_id == updated_conv.messages[-1].id
+
+
+@pytest.mark.asyncio
+async def test_direct_delivery_publishes_the_reply_before_returning(monkeypatch):
+    monkeypatch.setattr(get_settings(), "events_consumer_event_delivery", "direct")
+    repo = InMemoryConversationRepository()
+    service = ConversationService(repo)
+    publisher = CollectingEventPublisher()
+
+    conv = await service.create_conversation("hello")
+    user_msg = conv.messages[-1]
+    await handle_message_received(
+        MessageReceivedEvent(
+            conversation_id=conv.id,
+            message_id=user_msg.id,
+            role=MessageRole.USER,
+            content=user_msg.content,
+        ),
+        conversation_service=service,
+        llm_client=EchoLLMClient(),
+        event_publisher=publisher,
+    )
+
+    assert repo.outbox == []
+    [(topic, evt)] = publisher.published
+    assert topic == get_settings().mq_topic_conversation_events
+    assert isinstance(evt, AssistantRespondedEvent)
+    assert evt.user_message_id == user_msg.id
+
+
+@pytest.mark.asyncio
+async def test_reported_completion_tokens_are_stored_with_the_reply():
+    repo = InMemoryConversationRepository()
+    service = ConversationService(repo)
+    publisher = CollectingEventPublisher()
+
+    conv = await service.create_conversation("hello")
+    user_msg = conv.messages[-1]
+    assert user_msg.token_count == 2
+
+    await handle_message_received(
+        MessageReceivedEvent(
+            conversation_id=conv.id,
+            message_id=user_msg.id,
+            role=MessageRole.USER,
+            content=user_msg.content,
+            token_count=user_msg.token_count,
+        ),
+        conversation_service=service,
+        llm_client=UsageReportingLLMClient(),
+        event_publisher=publisher,
+    )
+
+    reply = (await service.get_conversation(conv.id)).messages[-1]
+    assert reply.token_count == 11
+    assert repo.outbox[0].token_count == 11
+    assert repo.outbox[0].prompt_token_count == 42
+
+
+class RedeliveringSubscriber(EventSubscriber):
+    def __init__(self, events) -> None:
+        self._events = events
+        self.acked: list[object] = []
+
+    async def iterate(self, topic: str):
+        for event in self._events:
+            yield event
+
+    async def deliveries(self, topic: str):
+        for event in self._events:
+            yield Delivery(event, lambda event=event: self.acked.append(event))
+
+
+class CountingLLMClient(EchoLLMClient):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def generate(self, messages, *, model: str, temperature=None, max_tokens=None) -> str:
+        self.calls += 1
+        return await super().generate(messages, model=model)
+
+
+class NullAnalyticsRepository(AnalyticsRepository):
+    async def apply_message_count_deltas(self, deltas):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_redelivered_event_is_handled_once_and_acked_after_handling():
+    service = ConversationService(InMemoryConversationRepository())
+    llm = CountingLLMClient()
+
+    conv = await service.create_conversation("hello")
+    user_msg = conv.messages[-1]
+    event = MessageReceivedEvent(
+        conversation_id=conv.id,
+        message_id=user_msg.id,
+        role=MessageRole.USER,
+        content=user_msg.content,
+    )
+    subscriber = RedeliveringSubscriber([event, event])
+
+    router = build_router(
+        get_settings(),
+        conversation_service=service,
+        llm_client=llm,
+        event_publisher=CollectingEventPublisher(),
+        analytics_service=AnalyticsService(NullAnalyticsRepository()),
+    )
+    group_id = get_settings().mq_group_id_events_consumer
+    await run_loop(subscriber, router, group_id, processed_events=InMemoryProcessedEventStore(max_entries=100))
+
+    assert llm.calls == 1
+    assert len((await service.get_conversation(conv.id)).messages) == 2
+    assert subscriber.acked == [event, event]
+
+
+class FailingForLLMClient(EchoLLMClient):
+    def __init__(self, poison: str) -> None:
+        self.poison = poison
+
+    async def generate(self, messages, *, model: str, temperature=None, max_tokens=None) -> str:
+        if any(msg.content == self.poison for msg in messages):
+            raise TimeoutError("ollama timed out")
+        return await super().generate(messages, model=model)
+
+
+@pytest.mark.asyncio
+async def test_failed_event_goes_to_retry_topic_without_blocking_other_conversations():
+    repo = InMemoryConversationRepository()
+    service = ConversationService(repo)
+    publisher = CollectingEventPublisher()
+    events = []
+    for content in ["poison", "fine", "also fine"]:
+        conv = await service.create_conversation(content)
+        msg = conv.messages[-1]
+        events.append(
+            MessageReceivedEvent(conversation_id=conv.id, message_id=msg.id, role=MessageRole.USER, content=content)
+        )
+    subscriber = RedeliveringSubscriber(events)
+    settings = get_settings()
+    router = build_router(
+        settings,
+        conversation_service=service,
+        llm_client=FailingForLLMClient("poison"),
+        event_publisher=publisher,
+        analytics_service=AnalyticsService(NullAnalyticsRepository()),
+    )
+    group_id = settings.mq_group_id_events_consumer
+    store = InMemoryProcessedEventStore(max_entries=100)
+
+    await run_loop(subscriber, router, group_id, processed_events=store, retry_publisher=publisher)
+
+    retried = [(topic, evt) for topic, evt in publisher.published if topic == f"{group_id}.retry-1"]
+    assert [evt.event_id for _, evt in retried] == [events[0].event_id]
+    assert sum(isinstance(evt, AssistantRespondedEvent) for evt in repo.outbox) == 2
+    assert subscriber.acked == events
+
+    # retry 단계 consumer는 retry_due_at까지 기다린 뒤 같은 handler로 다시 처리한다.
+    retry_event = retried[0][1]
+    retry_event.metadata["retry_due_at"] = retry_event.metadata["retry_failed_at"]
+    router = build_router(
+        settings,
+        conversation_service=service,
+        llm_client=EchoLLMClient(),
+        event_publisher=publisher,
+        analytics_service=AnalyticsService(NullAnalyticsRepository()),
+    )
+    await run_loop(
+        RedeliveringSubscriber([retry_event]),
+        router,
+        group_id,
+        processed_events=store,
+        retry_publisher=publisher,
+        attempt=1,
+    )
+    assert len((await service.get_conversation(events[0].conversation_id)).messages) == 2
+
+
+class HangingLLMClient(EchoLLMClient):
+    def __init__(self) -> None:
+        self.started = asyncio.Event()
+
+    async def generate(self, messages, *, model: str, temperature=None, max_tokens=None) -> str:
+        self.started.set()
+        await asyncio.Event().wait()
+        raise AssertionError("unreachable")
+
+
+@pytest.mark.asyncio
+async def test_event_cancelled_mid_handler_is_processed_when_redelivered():
+    service = ConversationService(InMemoryConversationRepository())
+    conv = await service.create_conversation("hello")
+    user_msg = conv.messages[-1]
+    event = MessageReceivedEvent(
+        conversation_id=conv.id,
+        message_id=user_msg.id,
+        role=MessageRole.USER,
+        content=user_msg.content,
+    )
+    settings = get_settings()
+    group_id = settings.mq_group_id_events_consumer
+    store = InMemoryProcessedEventStore(max_entries=100)
+
+    def router_for(llm: LLMClient):
+        return build_router(
+            settings,
+            conversation_service=service,
+            llm_client=llm,
+            event_publisher=CollectingEventPublisher(),
+            analytics_service=AnalyticsService(NullAnalyticsRepository()),
+        )
+
+    # 종료/rebalance로 LLM 호출 중에 취소되면 ack 하지 않고 claim도 남기지 않는다.
+    hanging = HangingLLMClient()
+    first = RedeliveringSubscriber([event])
+    task = asyncio.create_task(run_loop(first, router_for(hanging), group_id, processed_events=store))
+    await hanging.started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert first.acked == []
+
+    llm = CountingLLMClient()
+    redelivered = RedeliveringSubscriber([event])
+    await run_loop(redelivered, router_for(llm), group_id, processed_events=store)
+
+    assert llm.calls == 1
+    assert len((await service.get_conversation(conv.id)).messages) == 2
+    assert redelivered.acked == [event]
+
+
+class BatchSubscriber(EventSubscriber):
+    def __init__(self, batch) -> None:
+        self._batch = batch
+        self.acked: list[object] = []
+
+    async def iterate(self, topic: str):
+        for event in self._batch:
+            yield event
+
+    async def iterate_batches(self, topic: str, *, max_records: int, timeout_ms: int):
+        yield [Delivery(event, lambda event=event: self.acked.append(event)) for event in self._batch]
+
+
+class FlakyAnalyticsRepository(AnalyticsRepository):
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.applied: list[object] = []
+
+    async def apply_message_count_deltas(self, deltas):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError("database is down")
+        self.applied.extend(deltas)
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_without_retry_topics_is_retried_before_ack(monkeypatch):
+    monkeypatch.setattr(events_consumer, "_BATCH_RETRY_BACKOFF_SECONDS", (0.0,))
+    conversation_id = ConversationId(uuid4())
+    events = [
+        MessageReceivedEvent(
+            conversation_id=conversation_id,
+            message_id=MessageId(uuid4()),
+            role=MessageRole.USER,
+            content=f"m{i}",
+        )
+        for i in range(3)
+    ]
+    subscriber = BatchSubscriber(events)
+    analytics = FlakyAnalyticsRepository(failures=2)
+    settings = get_settings()
+    router = build_router(
+        settings,
+        conversation_service=ConversationService(InMemoryConversationRepository()),
+        llm_client=EchoLLMClient(),
+        event_publisher=CollectingEventPublisher(),
+        analytics_service=AnalyticsService(analytics),
+    )
+
+    # retry_publisher가 없으면 retry topic으로 보낼 수 없으므로 ack 하지 않고 같은 배치를 다시 처리한다.
+    await run_loop(
+        subscriber,
+        router,
+        settings.mq_group_id_analytics,
+        processed_events=InMemoryProcessedEventStore(max_entries=100),
+    )
+
+    assert analytics.failures == 0
+    assert [delta.user_messages for delta in analytics.applied] == [3]
+    assert subscriber.acked == events
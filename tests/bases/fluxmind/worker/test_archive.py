@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import ConversationArchivedEvent, ConversationHeader, ConversationId
+from fluxmind.mq import EventPublisher
+from fluxmind.worker.main import archive_old_conversations
+
+
+class InMemoryArchiveRepository(ConversationRepository):
+    def __init__(self, headers: list[ConversationHeader]) -> None:
+        self._headers = {h.id: h for h in headers}
+        self.calls = 0
+        # 다른 트랜잭션이 잠근 행. 첫 호출에서만 SKIP LOCKED로 건너뛰어 청크가 짧아진다.
+        self.locked: set[ConversationId] = set()
+
+    async def archive_older_than(self, older_than, *, limit, after=None):
+        self.calls += 1
+        candidates = sorted(
+            (h for h in self._headers.values() if not h.is_archived and h.updated_at < older_than),
+            key=lambda h: (h.updated_at, h.id),
+        )
+        if after is not None:
+            candidates = [h for h in candidates if (h.updated_at, h.id) > (after.updated_at, after.id)]
+        archived = []
+        for h in candidates[:limit]:
+            if self.calls == 1 and h.id in self.locked:
+                continue
+            archived_header = ConversationHeader(
+                id=h.id,
+                is_archived=True,
+                created_at=h.created_at,
+                updated_at=h.updated_at,
+            )
+            self._headers[h.id] = archived_header
+            archived.append(archived_header)
+        return archived
+
+
+class CollectingEventPublisher(EventPublisher):
+    def __init__(self) -> None:
+        self.published: list[tuple[str, object]] = []
+
+    async def publish(self, topic: str, event, *, partition_key: str | None = None):
+        self.published.append((topic, event))
+
+
+@pytest.mark.asyncio
+async def test_archive_drains_backlog_in_chunks():
+    now = datetime.now(timezone.utc)
+    headers = [
+        ConversationHeader(
+            id=ConversationId(uuid4()),
+            is_archived=False,
+            created_at=now - timedelta(days=90),
+            updated_at=now - timedelta(days=60, minutes=i),
+        )
+        for i in range(7)
+    ]
+    repo = InMemoryArchiveRepository(headers)
+    publisher = CollectingEventPublisher()
+
+    count = await archive_old_conversations(
+        ConversationService(repo),
+        publisher,
+        older_than=now - timedelta(days=30),
+        topic="conversation-events",
+        chunk_size=3,
+    )
+
+    assert count == 7
+    # 마지막 청크(1개)가 짧아도 빈 청크를 받을 때까지 한 번 더 묻는다.
+    assert repo.calls == 4
+    assert {evt.conversation_id for _, evt in publisher.published} == {h.id for h in headers}
+    assert all(isinstance(evt, ConversationArchivedEvent) for _, evt in publisher.published)
+
+
+@pytest.mark.asyncio
+async def test_short_chunk_from_locked_rows_does_not_end_the_drain():
+    now = datetime.now(timezone.utc)
+    headers = [
+        ConversationHeader(
+            id=ConversationId(uuid4()),
+            is_archived=False,
+            created_at=now - timedelta(days=90),
+            updated_at=now - timedelta(days=60, minutes=i),
+        )
+        for i in range(6)
+    ]
+    repo = InMemoryArchiveRepository(headers)
+    oldest = min(headers, key=lambda h: (h.updated_at, h.id))
+    repo.locked = {oldest.id}
+
+    count = await archive_old_conversations(
+        ConversationService(repo),
+        CollectingEventPublisher(),
+        older_than=now - timedelta(days=30),
+        topic="conversation-events",
+        chunk_size=3,
+    )
+
+    # 첫 청크는 잠긴 행 때문에 2개뿐이지만 뒤의 3개도 같은 실행에서 보관한다.
+    assert count == 5
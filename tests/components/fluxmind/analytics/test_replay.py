@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from fluxmind.analytics import MessageCountAggregator, ReplayCheckpoint
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationArchivedEvent,
+    ConversationId,
+    MessageId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+from fluxmind.mq import EventCodecRegistry
+
+
+@pytest.mark.parametrize("use_fast_json", [True, False])
+def test_aggregator_counts_like_the_analytics_service(use_fast_json):
+    codec = EventCodecRegistry(
+        [MessageReceivedEvent, AssistantRespondedEvent, ConversationArchivedEvent],
+        use_fast_json=use_fast_json,
+    )
+    conversation_id = ConversationId(uuid4())
+    base = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    # 다른 시간대로 기록된 이벤트가 문자열로는 더 작아 보여도 실제로는 가장 늦다.
+    latest = (base + timedelta(hours=1)).astimezone(timezone(timedelta(hours=-5)))
+    events = [
+        MessageReceivedEvent(
+            conversation_id=conversation_id,
+            message_id=MessageId(uuid4()),
+            role=MessageRole.USER,
+            content="hi",
+            token_count=3,
+            occurred_at=base,
+        ),
+        MessageReceivedEvent(
+            conversation_id=conversation_id,
+            message_id=MessageId(uuid4()),
+            role=MessageRole.ASSISTANT,
+            content="ignored",
+            token_count=100,
+            occurred_at=base,
+        ),
+        AssistantRespondedEvent(
+            conversation_id=conversation_id,
+            user_message_id=MessageId(uuid4()),
+            assistant_message_id=MessageId(uuid4()),
+            content="hello",
+            token_count=None,
+            prompt_token_count=30,
+            occurred_at=latest,
+        ),
+        ConversationArchivedEvent(conversation_id=conversation_id),
+    ]
+
+    aggregator = MessageCountAggregator()
+    for event in events:
+        aggregator.add(*codec.decode_raw(codec.encode(event)))
+
+    assert len(aggregator) == 1
+    [delta] = aggregator.drain()
+    assert delta.conversation_id == conversation_id
+    assert (delta.user_messages, delta.assistant_messages) == (1, 1)
+    assert (delta.user_tokens, delta.assistant_tokens, delta.prompt_tokens) == (3, 0, 30)
+    assert delta.last_message_at == latest
+    assert len(aggregator) == 0
+
+
+def test_checkpoint_is_finished_when_every_partition_reaches_its_end():
+    checkpoint = ReplayCheckpoint(topic="events", positions={0: 10, 1: 3}, end_offsets={0: 10, 1: 5})
+    assert not checkpoint.finished
+    checkpoint.positions[1] = 5
+    assert checkpoint.finished
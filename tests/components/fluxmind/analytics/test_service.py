@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.analytics import AnalyticsRepository, AnalyticsService, MessageCountDelta
+from fluxmind.domain_core import AssistantRespondedEvent, ConversationId, MessageReceivedEvent, MessageRole
+
+
+class RecordingAnalyticsRepository(AnalyticsRepository):
+    def __init__(self) -> None:
+        self.batches: list[list[MessageCountDelta]] = []
+
+    async def apply_message_count_deltas(self, deltas):
+        self.batches.append(list(deltas))
+
+
+def _user_event(conversation_id: ConversationId) -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=conversation_id,
+        message_id=uuid4(),
+        role=MessageRole.USER,
+        content="hi",
+        token_count=2,
+    )
+
+
+def _assistant_event(conversation_id: ConversationId) -> AssistantRespondedEvent:
+    return AssistantRespondedEvent(
+        conversation_id=conversation_id,
+        user_message_id=uuid4(),
+        assistant_message_id=uuid4(),
+        content="hello",
+        token_count=5,
+        prompt_token_count=40,
+    )
+
+
+@pytest.mark.asyncio
+async def test_write_through_mode_counts_user_and_assistant_messages():
+    repo = RecordingAnalyticsRepository()
+    service = AnalyticsService(repo)
+    conv_id = ConversationId(uuid4())
+
+    await service.handle_message_received(_user_event(conv_id))
+    await service.handle_assistant_responded(_assistant_event(conv_id))
+
+    assert [(d.user_messages, d.assistant_messages) for [d] in repo.batches] == [(1, 0), (0, 1)]
+
+
+@pytest.mark.asyncio
+async def test_buffered_mode_coalesces_per_conversation():
+    repo = RecordingAnalyticsRepository()
+    service = AnalyticsService(repo, flush_interval_ms=60_000, flush_max_events=5)
+    hot, cold = ConversationId(uuid4()), ConversationId(uuid4())
+
+    for _ in range(2):
+        await service.handle_message_received(_user_event(hot))
+        await service.handle_assistant_responded(_assistant_event(hot))
+    assert repo.batches == []
+
+    await service.handle_message_received(_user_event(cold))
+
+    assert len(repo.batches) == 1
+    counts = {d.conversation_id: (d.user_messages, d.assistant_messages) for d in repo.batches[0]}
+    assert counts == {hot: (2, 2), cold: (1, 0)}
+    tokens = {d.conversation_id: (d.user_tokens, d.assistant_tokens) for d in repo.batches[0]}
+    assert tokens == {hot: (4, 10), cold: (2, 0)}
+
+
+@pytest.mark.asyncio
+async def test_batch_is_written_with_one_upsert_per_call():
+    repo = RecordingAnalyticsRepository()
+    service = AnalyticsService(repo, flush_interval_ms=1000)
+    conv_a, conv_b = ConversationId(uuid4()), ConversationId(uuid4())
+
+    await service.handle_batch([_user_event(conv_a), _assistant_event(conv_a), _user_event(conv_b)])
+
+    assert len(repo.batches) == 1
+    deltas = {delta.conversation_id: delta for delta in repo.batches[0]}
+    assert (deltas[conv_a].user_messages, deltas[conv_a].assistant_messages) == (1, 1)
+    assert (deltas[conv_a].user_tokens, deltas[conv_a].assistant_tokens) == (2, 5)
+    assert (deltas[conv_a].prompt_tokens, deltas[conv_b].prompt_tokens) == (40, 0)
+    assert deltas[conv_b].user_messages == 1
+
+
+class FailingOnceAnalyticsRepository(RecordingAnalyticsRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.fail = True
+
+    async def apply_message_count_deltas(self, deltas):
+        if self.fail:
+            self.fail = False
+            raise ConnectionError("database is down")
+        await super().apply_message_count_deltas(deltas)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_counting_towards_flush_max_events():
+    repo = FailingOnceAnalyticsRepository()
+    service = AnalyticsService(repo, flush_interval_ms=60_000, flush_max_events=3)
+    conv_id = ConversationId(uuid4())
+
+    for _ in range(2):
+        await service.handle_message_received(_user_event(conv_id))
+    with pytest.raises(ConnectionError):
+        await service.handle_message_received(_user_event(conv_id))
+
+    # 되돌린 3개에 하나가 더해지면 바로 다시 flush 한다.
+    await service.handle_message_received(_user_event(conv_id))
+
+    [[delta]] = repo.batches
+    assert delta.user_messages == 4
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from fluxmind.context_builder import ContextBuilder, HeuristicTokenCounter
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import Conversation, ConversationId, Message, MessageCursor, MessageId, MessageRole
+from fluxmind.llm import LLMRole
+from fluxmind.summarization import ConversationSummary, SummaryRepository
+
+
+class PagingConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+        self.pages_read = 0
+
+    async def save(self, conversation: Conversation, *, outbox=()) -> None:
+        self._store[conversation.id] = conversation
+
+    async def list_messages(self, conversation_id: ConversationId, limit: int | None = None, *, before=None, after=None):
+        self.pages_read += 1
+        messages = list(self._store[conversation_id].messages)
+        if before is not None:
+            messages = [m for m in messages if (m.created_at, m.id) < (before.created_at, before.id)]
+        return messages[-limit:] if limit is not None else messages
+
+
+class InMemorySummaryRepository(SummaryRepository):
+    def __init__(self) -> None:
+        self.summaries: dict[ConversationId, ConversationSummary] = {}
+
+    async def get(self, conversation_id: ConversationId) -> ConversationSummary | None:
+        return self.summaries.get(conversation_id)
+
+    async def save(self, summary: ConversationSummary) -> bool:
+        self.summaries[summary.conversation_id] = summary
+        return True
+
+
+async def _conversation_with(repo: PagingConversationRepository, count: int) -> Conversation:
+    service = ConversationService(repo)
+    conv = await service.create_conversation()
+    for i in range(count):
+        conv.add_message(MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT, f"message {i:04d} " + "x" * 30)
+    await repo.save(conv)
+    return conv
+
+
+@pytest.mark.asyncio
+async def test_keeps_newest_messages_that_fit_the_budget():
+    repo = PagingConversationRepository()
+    conv = await _conversation_with(repo, 200)
+    counter = HeuristicTokenCounter()
+    per_message = counter.count_message(conv.messages[0])
+    builder = ContextBuilder(
+        ConversationService(repo),
+        counter,
+        default_budget=per_message * 15,
+        model_budgets={"big": per_message * 1000},
+        system_prompt="be brief",
+        page_size=10,
+    )
+
+    history = await builder.build(conv.id, model="small")
+
+    assert history[0].role == LLMRole.SYSTEM
+    assert [m.content for m in history[1:]] == [m.content for m in conv.messages[-14:]]
+    assert repo.pages_read == 2
+
+    full = await builder.build(conv.id, model="big")
+    assert len(full) == 201
+
+
+@pytest.mark.asyncio
+async def test_newest_message_is_kept_even_when_over_budget():
+    repo = PagingConversationRepository()
+    conv = await _conversation_with(repo, 3)
+    builder = ContextBuilder(ConversationService(repo), HeuristicTokenCounter(), default_budget=1)
+
+    history = await builder.build(conv.id, model="any")
+
+    assert [m.content for m in history] == [conv.messages[-1].content]
+
+
+def test_token_counts_are_cached_per_message():
+    counter = HeuristicTokenCounter(cache_size=1)
+    conv_id = ConversationId(uuid4())
+    message = Message(id=MessageId(uuid4()), conversation_id=conv_id, role=MessageRole.USER, content="abcd" * 10)
+
+    assert counter.count_message(message) == 14
+    counter.count_text = lambda text: 0
+    assert counter.count_message(message) == 14
+
+
+def test_stored_token_count_is_used_without_reading_content():
+    counter = HeuristicTokenCounter()
+    conv = Conversation(id=ConversationId(uuid4()))
+    message = conv.add_message(MessageRole.ASSISTANT, "abcd" * 10, token_count=3)
+
+    assert conv.add_message(MessageRole.USER, "abcd" * 10).token_count == 10
+    assert counter.count_message(message) == 7
+
+
+@pytest.mark.asyncio
+async def test_summary_replaces_messages_up_to_its_high_water_mark():
+    repo = PagingConversationRepository()
+    conv = await _conversation_with(repo, 40)
+    summaries = InMemorySummaryRepository()
+    summaries.summaries[conv.id] = ConversationSummary(
+        conversation_id=conv.id,
+        content="earlier talk",
+        last_message=MessageCursor.of(conv.messages[29]),
+        message_count=30,
+        updated_at=datetime.now(timezone.utc),
+    )
+    builder = ContextBuilder(
+        ConversationService(repo),
+        HeuristicTokenCounter(),
+        default_budget=100_000,
+        page_size=4,
+        summary_repository=summaries,
+    )
+
+    history = await builder.build(conv.id, model="any")
+
+    assert history[0].role == LLMRole.SYSTEM
+    assert "earlier talk" in history[0].content
+    assert [m.content for m in history[1:]] == [m.content for m in conv.messages[30:]]
+    assert repo.pages_read == 3
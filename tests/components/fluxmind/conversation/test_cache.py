@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fluxmind.conversation import CachingConversationRepository, ConversationRepository
+from fluxmind.domain_core import (
+    Conversation,
+    ConversationHeader,
+    ConversationId,
+    Message,
+    MessageRole,
+    new_conversation,
+)
+
+
+class InMemoryConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+        self.loads = 0
+
+    async def get(self, conversation_id: ConversationId) -> Conversation | None:
+        self.loads += 1
+        conv = self._store.get(conversation_id)
+        return conv.copy() if conv is not None else None
+
+    async def get_header(self, conversation_id: ConversationId) -> ConversationHeader | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        return ConversationHeader(
+            id=conv.id,
+            is_archived=conv.is_archived,
+            created_at=conv.created_at,
+            updated_at=conv.updated_at,
+        )
+
+    async def save(self, conversation: Conversation, *, outbox=()) -> None:
+        self._store[conversation.id] = conversation.copy()
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox=None,
+    ) -> Message | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        return conv.add_message(role, content, token_count=token_count)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def _seed(inner: InMemoryConversationRepository) -> Conversation:
+    conv = new_conversation("hello")
+    conv.updated_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await inner.save(conv)
+    return conv
+
+
+@pytest.mark.asyncio
+async def test_repeated_get_is_served_from_cache():
+    inner = InMemoryConversationRepository()
+    conv = await _seed(inner)
+    cache = CachingConversationRepository(inner, max_bytes=1 << 20, ttl_seconds=60)
+
+    first = await cache.get(conv.id)
+    second = await cache.get(conv.id)
+
+    assert inner.loads == 1
+    assert first is not second
+    assert [m.content for m in second.messages] == ["hello"]
+    assert (cache.stats().hits, cache.stats().misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_write_behind_the_cache_is_detected_by_version():
+    inner = InMemoryConversationRepository()
+    conv = await _seed(inner)
+    cache = CachingConversationRepository(inner, max_bytes=1 << 20, ttl_seconds=60)
+    await cache.get(conv.id)
+
+    # 다른 replica가 캐시를 거치지 않고 메시지를 추가한 상황
+    await inner.append_message(conv.id, MessageRole.ASSISTANT, "hi")
+    refreshed = await cache.get(conv.id)
+
+    assert [m.content for m in refreshed.messages] == ["hello", "hi"]
+    assert cache.stats().stale == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl():
+    inner = InMemoryConversationRepository()
+    conv = await _seed(inner)
+    clock = FakeClock()
+    cache = CachingConversationRepository(inner, max_bytes=1 << 20, ttl_seconds=10, clock=clock)
+
+    await cache.get(conv.id)
+    clock.now = 11
+    await cache.get(conv.id)
+
+    assert inner.loads == 2
+
+
+@pytest.mark.asyncio
+async def test_size_bound_evicts_least_recently_used():
+    inner = InMemoryConversationRepository()
+    convs = [await _seed(inner) for _ in range(3)]
+    cache = CachingConversationRepository(inner, max_bytes=2000, ttl_seconds=60)
+
+    for conv in convs:
+        await cache.get(conv.id)
+
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.entries == 2
+    assert stats.size_bytes <= 2000
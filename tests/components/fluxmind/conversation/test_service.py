@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+from fluxmind.conversation import CachingConversationRepository, ConversationService
+from fluxmind.domain_core import MessageReceivedEvent
+
+from .test_cache import InMemoryConversationRepository
+
+
+class OutboxRecordingRepository(InMemoryConversationRepository):
+    def __init__(self) -> None:
+        super().__init__()
+        self.outbox: list[object] = []
+
+    async def save(self, conversation, *, outbox=()) -> None:
+        await super().save(conversation)
+        self.outbox.extend(outbox)
+
+    async def append_message(self, conversation_id, role, content, *, token_count=None, outbox=None):
+        message = await super().append_message(conversation_id, role, content, token_count=token_count)
+        if message is not None and outbox is not None:
+            self.outbox.extend(outbox(message))
+        return message
+
+
+@pytest.mark.asyncio
+async def test_emit_events_writes_message_received_events_through_the_repository():
+    inner = OutboxRecordingRepository()
+    service = ConversationService(CachingConversationRepository(inner, max_bytes=1 << 20, ttl_seconds=60))
+
+    conv = await service.create_conversation("hello", emit_events=True)
+    reply = await service.add_user_message(conv.id, "again", emit_events=True)
+    await service.add_user_message(conv.id, "quiet")
+
+    assert [type(event) for event in inner.outbox] == [MessageReceivedEvent, MessageReceivedEvent]
+    assert [event.message_id for event in inner.outbox] == [conv.messages[-1].id, reply.id]
+    assert inner.outbox[1].content == "again"
+    assert inner.outbox[1].token_count == reply.token_count
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import os
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fluxmind.database.models import Base
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+# 실제 Postgres가 필요한 테스트. 예: FLUXMIND_TEST_DB_URL=postgresql+asyncpg://postgres@localhost/postgres
+TEST_DB_URL = os.environ.get("FLUXMIND_TEST_DB_URL")
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    if not TEST_DB_URL:
+        pytest.skip("FLUXMIND_TEST_DB_URL is not set")
+
+    # 테스트마다 빈 schema를 만들어 다른 데이터와 섞이지 않게 한다.
+    schema = f"test_{uuid4().hex}"
+    admin = create_async_engine(TEST_DB_URL)
+    async with admin.begin() as conn:
+        await conn.execute(text(f'CREATE SCHEMA "{schema}"'))
+    engine = create_async_engine(TEST_DB_URL, connect_args={"server_settings": {"search_path": schema}})
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+    finally:
+        await engine.dispose()
+        async with admin.begin() as conn:
+            await conn.execute(text(f'DROP SCHEMA "{schema}" CASCADE'))
+        await admin.dispose()
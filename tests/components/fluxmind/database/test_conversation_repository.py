@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import timedelta
+from uuid import uuid4
+
+import pytest
+from fluxmind.database.conversation_repository import SqlAlchemyConversationRepository
+from fluxmind.database.models import MessageRow
+from fluxmind.domain_core import ConversationId, MessageCursor, MessageRole, new_conversation
+from sqlalchemy import func, select
+
+
+@pytest.mark.asyncio
+async def test_append_message_inserts_and_touches_the_conversation(session_maker):
+    repo = SqlAlchemyConversationRepository(session_maker)
+    conv = new_conversation("hello")
+    conv.updated_at -= timedelta(hours=1)
+    await repo.save(conv)
+
+    message = await repo.append_message(conv.id, MessageRole.ASSISTANT, "hi there", token_count=2)
+
+    assert message is not None
+    assert [(m.role, m.content, m.token_count) for m in await repo.list_messages(conv.id)] == [
+        (MessageRole.USER, "hello", conv.messages[0].token_count),
+        (MessageRole.ASSISTANT, "hi there", 2),
+    ]
+    header = await repo.get_header(conv.id)
+    assert header.updated_at == message.created_at
+
+
+@pytest.mark.asyncio
+async def test_append_message_to_unknown_conversation_inserts_nothing(session_maker):
+    repo = SqlAlchemyConversationRepository(session_maker)
+
+    assert await repo.append_message(ConversationId(uuid4()), MessageRole.USER, "lost") is None
+    async with session_maker() as session:
+        assert (await session.execute(select(func.count()).select_from(MessageRow))).scalar_one() == 0
+
+
+@pytest.mark.asyncio
+async def test_before_cursor_pages_backwards_in_keyset_order(session_maker):
+    repo = SqlAlchemyConversationRepository(session_maker)
+    conv = new_conversation("m0")
+    for i in range(1, 5):
+        conv.add_message(MessageRole.USER, f"m{i}")
+    # 같은 created_at이면 id가 순서를 정하므로 경계에서 메시지가 빠지거나 겹치지 않아야 한다.
+    conv.messages[3] = dataclasses.replace(conv.messages[3], created_at=conv.messages[2].created_at)
+    await repo.save(conv)
+
+    pages = []
+    before = None
+    while True:
+        page = await repo.list_messages(conv.id, limit=2, before=before)
+        if not page:
+            break
+        pages.append([m.content for m in page])
+        before = MessageCursor.of(page[0])
+
+    seen = [content for page in reversed(pages) for content in page]
+    assert sorted(seen) == ["m0", "m1", "m2", "m3", "m4"]
+    assert len(seen) == len(set(seen))
+    assert all(len(page) <= 2 for page in pages)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.database.models import OutboxEventRow
+from fluxmind.database.outbox_store import SqlAlchemyOutboxStore
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import ClaimCheck, EventCodecRegistry, FileContentStore
+from sqlalchemy import insert, select
+
+
+def _received(content: str = "hi") -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content=content,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lease_keeps_rows_that_could_not_be_published(session_maker):
+    store = SqlAlchemyOutboxStore(session_maker, topic="events", max_attempts=2)
+    event = _received()
+    async with session_maker() as session:
+        await session.execute(
+            insert(OutboxEventRow).values(topic="events", payload=b'{"event_type": "Unknown", "data": {}}')
+        )
+        await store.add(session, [event])
+        await session.commit()
+
+    error = "LookupError: Unknown event type 'Unknown'"
+    async with store.lease(10) as batch:
+        unknown, published = batch.events
+        assert published.partition_key == str(event.conversation_id)
+        batch.failed[unknown.id] = error
+    async with store.lease(10) as batch:
+        assert [item.id for item in batch.events] == [unknown.id]
+        batch.failed[unknown.id] = error
+
+    async with session_maker() as session:
+        rows = (await session.execute(select(OutboxEventRow))).scalars().all()
+    assert [(row.id, row.attempts, row.last_error) for row in rows] == [(unknown.id, 2, error)]
+
+    # max_attempts 번 실패한 행은 더 가져가지 않는다.
+    async with store.lease(10) as batch:
+        assert batch.events == []
+
+
+@pytest.mark.asyncio
+async def test_add_applies_the_claim_check_once(session_maker, tmp_path):
+    store = SqlAlchemyOutboxStore(
+        session_maker,
+        topic="events",
+        claim_check=ClaimCheck(FileContentStore(tmp_path), threshold_bytes=16),
+    )
+    event = _received("x" * 100)
+    async with session_maker() as session:
+        await store.add(session, [event])
+        await session.commit()
+
+    async with store.lease(10) as batch:
+        [item] = batch.events
+    assert item.partition_key == str(event.conversation_id)
+    stored = EventCodecRegistry([MessageReceivedEvent]).decode(item.payload)
+    assert (stored.content, stored.content_ref) == (None, str(event.message_id))
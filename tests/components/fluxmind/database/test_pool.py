@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import pytest
+from fluxmind.database.pool import InstrumentedAsyncQueuePool
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+
+class FakeDBAPIConnection:
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.mark.asyncio
+async def test_checkout_waits_and_timeouts_are_counted():
+    pool = InstrumentedAsyncQueuePool(FakeDBAPIConnection, pool_size=1, max_overflow=0, timeout=0.05)
+
+    held = await greenlet_spawn(pool.connect)
+    with pytest.raises(exc.TimeoutError):
+        await greenlet_spawn(pool.connect)
+
+    metrics = pool.metrics()
+    assert (metrics.pool_size, metrics.checked_out, metrics.overflow) == (1, 1, 0)
+    assert (metrics.checkouts, metrics.checkout_timeouts) == (2, 1)
+    assert metrics.checkout_wait_seconds_max >= 0.05
+    assert metrics.checkout_wait_seconds_total >= metrics.checkout_wait_seconds_max
+
+    held.close()
+    again = await greenlet_spawn(pool.connect)
+    again.close()
+
+    metrics = pool.metrics()
+    assert (metrics.checkouts, metrics.checkout_timeouts, metrics.checked_out) == (3, 1, 0)
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fluxmind.database.processed_event_store import SqlAlchemyProcessedEventStore
+
+
+@pytest.mark.asyncio
+async def test_completed_event_is_not_claimed_again(session_maker):
+    store = SqlAlchemyProcessedEventStore(session_maker, "group")
+    event_id = uuid4()
+
+    assert await store.claim(event_id)
+    await store.complete(event_id)
+
+    assert not await store.claim(event_id)
+    # group마다 따로 기록한다.
+    assert await SqlAlchemyProcessedEventStore(session_maker, "other").claim(event_id)
+
+
+@pytest.mark.asyncio
+async def test_released_event_can_be_claimed_again(session_maker):
+    store = SqlAlchemyProcessedEventStore(session_maker, "group")
+    event_ids = [uuid4(), uuid4()]
+
+    assert await store.claim_many(event_ids) == set(event_ids)
+    await store.release_many(event_ids)
+
+    assert await store.claim_many(event_ids) == set(event_ids)
+
+
+@pytest.mark.asyncio
+async def test_expired_claim_of_a_dead_consumer_is_taken_over(session_maker):
+    dead = SqlAlchemyProcessedEventStore(session_maker, "group")
+    event_id = uuid4()
+    assert await dead.claim(event_id)
+
+    # complete도 release도 하지 못하고 죽은 consumer의 claim은 lease가 지나면 이어받는다.
+    successor = SqlAlchemyProcessedEventStore(session_maker, "group", lease_seconds=0)
+    assert await successor.claim(event_id)
+
+
+@pytest.mark.asyncio
+async def test_claim_waits_for_an_in_progress_event(session_maker):
+    owner = SqlAlchemyProcessedEventStore(session_maker, "group")
+    other = SqlAlchemyProcessedEventStore(session_maker, "group", poll_interval_seconds=0.01)
+    event_id = uuid4()
+    assert await owner.claim(event_id)
+
+    waiting = asyncio.create_task(other.claim(event_id))
+    await asyncio.sleep(0.05)
+    assert not waiting.done()
+
+    await owner.complete(event_id)
+    assert await asyncio.wait_for(waiting, timeout=1) is False
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from fluxmind.domain_core import MessageRole, new_conversation
+
+
+def test_new_conversation_messages_are_pending():
+    conv = new_conversation("hello")
+
+    assert [m.content for m in conv.pending_messages()] == ["hello"]
+
+
+def test_pending_messages_only_include_messages_added_after_persist():
+    conv = new_conversation("hello")
+    conv.mark_persisted()
+
+    assert conv.pending_messages() == ()
+
+    reply = conv.add_message(MessageRole.ASSISTANT, "hi")
+
+    assert conv.pending_messages() == (reply,)
+    assert len(conv.latest_messages()) == 2
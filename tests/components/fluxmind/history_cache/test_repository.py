@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import pytest
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import Conversation, ConversationId, Message, MessageRole
+from fluxmind.history_cache import InMemoryMessageTailCache, TailCachedConversationRepository
+
+
+class InMemoryConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+        self.list_calls = 0
+
+    async def save(self, conversation: Conversation, *, outbox=()) -> None:
+        self._store[conversation.id] = conversation
+
+    async def append_message(
+        self,
+        conversation_id: ConversationId,
+        role: MessageRole,
+        content: str,
+        *,
+        token_count: int | None = None,
+        outbox=None,
+    ) -> Message | None:
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return None
+        return conv.add_message(role, content, token_count=token_count)
+
+    async def list_messages(self, conversation_id: ConversationId, limit: int | None = None, *, before=None, after=None):
+        self.list_calls += 1
+        conv = self._store.get(conversation_id)
+        if conv is None:
+            return []
+        return list(conv.latest_messages(limit=limit))
+
+
+@pytest.mark.asyncio
+async def test_tail_is_filled_once_and_kept_current_on_append():
+    inner = InMemoryConversationRepository()
+    service = ConversationService(TailCachedConversationRepository(inner, InMemoryMessageTailCache(window=3)))
+    conv = await service.create_conversation("one")
+    await service.add_assistant_message(conv.id, "two")
+
+    assert [m.content for m in await service.list_messages(conv.id, limit=3)] == ["one", "two"]
+    await service.add_user_message(conv.id, "three")
+    await service.add_assistant_message(conv.id, "four")
+
+    assert [m.content for m in await service.list_messages(conv.id, limit=3)] == ["two", "three", "four"]
+    assert inner.list_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_beyond_the_window_fall_back_to_repository():
+    inner = InMemoryConversationRepository()
+    service = ConversationService(TailCachedConversationRepository(inner, InMemoryMessageTailCache(window=2)))
+    conv = await service.create_conversation("one")
+    for content in ("two", "three"):
+        await service.add_user_message(conv.id, content)
+
+    assert [m.content for m in await service.list_messages(conv.id, limit=5)] == ["one", "two", "three"]
+    assert inner.list_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_fill_is_skipped_when_a_write_raced_the_read():
+    cache = InMemoryMessageTailCache(window=3)
+    inner = InMemoryConversationRepository()
+    service = ConversationService(inner)
+    conv = await service.create_conversation("one")
+
+    generation = await cache.generation(conv.id)
+    stale = await inner.list_messages(conv.id, 3)
+    await cache.append(await service.add_user_message(conv.id, "two"))
+
+    assert await cache.fill(conv.id, stale, generation=generation) is False
+    assert await cache.get_tail(conv.id, 3) is None
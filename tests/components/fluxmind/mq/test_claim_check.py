@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationArchivedEvent,
+    ConversationId,
+    MessageId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+from fluxmind.mq import ClaimCheck, EventCodecRegistry, FileContentStore
+
+
+def _received(content: str) -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content=content,
+    )
+
+
+@pytest.mark.asyncio
+async def test_large_content_travels_by_reference(tmp_path):
+    claim_check = ClaimCheck(FileContentStore(tmp_path), threshold_bytes=16)
+    event = _received("x" * 1000)
+
+    offloaded = await claim_check.offload(event)
+    assert offloaded.content is None
+    assert offloaded.content_ref == str(event.message_id)
+    assert event.content == "x" * 1000
+
+    registry = EventCodecRegistry([MessageReceivedEvent])
+    decoded = registry.decode(registry.encode(offloaded))
+    assert len(registry.encode(offloaded)) < 1000
+    assert await claim_check.resolve(decoded) == "x" * 1000
+
+
+@pytest.mark.asyncio
+async def test_small_content_and_other_events_stay_inline(tmp_path):
+    claim_check = ClaimCheck(FileContentStore(tmp_path), threshold_bytes=16)
+    small = _received("short")
+    archived = ConversationArchivedEvent(conversation_id=ConversationId(uuid4()))
+
+    assert await claim_check.offload(small) is small
+    assert await claim_check.offload(archived) is archived
+    assert await claim_check.resolve(small) == "short"
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_assistant_replies_are_keyed_by_assistant_message_id(tmp_path):
+    claim_check = ClaimCheck(FileContentStore(tmp_path), threshold_bytes=0)
+    event = AssistantRespondedEvent(
+        conversation_id=ConversationId(uuid4()),
+        user_message_id=MessageId(uuid4()),
+        assistant_message_id=MessageId(uuid4()),
+        content="reply",
+    )
+
+    offloaded = await claim_check.offload(event)
+
+    assert offloaded.content_ref == str(event.assistant_message_id)
+    missing = AssistantRespondedEvent(**{**offloaded.__dict__, "content_ref": str(uuid4())})
+    with pytest.raises(LookupError):
+        await claim_check.resolve(missing)
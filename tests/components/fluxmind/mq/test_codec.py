@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from uuid import UUID, uuid4
+
+import pytest
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationArchivedEvent,
+    ConversationId,
+    MessageId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+from fluxmind.mq import EventCodecRegistry
+
+EVENT_TYPES = [MessageReceivedEvent, AssistantRespondedEvent, ConversationArchivedEvent]
+
+
+@pytest.mark.parametrize("use_fast_json", [True, False])
+def test_round_trip_restores_field_types(use_fast_json):
+    registry = EventCodecRegistry(EVENT_TYPES, use_fast_json=use_fast_json)
+    event = MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content="안녕 hello",
+        token_count=3,
+        metadata={"source": "api"},
+    )
+
+    decoded = registry.decode(registry.encode(event))
+
+    assert decoded == event
+    assert isinstance(decoded.conversation_id, UUID)
+    assert isinstance(decoded.occurred_at, datetime)
+    assert decoded.role is MessageRole.USER
+    assert json.loads(registry.encode(event))["schema_version"] == 1
+
+
+def test_decodes_legacy_payloads_and_ignores_unknown_fields():
+    registry = EventCodecRegistry(EVENT_TYPES, use_fast_json=False)
+    conv_id = uuid4()
+    legacy = {
+        "event_type": "ConversationArchivedEvent",
+        "data": {
+            "event_id": str(uuid4()),
+            "occurred_at": "2024-05-01T12:00:00+00:00",
+            "metadata": {},
+            "conversation_id": str(conv_id),
+            "added_in_a_later_schema": True,
+        },
+    }
+
+    decoded = registry.decode(json.dumps(legacy).encode("utf-8"))
+
+    assert decoded == ConversationArchivedEvent(
+        event_id=UUID(legacy["data"]["event_id"]),
+        occurred_at=datetime.fromisoformat("2024-05-01T12:00:00+00:00"),
+        conversation_id=conv_id,
+    )
+    assert registry.decode(b'{"event_type": "SomethingElse", "data": {}}') is None
+
+
+@pytest.mark.parametrize("use_fast_json", [True, False])
+def test_decode_raw_returns_json_values_without_building_the_event(use_fast_json):
+    registry = EventCodecRegistry(EVENT_TYPES, use_fast_json=use_fast_json)
+    event = MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content="hi",
+        token_count=3,
+    )
+
+    event_type, data = registry.decode_raw(registry.encode(event))
+
+    assert event_type == "MessageReceivedEvent"
+    assert data["conversation_id"] == str(event.conversation_id)
+    assert data["role"] == "user"
+    assert datetime.fromisoformat(data["occurred_at"]) == event.occurred_at
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import KeyedEventDispatcher
+
+
+def _received(conversation_id: ConversationId, content: str) -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=conversation_id,
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content=content,
+    )
+
+
+@pytest.mark.asyncio
+async def test_keeps_order_per_conversation_and_runs_conversations_concurrently():
+    running = 0
+    peak = 0
+    handled: dict[ConversationId, list[str]] = {}
+
+    async def handler(event: MessageReceivedEvent) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001 * (hash(event.content) % 3))
+        handled.setdefault(event.conversation_id, []).append(event.content)
+        running -= 1
+
+    dispatcher = KeyedEventDispatcher(handler, max_concurrency=3, max_in_flight=100)
+    conversations = [ConversationId(uuid4()) for _ in range(5)]
+    for i in range(10):
+        for conv_id in conversations:
+            await dispatcher.submit(_received(conv_id, str(i)))
+    await dispatcher.join()
+
+    assert all(handled[conv_id] == [str(i) for i in range(10)] for conv_id in conversations)
+    assert peak == 3
+    assert dispatcher.active_keys == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_waits_when_in_flight_limit_is_reached():
+    release = asyncio.Event()
+
+    async def handler(event: MessageReceivedEvent) -> None:
+        await release.wait()
+
+    dispatcher = KeyedEventDispatcher(handler, max_concurrency=2, max_in_flight=2)
+    await dispatcher.submit(_received(ConversationId(uuid4()), "a"))
+    await dispatcher.submit(_received(ConversationId(uuid4()), "b"))
+
+    blocked = asyncio.create_task(dispatcher.submit(_received(ConversationId(uuid4()), "c")))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    done = await asyncio.wait_for(blocked, timeout=1)
+    await asyncio.wait_for(dispatcher.join(), timeout=1)
+    assert done.done()
+
+
+@pytest.mark.asyncio
+async def test_failure_does_not_stop_the_conversation_queue():
+    handled: list[str] = []
+
+    async def handler(event: MessageReceivedEvent) -> str:
+        if event.content == "bad":
+            raise RuntimeError("boom")
+        handled.append(event.content)
+        return event.content
+
+    dispatcher = KeyedEventDispatcher(handler, max_concurrency=1)
+    conv_id = ConversationId(uuid4())
+    failed = await dispatcher.submit(_received(conv_id, "bad"))
+    ok = await dispatcher.submit(_received(conv_id, "good"))
+    await dispatcher.join()
+
+    assert isinstance(failed.exception(), RuntimeError)
+    assert ok.result() == "good"
+    assert handled == ["good"]
+
+
+@pytest.mark.asyncio
+async def test_stop_cancels_running_and_queued_futures():
+    started = asyncio.Event()
+
+    async def handler(event: MessageReceivedEvent) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    dispatcher = KeyedEventDispatcher(handler, max_concurrency=1)
+    conv_id = ConversationId(uuid4())
+    running = await dispatcher.submit(_received(conv_id, "a"))
+    queued = await dispatcher.submit(_received(conv_id, "b"))
+    await started.wait()
+
+    await dispatcher.stop()
+
+    for future in (running, queued):
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(future, timeout=1)
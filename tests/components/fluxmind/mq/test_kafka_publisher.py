@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import ConversationArchivedEvent, ConversationId
+from fluxmind.mq import ClaimCheck, FileContentStore, kafka
+from fluxmind.mq.kafka import KafkaEventPublisher
+
+
+class FakeProducer:
+    """send()는 future만 돌려주고, flush() 또는 deliver_all()에서 ack를 흉내 낸다."""
+
+    instances: list[FakeProducer] = []
+
+    def __init__(self, **config) -> None:
+        self.config = config
+        self.sent: list[tuple[str, dict, bytes | None]] = []
+        self.pending: list[asyncio.Future] = []
+        self.flushes = 0
+        FakeProducer.instances.append(self)
+
+    async def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    async def send(self, topic, value, key=None):
+        self.sent.append((topic, value, key))
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        return future
+
+    async def flush(self) -> None:
+        self.flushes += 1
+        self.deliver_all()
+
+    def deliver_all(self, error: Exception | None = None) -> None:
+        for future in self.pending:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
+        self.pending = []
+
+
+@pytest.fixture
+def producer(monkeypatch):
+    FakeProducer.instances.clear()
+    monkeypatch.setattr(kafka, "AIOKafkaProducer", FakeProducer)
+    return lambda: FakeProducer.instances[-1]
+
+
+def _events(count: int) -> list[ConversationArchivedEvent]:
+    return [ConversationArchivedEvent(conversation_id=ConversationId(uuid4())) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_publish_many_enqueues_everything_before_waiting(producer):
+    publisher = KafkaEventPublisher("kafka:9092", linger_ms=5, compression_type="lz4")
+    events = _events(4)
+
+    task = asyncio.create_task(
+        publisher.publish_many("t", events, partition_keys=[str(e.conversation_id) for e in events])
+    )
+    await asyncio.sleep(0)
+    assert len(producer().sent) == 4
+    assert not task.done()
+
+    producer().deliver_all()
+    await task
+
+    metrics = publisher.metrics()
+    assert (metrics.sent, metrics.delivered, metrics.in_flight) == (4, 4, 0)
+    assert (metrics.batches, metrics.batch_events_max) == (1, 4)
+    assert producer().config["linger_ms"] == 5
+    assert producer().config["compression_type"] == "lz4"
+
+
+@pytest.mark.asyncio
+async def test_send_flushes_once_max_in_flight_is_reached(producer):
+    publisher = KafkaEventPublisher("kafka:9092", max_in_flight=2)
+    first, second, third = _events(3)
+
+    await publisher.send("t", first)
+    await publisher.send("t", second)
+    assert producer().flushes == 0
+
+    await publisher.send("t", third)
+    assert producer().flushes == 1
+    assert publisher.metrics().in_flight == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_deliveries_are_counted(producer):
+    publisher = KafkaEventPublisher("kafka:9092")
+    future = await publisher.send("t", _events(1)[0])
+
+    producer().deliver_all(error=RuntimeError("broker down"))
+    with pytest.raises(RuntimeError):
+        await future
+    await asyncio.sleep(0)
+
+    assert publisher.metrics().failed == 1
+
+
+@pytest.mark.asyncio
+async def test_publish_encoded_many_sends_the_payloads_unchanged(producer):
+    claim_check = ClaimCheck(FileContentStore("/nonexistent"), threshold_bytes=0)
+    publisher = KafkaEventPublisher("kafka:9092", claim_check=claim_check)
+
+    task = asyncio.create_task(publisher.publish_encoded_many("t", [b"a", b"b"], partition_keys=["k", None]))
+    await asyncio.sleep(0)
+    producer().deliver_all()
+
+    assert await task == [None, None]
+    assert producer().sent == [("t", b"a", b"k"), ("t", b"b", None)]
+    assert publisher.metrics().batches == 1
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from aiokafka import TopicPartition
+from fluxmind.domain_core import ConversationArchivedEvent, ConversationId
+from fluxmind.mq import EventCodecRegistry, kafka
+from fluxmind.mq.kafka import KafkaEventSubscriber
+
+_CODEC = EventCodecRegistry([ConversationArchivedEvent])
+
+
+class FakeConsumer:
+    """records에 넣어 둔 메시지를 순서대로 돌려주고 commit 요청을 기록한다."""
+
+    instances: list[FakeConsumer] = []
+    records: list[SimpleNamespace] = []
+
+    def __init__(self, *topics, **config) -> None:
+        self.config = config
+        self.paused: set[TopicPartition] = set()
+        self.commits: list[dict] = []
+        self.listener = None
+        FakeConsumer.instances.append(self)
+
+    def subscribe(self, topics, listener=None) -> None:
+        self.listener = listener
+
+    async def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    async def commit(self, offsets) -> None:
+        self.commits.append(dict(offsets))
+
+    async def getmany(self, *partitions, timeout_ms=0, max_records=None):
+        batch, self.records = self.records[:max_records], self.records[max_records:]
+        result: dict = {}
+        for record in batch:
+            result.setdefault(TopicPartition(record.topic, record.partition), []).append(record)
+        return result
+
+    async def getone(self):
+        if not self.records:
+            await asyncio.Event().wait()
+        record, self.records = self.records[0], self.records[1:]
+        return record
+
+    def assignment(self) -> set[TopicPartition]:
+        return {TopicPartition("events", 0)}
+
+    def highwater(self, partition) -> int:
+        return 10
+
+    async def committed(self, partition) -> int | None:
+        return 4
+
+    def pause(self, *partitions) -> None:
+        self.paused.update(partitions)
+
+    def resume(self, *partitions) -> None:
+        self.paused.difference_update(partitions)
+
+
+def _record(offset: int, value: bytes) -> SimpleNamespace:
+    return SimpleNamespace(topic="events", partition=0, offset=offset, value=value)
+
+
+@pytest.mark.asyncio
+async def test_deliveries_commit_only_contiguous_acked_offsets(monkeypatch):
+    FakeConsumer.instances.clear()
+    monkeypatch.setattr(kafka, "AIOKafkaConsumer", FakeConsumer)
+    subscriber = KafkaEventSubscriber(
+        "kafka:9092",
+        "group",
+        {"ConversationArchivedEvent": ConversationArchivedEvent},
+        commit_interval_ms=60_000,
+        commit_max_messages=1000,
+    )
+
+    # 0, 2는 handler가 처리하고 1은 모르는 이벤트라 subscriber가 바로 끝난 것으로 친다.
+    records = [
+        _record(0, _CODEC.encode(ConversationArchivedEvent(conversation_id=ConversationId(uuid4())))),
+        _record(1, b'{"event_type": "Unknown", "data": {}}'),
+        _record(2, _CODEC.encode(ConversationArchivedEvent(conversation_id=ConversationId(uuid4())))),
+    ]
+    monkeypatch.setattr(FakeConsumer, "records", records)
+
+    deliveries = subscriber.deliveries("events")
+    first = await deliveries.__anext__()
+    third = await deliveries.__anext__()
+    consumer = FakeConsumer.instances[-1]
+    assert consumer.config["enable_auto_commit"] is False
+
+    third.ack()
+    await consumer.listener.on_partitions_revoked([])
+    assert consumer.commits == []
+
+    first.ack()
+    await deliveries.aclose()
+    assert consumer.commits == [{TopicPartition("events", 0): 3}]
+
+
+@pytest.mark.asyncio
+async def test_iterate_batches_uses_getmany_and_commits_after_ack(monkeypatch):
+    FakeConsumer.instances.clear()
+    monkeypatch.setattr(kafka, "AIOKafkaConsumer", FakeConsumer)
+    records = [
+        _record(offset, _CODEC.encode(ConversationArchivedEvent(conversation_id=ConversationId(uuid4()))))
+        for offset in range(5)
+    ]
+    monkeypatch.setattr(FakeConsumer, "records", records)
+    subscriber = KafkaEventSubscriber(
+        "kafka:9092",
+        "group",
+        {"ConversationArchivedEvent": ConversationArchivedEvent},
+        commit_interval_ms=60_000,
+        commit_max_messages=1000,
+    )
+
+    batches = subscriber.iterate_batches("events", max_records=3, timeout_ms=10)
+    first = await batches.__anext__()
+    second = await batches.__anext__()
+    assert [len(first), len(second)] == [3, 2]
+
+    for delivery in first:
+        delivery.ack()
+    await batches.aclose()
+    assert FakeConsumer.instances[-1].commits == [{TopicPartition("events", 0): 3}]
+
+
+@pytest.mark.asyncio
+async def test_partitions_pause_at_buffer_cap_and_report_lag(monkeypatch):
+    FakeConsumer.instances.clear()
+    monkeypatch.setattr(kafka, "AIOKafkaConsumer", FakeConsumer)
+    records = [
+        _record(offset, _CODEC.encode(ConversationArchivedEvent(conversation_id=ConversationId(uuid4()))))
+        for offset in range(4)
+    ]
+    monkeypatch.setattr(FakeConsumer, "records", records)
+    subscriber = KafkaEventSubscriber(
+        "kafka:9092",
+        "group",
+        {"ConversationArchivedEvent": ConversationArchivedEvent},
+        max_buffered_records=2,
+        resume_buffered_records=0,
+    )
+
+    deliveries = subscriber.deliveries("events")
+    first = await deliveries.__anext__()
+    second = await deliveries.__anext__()
+    consumer = FakeConsumer.instances[-1]
+    assert consumer.paused == {TopicPartition("events", 0)}
+
+    # 버퍼가 가득 차 있는 동안에는 다음 레코드를 넘겨주지 않는다.
+    blocked = asyncio.ensure_future(deliveries.__anext__())
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    first.ack()
+    third = await asyncio.wait_for(blocked, timeout=1)
+    assert consumer.paused == {TopicPartition("events", 0)}
+    second.ack()
+    third.ack()
+    assert consumer.paused == set()
+
+    metrics = subscriber.metrics()
+    assert metrics.pauses == 1
+    assert metrics.in_flight == 0
+    [partition] = metrics.partitions
+    assert (partition.lag, partition.processed) == (7, 3)
+    await deliveries.aclose()
+    assert subscriber.metrics() is None
+
+
+@pytest.mark.asyncio
+async def test_lag_before_the_first_ack_starts_at_the_committed_offset(monkeypatch):
+    FakeConsumer.instances.clear()
+    monkeypatch.setattr(kafka, "AIOKafkaConsumer", FakeConsumer)
+    monkeypatch.setattr(FakeConsumer, "records", [])
+    subscriber = KafkaEventSubscriber(
+        "kafka:9092",
+        "group",
+        {"ConversationArchivedEvent": ConversationArchivedEvent},
+        commit_interval_ms=10,
+    )
+
+    deliveries = subscriber.deliveries("events")
+    pending = asyncio.ensure_future(deliveries.__anext__())
+    await asyncio.sleep(0.05)
+
+    [partition] = subscriber.metrics().partitions
+    assert partition.lag == 6
+    pending.cancel()
+    await asyncio.gather(pending, return_exceptions=True)
+    await deliveries.aclose()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import ConversationArchivedEvent, ConversationId
+from fluxmind.mq import EventCodecRegistry, InMemoryBroker, InMemoryEventPublisher, InMemoryEventSubscriber
+
+
+def _archived(conversation_id: ConversationId) -> ConversationArchivedEvent:
+    return ConversationArchivedEvent(conversation_id=conversation_id)
+
+
+async def _take(iterator, count: int) -> list:
+    return [await asyncio.wait_for(iterator.__anext__(), timeout=1) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_every_group_gets_every_event_in_key_order():
+    broker = InMemoryBroker(partitions=4)
+    broker.declare("events", "responder")
+    broker.declare("events", "analytics")
+    publisher = InMemoryEventPublisher(broker)
+
+    conv_a, conv_b = ConversationId(uuid4()), ConversationId(uuid4())
+    published = [_archived(conv_a if i % 2 else conv_b) for i in range(20)]
+    for event in published:
+        await publisher.publish("events", event, partition_key=str(event.conversation_id))
+
+    for group_id in ("responder", "analytics"):
+        received = await _take(InMemoryEventSubscriber(broker, group_id).iterate("events"), 20)
+        for conv_id in (conv_a, conv_b):
+            assert [e for e in received if e.conversation_id == conv_id] == [
+                e for e in published if e.conversation_id == conv_id
+            ]
+
+
+@pytest.mark.asyncio
+async def test_members_of_a_group_split_partitions():
+    broker = InMemoryBroker(partitions=2)
+    first = InMemoryEventSubscriber(broker, "group").iterate("events")
+    second = InMemoryEventSubscriber(broker, "group").iterate("events")
+    first_next = asyncio.ensure_future(first.__anext__())
+    second_next = asyncio.ensure_future(second.__anext__())
+    await asyncio.sleep(0)
+
+    keys = {broker.partition_for(str(i)): str(i) for i in range(10)}
+    for partition in (0, 1):
+        await broker.publish("events", _archived(ConversationId(uuid4())), partition_key=keys[partition])
+
+    done, _ = await asyncio.wait([first_next, second_next], timeout=1)
+    assert len(done) == 2
+    await first.aclose()
+    await second.aclose()
+
+
+@pytest.mark.asyncio
+async def test_full_partition_queue_blocks_the_publisher_and_batches_drain_it():
+    broker = InMemoryBroker(partitions=1, max_queue_size=2)
+    broker.declare("events", "group")
+    publisher = InMemoryEventPublisher(broker)
+
+    await publisher.publish("events", _archived(ConversationId(uuid4())))
+    await publisher.publish("events", _archived(ConversationId(uuid4())))
+    blocked = asyncio.ensure_future(publisher.publish("events", _archived(ConversationId(uuid4()))))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert broker.backlog("events", "group") == 2
+
+    batches = InMemoryEventSubscriber(broker, "group").iterate_batches("events", max_records=10, timeout_ms=50)
+    [first] = await _take(batches, 1)
+    assert len(first) == 2
+    await asyncio.wait_for(blocked, timeout=1)
+    [second] = await _take(batches, 1)
+    assert len(second) == 1
+    await batches.aclose()
+
+
+@pytest.mark.asyncio
+async def test_publish_encoded_many_skips_payloads_it_cannot_read():
+    broker = InMemoryBroker(partitions=1)
+    broker.declare("events", "group")
+    codec = EventCodecRegistry([ConversationArchivedEvent])
+    publisher = InMemoryEventPublisher(broker, codec=codec)
+    event = _archived(ConversationId(uuid4()))
+
+    errors = await publisher.publish_encoded_many(
+        "events",
+        [b'{"event_type": "Unknown", "data": {}}', b"\xffnot json", codec.encode(event)],
+    )
+
+    assert isinstance(errors[0], LookupError)
+    assert errors[1] is not None
+    assert errors[2] is None
+    assert await _take(InMemoryEventSubscriber(broker, "group").iterate("events"), 1) == [event]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.mq import InMemoryProcessedEventStore, OffsetTracker
+
+
+def test_commit_position_advances_only_past_contiguous_completed_offsets():
+    tracker = OffsetTracker()
+    for offset in (10, 11, 12):
+        tracker.track("p0", offset)
+    tracker.track("p1", 5)
+
+    tracker.complete("p0", 12)
+    tracker.complete("p1", 5)
+    assert tracker.committable() == {"p1": 6}
+
+    tracker.complete("p0", 10)
+    assert tracker.committable() == {"p0": 11, "p1": 6}
+
+    tracker.mark_committed({"p0": 11, "p1": 6})
+    assert tracker.committable() == {}
+
+    tracker.complete("p0", 11)
+    assert tracker.committable() == {"p0": 13}
+
+
+def test_acks_for_revoked_partitions_are_ignored():
+    tracker = OffsetTracker()
+    tracker.track("p0", 1)
+    tracker.forget(["p0"])
+
+    tracker.complete("p0", 1)
+    assert tracker.committable() == {}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_store_claims_each_event_once_and_evicts_oldest():
+    store = InMemoryProcessedEventStore(max_entries=2)
+    first, second, third = uuid4(), uuid4(), uuid4()
+
+    assert await store.claim(first)
+    assert not await store.claim(first)
+
+    await store.release(first)
+    assert await store.claim(first)
+
+    assert await store.claim(second)
+    assert await store.claim(third)
+    assert await store.claim(first)  # 가장 오래된 항목이라 밀려났다
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import EventCodecRegistry, EventPublisher, OutboxBatch, OutboxEvent, OutboxRelay
+
+_ids = itertools.count(1)
+
+
+class InMemoryOutboxStore:
+    def __init__(self, items: list[OutboxEvent]) -> None:
+        self.items = items
+        self.failures: dict[int, str] = {}
+
+    @contextlib.asynccontextmanager
+    async def lease(self, limit: int):
+        batch = OutboxBatch(self.items[:limit])
+        yield batch
+        self.failures.update(batch.failed)
+        self.items = [item for item in self.items if item not in batch.events or item.id in batch.failed]
+
+
+class BatchRecordingPublisher(EventPublisher):
+    def __init__(self, *, fail: bool = False, reject: bytes | None = None) -> None:
+        self.fail = fail
+        self.reject = reject
+        self.calls: list[tuple[str, list, list]] = []
+
+    async def publish(self, topic: str, event, *, partition_key: str | None = None):
+        raise AssertionError("relay should publish whole batches")
+
+    async def publish_encoded_many(self, topic, payloads, *, partition_keys=None):
+        if self.fail:
+            raise ConnectionError("broker down")
+        self.calls.append((topic, list(payloads), list(partition_keys)))
+        return [ValueError("unreadable") if payload == self.reject else None for payload in payloads]
+
+
+def _item(topic: str = "events") -> OutboxEvent:
+    conversation_id = ConversationId(uuid4())
+    event = MessageReceivedEvent(
+        conversation_id=conversation_id,
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content="hi",
+    )
+    return OutboxEvent(next(_ids), topic, EventCodecRegistry().encode(event), str(conversation_id))
+
+
+@pytest.mark.asyncio
+async def test_relay_publishes_each_batch_with_one_call_per_topic_and_removes_it():
+    items = [_item() for _ in range(3)] + [_item("other")]
+    store = InMemoryOutboxStore(list(items))
+    publisher = BatchRecordingPublisher()
+    relay = OutboxRelay(store, publisher, batch_size=3)
+
+    assert await relay.relay_once() == 3
+    assert await relay.relay_once() == 1
+    assert await relay.relay_once() == 0
+
+    assert [(topic, len(payloads)) for topic, payloads, _ in publisher.calls] == [("events", 3), ("other", 1)]
+    assert publisher.calls[0][1] == [item.payload for item in items[:3]]
+    assert publisher.calls[0][2] == [item.partition_key for item in items[:3]]
+    assert store.items == []
+
+
+@pytest.mark.asyncio
+async def test_failed_publish_keeps_the_batch_in_the_outbox():
+    store = InMemoryOutboxStore([_item(), _item()])
+    relay = OutboxRelay(store, BatchRecordingPublisher(fail=True), batch_size=10)
+
+    with pytest.raises(ConnectionError):
+        await relay.relay_once()
+
+    assert len(store.items) == 2
+
+
+@pytest.mark.asyncio
+async def test_rejected_event_stays_in_the_outbox_and_the_rest_is_removed():
+    rejected, ok = _item(), _item()
+    store = InMemoryOutboxStore([rejected, ok])
+    relay = OutboxRelay(store, BatchRecordingPublisher(reject=rejected.payload), batch_size=10)
+
+    assert await relay.relay_once() == 2
+
+    assert store.items == [rejected]
+    assert store.failures == {rejected.id: "ValueError: unreadable"}
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import ConversationId, MessageId, MessageReceivedEvent, MessageRole
+from fluxmind.mq import EventPublisher, EventRouter, RetryPolicy, RetryRouter
+from fluxmind.mq.retry import RETRY_ATTEMPT, RETRY_ERROR, RETRY_SOURCE_TOPIC, retry_attempt, retry_due_at
+
+
+class CollectingEventPublisher(EventPublisher):
+    def __init__(self) -> None:
+        self.published: list[tuple[str, object, str | None]] = []
+
+    async def publish(self, topic: str, event, *, partition_key: str | None = None):
+        self.published.append((topic, event, partition_key))
+
+
+def _received() -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content="hi",
+        metadata={"trace_id": "abc"},
+    )
+
+
+@pytest.mark.asyncio
+async def test_failures_move_through_retry_topics_then_to_dead_letter():
+    publisher = CollectingEventPublisher()
+    retries = RetryRouter(publisher, "responder", RetryPolicy(delays_seconds=(1.0, 10.0)))
+    event = _received()
+
+    topics = []
+    for _ in range(3):
+        topics.append(await retries.route_failure(event, TimeoutError("ollama"), source_topic="events"))
+        event = publisher.published[-1][1]
+
+    assert topics == ["responder.retry-1", "responder.retry-2", "responder.dlq"]
+    assert all(key == str(event.conversation_id) for _, _, key in publisher.published)
+    assert retry_attempt(event) == 2
+    assert retry_due_at(event) is None
+    assert event.metadata[RETRY_SOURCE_TOPIC] == "events"
+    assert event.metadata[RETRY_ERROR] == "TimeoutError: ollama"
+    assert event.metadata["trace_id"] == "abc"
+
+
+@pytest.mark.asyncio
+async def test_non_retryable_errors_go_straight_to_dead_letter_and_replay_restarts_retries():
+    publisher = CollectingEventPublisher()
+    retries = RetryRouter(publisher, "responder", RetryPolicy(delays_seconds=(1.0,), non_retryable=(LookupError,)))
+    event = _received()
+
+    assert await retries.route_failure(event, LookupError("gone"), source_topic="events") == "responder.dlq"
+    dead = publisher.published[-1][1]
+    assert RETRY_ATTEMPT not in dead.metadata
+
+    assert await retries.replay(dead) == "responder.retry-1"
+    replayed = publisher.published[-1][1]
+    assert replayed.event_id == event.event_id
+    assert retry_attempt(replayed) == 1
+
+
+def test_router_declares_one_consumer_group_per_retry_topic():
+    router = EventRouter()
+    router.add_group("responder", topic="events", max_concurrency=4, retry=RetryPolicy(delays_seconds=(1.0, 10.0)))
+    router.add_group("analytics", topic="events")
+
+    tiers = router.retry_groups("responder")
+    assert [(tier.group_id, tier.topic) for tier in tiers] == [
+        ("responder.retry-1", "responder.retry-1"),
+        ("responder.retry-2", "responder.retry-2"),
+    ]
+    assert all(tier.max_concurrency == 4 for tier in tiers)
+    assert router.retry_groups("analytics") == []
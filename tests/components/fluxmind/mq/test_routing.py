@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from fluxmind.domain_core import (
+    AssistantRespondedEvent,
+    ConversationId,
+    MessageId,
+    MessageReceivedEvent,
+    MessageRole,
+)
+from fluxmind.mq import EventRouter
+
+
+def _received() -> MessageReceivedEvent:
+    return MessageReceivedEvent(
+        conversation_id=ConversationId(uuid4()),
+        message_id=MessageId(uuid4()),
+        role=MessageRole.USER,
+        content="hi",
+    )
+
+
+@pytest.mark.asyncio
+async def test_each_group_only_runs_its_own_handlers():
+    calls: list[str] = []
+
+    async def respond(event):
+        calls.append("respond")
+
+    async def count(event):
+        calls.append("count")
+
+    router = EventRouter()
+    router.add_group("responder", topic="events", max_concurrency=4)
+    router.add_group("analytics", topic="events", max_concurrency=32)
+    router.route(MessageReceivedEvent, respond, group_id="responder")
+    router.route(MessageReceivedEvent, count, group_id="analytics")
+    router.route(AssistantRespondedEvent, count, group_id="analytics")
+
+    assert [group.group_id for group in router.groups] == ["responder", "analytics"]
+    assert router.event_types("responder") == {"MessageReceivedEvent": MessageReceivedEvent}
+    assert set(router.event_types("analytics")) == {"MessageReceivedEvent", "AssistantRespondedEvent"}
+
+    await router.handler("analytics")(_received())
+    assert calls == ["count"]
+
+    await router.handler("responder")(_received())
+    assert calls == ["count", "respond"]
+
+
+def test_routes_must_target_a_registered_group():
+    router = EventRouter()
+    router.add_group("responder", topic="events")
+
+    with pytest.raises(ValueError):
+        router.route(MessageReceivedEvent, lambda event: None, group_id="missing")
+    with pytest.raises(ValueError):
+        router.add_group("responder", topic="other")
+
+
+@pytest.mark.asyncio
+async def test_batch_handler_receives_all_routed_types_in_one_call():
+    batches: list[list] = []
+
+    async def apply(events):
+        batches.append(list(events))
+
+    router = EventRouter()
+    router.add_group("analytics", topic="events", batch_max_records=100)
+    router.route_batch(MessageReceivedEvent, apply, group_id="analytics")
+    router.route_batch(AssistantRespondedEvent, apply, group_id="analytics")
+    assert router.is_batch("analytics")
+
+    events = [_received(), _received()]
+    await router.batch_handler("analytics")(events)
+    assert batches == [events]
+
+    with pytest.raises(ValueError):
+        router.route(MessageReceivedEvent, apply, group_id="analytics")
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fluxmind.conversation import ConversationRepository, ConversationService
+from fluxmind.domain_core import Conversation, ConversationId, MessageRole
+from fluxmind.llm import LLMClient, LLMMessage
+from fluxmind.summarization import ConversationSummarizer, ConversationSummary, SummaryRepository
+
+
+class InMemoryConversationRepository(ConversationRepository):
+    def __init__(self) -> None:
+        self._store: dict[ConversationId, Conversation] = {}
+
+    async def save(self, conversation: Conversation, *, outbox=()) -> None:
+        self._store[conversation.id] = conversation
+
+    async def list_messages(self, conversation_id: ConversationId, limit: int | None = None, *, before=None, after=None):
+        messages = list(self._store[conversation_id].messages)
+        if before is not None:
+            messages = [m for m in messages if (m.created_at, m.id) < (before.created_at, before.id)]
+        if after is not None:
+            messages = [m for m in messages if (m.created_at, m.id) > (after.created_at, after.id)]
+            return messages[:limit] if limit is not None else messages
+        return messages[-limit:] if limit is not None else messages
+
+
+class InMemorySummaryRepository(SummaryRepository):
+    def __init__(self) -> None:
+        self.summaries: dict[ConversationId, ConversationSummary] = {}
+
+    async def get(self, conversation_id: ConversationId) -> ConversationSummary | None:
+        return self.summaries.get(conversation_id)
+
+    async def save(self, summary: ConversationSummary) -> bool:
+        self.summaries[summary.conversation_id] = summary
+        return True
+
+
+class RecordingLLMClient(LLMClient):
+    def __init__(self) -> None:
+        self.prompts: list[list[LLMMessage]] = []
+
+    async def generate(self, messages, *, model: str, temperature=None, max_tokens=None) -> str:
+        self.prompts.append(list(messages))
+        return f"summary #{len(self.prompts)}"
+
+
+async def _setup(count: int, **kwargs):
+    repo = InMemoryConversationRepository()
+    service = ConversationService(repo)
+    conv = await service.create_conversation()
+    for i in range(count):
+        conv.add_message(MessageRole.USER if i % 2 == 0 else MessageRole.ASSISTANT, f"m{i}")
+    await repo.save(conv)
+    summaries = InMemorySummaryRepository()
+    llm = RecordingLLMClient()
+    summarizer = ConversationSummarizer(service, summaries, llm, model="m", **kwargs)
+    return repo, conv, summaries, llm, summarizer
+
+
+@pytest.mark.asyncio
+async def test_only_messages_past_the_high_water_mark_are_folded():
+    repo, conv, summaries, llm, summarizer = await _setup(14, trigger_messages=4, keep_recent=4)
+
+    first = await summarizer.summarize(conv.id)
+    assert first.content == "summary #1"
+    assert first.message_count == 10
+    assert first.last_message.id == conv.messages[9].id
+
+    # 새 메시지가 trigger 미만이면 LLM을 부르지 않는다.
+    for i in range(3):
+        conv.add_message(MessageRole.USER, f"n{i}")
+    assert await summarizer.summarize(conv.id) == first
+    assert len(llm.prompts) == 1
+
+    conv.add_message(MessageRole.USER, "n3")
+    second = await summarizer.summarize(conv.id)
+    assert second.message_count == 14
+    prompt = llm.prompts[-1][-1].content
+    assert "summary #1" in prompt
+    assert "m9" not in prompt
+    assert all(f"m{i}" in prompt for i in (10, 11, 12, 13))
+
+
+@pytest.mark.asyncio
+async def test_schedule_runs_once_per_conversation_in_background():
+    repo, conv, summaries, llm, summarizer = await _setup(30, trigger_messages=5, keep_recent=5)
+
+    summarizer.schedule(conv.id)
+    summarizer.schedule(conv.id)
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    await summarizer.stop()
+
+    assert len(llm.prompts) == 1
+    assert summaries.summaries[conv.id].message_count == 25
+
+
+@pytest.mark.asyncio
+async def test_keep_recent_zero_summarizes_every_message():
+    repo, conv, summaries, llm, summarizer = await _setup(6, trigger_messages=3, keep_recent=0)
+
+    summary = await summarizer.summarize(conv.id)
+
+    assert summary.message_count == 6
+    assert summary.last_message.id == conv.messages[-1].id
+
+
+def test_trigger_larger_than_a_pass_is_rejected():
+    with pytest.raises(ValueError):
+        ConversationSummarizer(None, None, None, model="m", trigger_messages=300, keep_recent=4)
+    with pytest.raises(ValueError):
+        ConversationSummarizer(None, None, None, model="m", trigger_messages=4, keep_recent=-1)